@@ -0,0 +1,47 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def list_validators(request, rows, timestamps=('updated_at',), *extra):
+    """
+    ETag d'une liste (ou d'une page), calcule sur les lignes renvoyees : leurs id et leurs dates de
+    modification (y compris celles des relations imbriquees), lues dans `rows` (lignes `values_list()`
+    nommees). Aucun aggregate sur le queryset filtre : le cout reste celui de la page.
+
+    Une ligne ajoutee, supprimee ou sortie du filtre change les id de la page, une mise a jour change ses
+    dates. L'URL complete (filtres, `?fields=`, curseur), l'utilisateur et `extra` (ex. l'existence d'une
+    page suivante) font partie de l'ETag.
+
+    Pas de Last-Modified pour une liste : une ligne supprimee ou sortie du filtre ne fait pas avancer
+    max(updated_at), et la resolution d'une seconde de l'en-tete manque deux mises a jour rapprochees.
+    """
+    version = [(row.id, *(getattr(row, field) for field in timestamps)) for row in rows]
+    return make_etag((request.get_full_path(), request.user.pk, version, *extra))
+
+
+def object_validators(request, obj):
+    """
+    ETag et Last-Modified d'une ressource ayant un champ `updated_at`.
+    """
+    return make_etag((request.get_full_path(), request.user.pk, obj.pk, obj.updated_at)), obj.updated_at
+
+
+def make_etag(version):
+    return '"%s"' % hashlib.md5(repr(version).encode(), usedforsecurity=False).hexdigest()
+
+
+def not_modified(request, etag, last_modified=None):
+    """
+    Reponse 304 si le client a deja cette version (`If-None-Match` / `If-Modified-Since`), sinon None.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def with_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
@@ -0,0 +1,128 @@
+import csv
+import datetime
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from drf_yasg import openapi
+from rest_framework.exceptions import ValidationError
+
+# Nombre de lignes lues par le curseur serveur, et envoyees ensemble au client
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """
+    Pseudo-fichier pour csv.writer : `write` renvoie la ligne au lieu de la stocker.
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_filters(request, queryset, date_field, statuses):
+    """
+    Applique `?date_from=`, `?date_to=` (AAAA-MM-JJ, bornes incluses) et `?status=a,b`.
+
+    Les bornes sont converties en datetimes pour que l'index sur `date_field` reste utilisable.
+    """
+    params = request.query_params
+    for param, lookup, days in (('date_from', 'gte', 0), ('date_to', 'lt', 1)):
+        value = params.get(param)
+        if not value:
+            continue
+        day = parse_date(value)
+        if day is None:
+            raise ValidationError({param: "Invalid date, expected YYYY-MM-DD"})
+        bound = timezone.make_aware(datetime.datetime.combine(day + datetime.timedelta(days=days), datetime.time.min))
+        queryset = queryset.filter(**{f'{date_field}__{lookup}': bound})
+
+    status_filter = params.get('status')
+    if status_filter:
+        selected = [stat for stat in status_filter.split(',') if stat in statuses]
+        if not selected:
+            raise ValidationError({"status": "Invalid status values"})
+        queryset = queryset.filter(status__in=selected)
+
+    return queryset.order_by(date_field, 'id')
+
+
+def export_parameters(statuses):
+    """
+    Parametres swagger des endpoints d'export.
+    """
+    return [
+        openapi.Parameter('file_format', openapi.IN_QUERY, description="Format du fichier (csv par defaut)",
+                          type=openapi.TYPE_STRING, enum=list(EXPORT_FORMATS), required=False),
+        openapi.Parameter('date_from', openapi.IN_QUERY, description="Date de debut incluse (AAAA-MM-JJ)",
+                          type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE, required=False),
+        openapi.Parameter('date_to', openapi.IN_QUERY, description="Date de fin incluse (AAAA-MM-JJ)",
+                          type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE, required=False),
+        openapi.Parameter('status', openapi.IN_QUERY,
+                          description=f"Statuts separes par des virgules ({', '.join(statuses)})",
+                          type=openapi.TYPE_STRING, required=False),
+    ]
+
+
+def column_name(path):
+    return path.replace('__', '_')
+
+
+def csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def csv_chunks(columns, rows):
+    writer = csv.writer(Echo())
+    # L'en-tete part avant meme l'execution de la requete
+    yield writer.writerow([column_name(path) for path in columns])
+    chunk = []
+    for row in rows:
+        chunk.append(writer.writerow([csv_cell(value) for value in row]))
+        if len(chunk) == EXPORT_CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def ndjson_chunks(columns, rows):
+    names = [column_name(path) for path in columns]
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    chunk = []
+    for row in rows:
+        chunk.append(encoder.encode(dict(zip(names, row))) + '\n')
+        if len(chunk) == EXPORT_CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def export_response(request, queryset, columns, filename):
+    """
+    Export en streaming (CSV ou NDJSON selon `?file_format=`) des colonnes `values_list()` du queryset.
+
+    Les lignes sont lues par un curseur serveur (`iterator()`), par blocs de EXPORT_CHUNK_SIZE :
+    la memoire reste constante quelle que soit la taille de l'export.
+    """
+    file_format = request.query_params.get('file_format', 'csv')
+    if file_format not in EXPORT_FORMATS:
+        raise ValidationError({"file_format": f"Expected one of: {', '.join(EXPORT_FORMATS)}"})
+
+    rows = queryset.values_list(*columns).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    chunks = csv_chunks(columns, rows) if file_format == 'csv' else ndjson_chunks(columns, rows)
+    response = StreamingHttpResponse(chunks, content_type=EXPORT_FORMATS[file_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{file_format}"'
+    return response
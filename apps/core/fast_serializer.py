@@ -0,0 +1,160 @@
+import decimal
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from rest_framework import ISO_8601
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.settings import api_settings
+
+
+# Champs dont to_representation renvoie la valeur lue en base telle quelle
+IDENTITY_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.FloatField, serializers.BooleanField,
+                   serializers.ReadOnlyField)
+
+
+def compile_decimal(field):
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize or field.normalize_output or field.decimal_places is None:
+        return field.to_representation
+
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value):
+        return '{:f}'.format(value.quantize(exponent, rounding=rounding, context=context))
+
+    return convert
+
+
+def compile_datetime(field):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        # Les valeurs lues en base sont deja "aware" (USE_TZ)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith('+00:00'):
+            return value[:-6] + 'Z'
+        return value
+
+    return convert
+
+
+def compile_file(field, model_field):
+    if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+        return None
+
+    storage = model_field.storage
+    request = field.context.get('request', None)
+
+    def convert(name):
+        if not name:
+            return None
+        if request is not None:
+            return request.build_absolute_uri(storage.url(name))
+        return storage.url(name)
+
+    return convert
+
+
+def compile_field(field, model_field):
+    """
+    Convertisseur `valeur en base -> representation JSON` equivalent a `field.to_representation`.
+
+    `None` signifie que la valeur est renvoyee telle quelle.
+    """
+    if isinstance(field, serializers.DecimalField):
+        return compile_decimal(field)
+    if isinstance(field, serializers.DateTimeField):
+        return compile_datetime(field)
+    if isinstance(field, serializers.DateField):
+        output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+        if output_format is not None and output_format.lower() == ISO_8601:
+            return lambda value: value.isoformat()
+        return field.to_representation
+    if isinstance(field, serializers.ChoiceField):
+        choices = field.choice_strings_to_values
+        return lambda value: choices.get(str(value), value)
+    if isinstance(field, serializers.UUIDField) and field.uuid_format == 'hex_verbose':
+        return str
+    if isinstance(field, serializers.FileField):
+        return compile_file(field, model_field)
+    if isinstance(field, PrimaryKeyRelatedField) and field.pk_field is None:
+        return None
+    if isinstance(field, IDENTITY_FIELDS):
+        return None
+    return field.to_representation
+
+
+class ValuesSerializer:
+    """
+    Serialisation en lecture seule des listes, sans passer par `ModelSerializer.to_representation`.
+
+    Les champs du serializer DRF sont compiles une seule fois en une liste de chemins `values_list()`
+    et de convertisseurs ; chaque ligne est ensuite transformee directement en dict. Le JSON produit
+    est identique a celui du serializer d'origine (voir tests/test_fast_serializer.py).
+    """
+
+    def __init__(self, serializer, always=()):
+        self.paths = {}
+        self.build = self.compile(serializer, serializer.Meta.model, '')
+        # Colonnes utiles a la vue (ex. la cle de pagination) sans etre affichees
+        for path in always:
+            self.index(path)
+
+    def index(self, path):
+        return self.paths.setdefault(path, len(self.paths))
+
+    def compile(self, serializer, model, prefix):
+        steps = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*' or len(field.source_attrs) != 1 or isinstance(field, serializers.ListSerializer):
+                raise ImproperlyConfigured(f"{serializer.__class__.__name__}.{name} cannot be read with values()")
+
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                if not field.required:
+                    # DRF ignore aussi un champ facultatif dont l'attribut n'existe pas (SkipField)
+                    continue
+                raise ImproperlyConfigured(f"{serializer.__class__.__name__}.{name} has no model field")
+
+            path = prefix + field.source
+            if isinstance(field, serializers.BaseSerializer):
+                nested = self.compile(field, model_field.related_model, path + '__')
+                steps.append((name, self.index(path), nested, True))
+            else:
+                steps.append((name, self.index(path), compile_field(field, model_field), False))
+
+        def build(row):
+            data = {}
+            for name, position, convert, nested in steps:
+                value = row[position]
+                if value is None:
+                    data[name] = None
+                elif nested:
+                    data[name] = convert(row)
+                elif convert is None:
+                    data[name] = value
+                else:
+                    data[name] = convert(value)
+            return data
+
+        return build
+
+    def queryset(self, queryset):
+        """
+        Lignes `values_list()` nommees : la pagination peut lire `row.id` et `row.request_date`.
+        """
+        return queryset.values_list(*self.paths, named=True)
+
+    def data(self, rows):
+        build = self.build
+        return [build(row) for row in rows]
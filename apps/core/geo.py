@@ -0,0 +1,22 @@
+import math
+import unicodedata
+
+EARTH_RADIUS_KM = 6371.0
+
+# Les routes sont plus longues que la distance a vol d'oiseau
+ROAD_FACTOR = 1.3
+
+# Vitesse moyenne d'un camion sur route nationale
+AVERAGE_SPEED_KMH = 40
+
+
+def normalize_place(text):
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(text.lower().replace("'", '').replace('-', ' ').replace(',', ' ').split())
+
+
+def haversine_km(a, b):
+    lat1, lon1 = map(math.radians, a)
+    lat2, lon2 = map(math.radians, b)
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.location.resolver import resolve_location_id
+from apps.sendingRequest.models import DeliveryNote, SendingRequest
+
+
+class Command(BaseCommand):
+    help = ("Renseigne les lieux resolus (pickup_place, delivery_place) des demandes et bons de livraison "
+            "existants, par lots.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for model in (SendingRequest, DeliveryNote):
+            resolved, total = self.backfill(model, options["batch_size"])
+            self.stdout.write(f"{model.__name__}: {resolved}/{total} rows resolved")
+
+    @staticmethod
+    def backfill(model, batch_size):
+        """
+        Parcourt les lignes sans lieu par id croissant : une ligne dont l'adresse reste inconnue n'est lue qu'une fois.
+        """
+        fields = ['pickup_place', 'delivery_place']
+        if hasattr(model, 'updated_at'):
+            fields.append('updated_at')  # la mise a jour doit invalider les ETag des listes
+
+        missing = model.objects.filter(Q(pickup_place__isnull=True) | Q(delivery_place__isnull=True))
+        last_id, resolved, total = 0, 0, 0
+        while True:
+            rows = list(missing.filter(id__gt=last_id).order_by('id').only(
+                'id', 'pickup_location', 'delivery_location')[:batch_size])
+            if not rows:
+                return resolved, total
+            changed = []
+            for row in rows:
+                pickup, delivery = resolve_location_id(row.pickup_location), resolve_location_id(row.delivery_location)
+                if pickup is None and delivery is None:
+                    continue
+                row.pickup_place_id, row.delivery_place_id, row.updated_at = pickup, delivery, timezone.now()
+                changed.append(row)
+            with transaction.atomic():
+                model.objects.bulk_update(changed, fields)
+            last_id = rows[-1].id
+            resolved += len(changed)
+            total += len(rows)
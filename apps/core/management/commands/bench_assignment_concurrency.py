@@ -0,0 +1,117 @@
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.utils import timezone
+
+from apps.sendingRequest.claims import claim_next
+from apps.sendingRequest.models import DeliveryNote, SendingRequest, SendingRequestFleetAssignment
+from apps.sendingRequest.serializers import SendingRequestFleetAssignmentSerializer
+from apps.sendingRequest.utils import AssignmentConflict, assign_sending_request
+from apps.users.models import ChiefFleet, IndividualClient, User
+
+
+def queued_requests(chief):
+    """
+    Demandes reservees une a une par le chef dans la file, jusqu'a ce qu'elle soit vide.
+    """
+    while (sending_request := claim_next(chief)) is not None:
+        yield sending_request.pk
+
+
+class Command(BaseCommand):
+    help = ("Lance N chefs de flotte en parallele sur les memes demandes acceptees et verifie qu'aucune demande "
+            "n'est assignee deux fois ni ne laisse de bon de livraison orphelin. Avec --queue, les chefs prennent "
+            "les demandes dans la file (SKIP LOCKED) au lieu de se les disputer. Les donnees sont supprimees a la fin.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chiefs", type=int, default=50, help="Nombre de chefs de flotte (threads)")
+        parser.add_argument("--requests", type=int, default=200, help="Nombre de demandes acceptees a se disputer")
+        parser.add_argument("--queue", action="store_true", help="Reserver chaque demande avec la file des chefs")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("This command requires PostgreSQL")
+        if connection.in_atomic_block:
+            raise CommandError("Each chief needs its own committed transaction; do not run inside atomic()")
+
+        if options["queue"] and SendingRequest.objects.filter(status="accepted").exists():
+            raise CommandError("The queue hands out every accepted request; --queue needs a database without any")
+
+        suffix = uuid.uuid4().hex[:8]
+        client, chiefs, request_ids = self.seed(suffix, options["chiefs"], options["requests"])
+        try:
+            stats = {"assigned": 0, "conflicts": 0}
+            lock = threading.Lock()
+
+            def chief_worker(chief):
+                assigned = conflicts = 0
+                try:
+                    for pk in (queued_requests(chief) if options["queue"] else
+                               random.sample(request_ids, len(request_ids))):
+                        serializer = SendingRequestFleetAssignmentSerializer(
+                            data={"sending_request": pk, "fleet_manager": chief.pk})
+                        serializer.is_valid(raise_exception=True)
+                        try:
+                            assign_sending_request(serializer)
+                            assigned += 1
+                        except AssignmentConflict:
+                            conflicts += 1
+                finally:
+                    connection.close()
+                with lock:
+                    stats["assigned"] += assigned
+                    stats["conflicts"] += conflicts
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=len(chiefs)) as executor:
+                list(executor.map(chief_worker, chiefs))
+            elapsed = time.perf_counter() - start
+
+            assignments = SendingRequestFleetAssignment.objects.filter(sending_request__in=request_ids)
+            duplicates = assignments.values("sending_request").annotate(n=Count("id")).filter(n__gt=1).count()
+            notes = DeliveryNote.objects.filter(client=client).count()
+            orphans = notes - assignments.count()
+
+            attempts = stats["assigned"] + stats["conflicts"]
+            self.stdout.write(f"chiefs={len(chiefs)} requests={len(request_ids)} attempts={attempts} "
+                              f"in {elapsed:.2f}s ({attempts / elapsed:.0f} attempts/s, "
+                              f"{stats['assigned'] / elapsed:.0f} assignments/s)")
+            self.stdout.write(f"assigned={stats['assigned']} conflicts={stats['conflicts']} "
+                              f"duplicates={duplicates} orphan_delivery_notes={orphans}")
+            if duplicates or orphans or stats["assigned"] != len(request_ids):
+                raise CommandError("Concurrent assignment is not race-free")
+            self.stdout.write(self.style.SUCCESS("No duplicate assignment, no orphan delivery note"))
+        finally:
+            # Les demandes, bons et assignations suivent en cascade
+            User.objects.filter(username__startswith=f"bench-{suffix}").delete()
+
+    def seed(self, suffix, chief_count, request_count):
+        client = IndividualClient.objects.create(
+            email=f"bench-{suffix}-client@logisty.mg", username=f"bench-{suffix}-client", first_name="Bench",
+            last_name="Client", phone="0340000000", role="client",
+        )
+        chiefs = [
+            ChiefFleet.objects.create(
+                email=f"bench-{suffix}-chief{i}@logisty.mg", username=f"bench-{suffix}-chief{i}", first_name="Bench",
+                last_name=f"Chief {i}", phone="0340000000", role="chief", company_name="Bench",
+            )
+            for i in range(chief_count)
+        ]
+        now = timezone.now()
+        requests = SendingRequest.objects.bulk_create(
+            SendingRequest(
+                client=client, recipient_name="Bench", recipient_email="bench@logisty.mg",
+                recipient_phone="0340000000", cargo_type="other", weight=1, dimensions="1x1x1 cm", quantity=1,
+                pickup_location="Antananarivo", pickup_date_time=now + timedelta(hours=i),
+                delivery_location="Toamasina", delivery_date_time=now + timedelta(hours=i + 8), status="accepted",
+            )
+            for i in range(request_count)
+        )
+        return client, chiefs, [request.pk for request in requests]
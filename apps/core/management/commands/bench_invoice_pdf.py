@@ -0,0 +1,74 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from reportlab import rl_config
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from apps.invoice.pdf import TEMPLATES, render_pdf
+
+# Valeurs des champs d'une facture type, par modele
+SAMPLE_VALUES = {
+    'subscription': (
+        "SUB-INV-0042", "2026-10-01", "Rakoto Jean", "rakoto@logisty.mg", "+261340000000", "Antananarivo",
+        "Pro", "2026-10-01", "2026-11-01", "active", "50000.00 Ar", "mobile_money", "paid",
+    ),
+    'sending_request': (
+        "REQ-INV-0042", "2026-10-01", "Rakoto Jean", "rakoto@logisty.mg", "+261340000000", "Antananarivo",
+        "Rabe Paul", "+261320000000", "rabe@logisty.mg", "pallets_boxes", "120.50 kg", "2", "Antananarivo",
+        "2026-10-02T08:00:00+03:00", "Toamasina", "2026-10-03T08:00:00+03:00", "medium", "157500.00 Ar", "paid",
+    ),
+}
+
+
+def render_lines_pdf(lines):
+    """
+    Rendu d'avant les modeles : chaque texte (libelle compris) redessine avec setFont + drawString, flux en ASCII85.
+    """
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    for font, x, top, text in lines:
+        p.setFont(*font)
+        p.drawString(x, A4[1] - top, text)
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def render_batch(name, count, templated):
+    values = SAMPLE_VALUES[name]
+    # Modele compile hors mesure, comme apres le premier rendu d'un processus
+    render_pdf((name, values))
+    lines = TEMPLATES[name].lines(values)
+    rl_config.useA85 = 0 if templated else 1
+    start = time.perf_counter()
+    for _ in range(count):
+        if templated:
+            render_pdf((name, values))
+        else:
+            render_lines_pdf(lines)
+    return time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = ("Debit du rendu des PDF de factures (factures par seconde et par coeur), avant (drawString par texte) "
+            "et apres les modeles de page precompiles.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=2000, help="Factures rendues par processus")
+        parser.add_argument("--processes", type=int, default=1)
+
+    def handle(self, *args, **options):
+        count, processes = options["count"], options["processes"]
+        self.stdout.write(f"{'invoice':<16} {'before (/s/core)':>17} {'after (/s/core)':>16} {'speedup':>8}")
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            for name in TEMPLATES:
+                before, after = (self.per_core(pool, processes, name, count, templated) for templated in (False, True))
+                self.stdout.write(f"{name:<16} {before:>17.0f} {after:>16.0f} {after / before:>7.2f}x")
+
+    @staticmethod
+    def per_core(pool, processes, name, count, templated):
+        durations = list(pool.map(render_batch, [name] * processes, [count] * processes, [templated] * processes))
+        return sum(count / duration for duration in durations) / processes
@@ -0,0 +1,81 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.core.fast_serializer import ValuesSerializer
+from apps.invoice.models import SendingRequestInvoice
+from apps.invoice.serializers import SendingRequestInvoiceSerializer
+from apps.sendingRequest.models import SendingRequest
+from apps.sendingRequest.serializers import SendingRequestSerializer
+from apps.truck.models import Truck
+from apps.truck.serializers import TruckSerializer
+from apps.users.models import IndividualClient
+
+
+class Command(BaseCommand):
+    help = ("Compare ModelSerializer et ValuesSerializer (SQL + serialisation + rendu JSON) sur des "
+            "donnees synthetiques, annulees a la fin.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'rows':>8}  {'serializer':<32} {'drf (s)':>9} {'fast (s)':>9} {'speedup':>8}")
+        for count in options["rows"]:
+            with transaction.atomic():
+                self.seed(count)
+                cases = [
+                    (SendingRequestSerializer, SendingRequest.objects.select_related('client')),
+                    (TruckSerializer, Truck.objects.all()),
+                    (SendingRequestInvoiceSerializer, SendingRequestInvoice.objects.select_related('client')),
+                ]
+                for serializer_class, queryset in cases:
+                    drf = self.measure(lambda: JSONRenderer().render(serializer_class(queryset, many=True).data))
+                    fast = self.measure(lambda: self.render_fast(serializer_class, queryset))
+                    self.stdout.write(f"{count:>8}  {serializer_class.__name__:<32} "
+                                      f"{drf:>9.3f} {fast:>9.3f} {drf / fast:>7.1f}x")
+                transaction.set_rollback(True)
+
+    @staticmethod
+    def render_fast(serializer_class, queryset):
+        serializer = ValuesSerializer(serializer_class())
+        return JSONRenderer().render(serializer.data(serializer.queryset(queryset)))
+
+    @staticmethod
+    def measure(func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+
+    def seed(self, count):
+        suffix = uuid.uuid4().hex[:8]
+        client = IndividualClient.objects.create(
+            email=f"bench-{suffix}@logisty.mg", username=f"bench-{suffix}", first_name="Bench",
+            last_name="Client", phone="0340000000", role="client", address="Antananarivo",
+        )
+        now = timezone.now()
+        requests = SendingRequest.objects.bulk_create((
+            SendingRequest(
+                client=client, recipient_name=f"Recipient {i}", recipient_email="bench@logisty.mg",
+                recipient_phone="0340000000", cargo_type="pallets_boxes", weight="125.50",
+                dimensions="100x50x30 cm", quantity=i % 20 + 1, pickup_location="Antananarivo",
+                pickup_date_time=now + timedelta(hours=i), delivery_location="Toamasina",
+                delivery_date_time=now + timedelta(hours=i + 12), base_price="150000.00",
+                commission_rate="5.00", total_price="157500.00",
+            )
+            for i in range(count)
+        ), batch_size=5000)
+        Truck.objects.bulk_create((
+            Truck(license_plate=f"B{i:07d}", brand="Isuzu", model="NPR", year=2018, max_load_capacity=5.5)
+            for i in range(count)
+        ), batch_size=5000)
+        SendingRequestInvoice.objects.bulk_create((
+            SendingRequestInvoice(invoice_number=f"BENCH-{suffix}-{i}", client=client, sending_request=request,
+                                  total_ttc="157500.00")
+            for i, request in enumerate(requests)
+        ), batch_size=5000)
@@ -0,0 +1,46 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.location.gazetteer import read_gazetteer
+from apps.location.matrix import DISTANCE, DURATION, compute_block
+from apps.location.models import Location
+from apps.sendingRequest.route_planner import PlanRequest, RoutePlanner, Vehicle
+
+
+class Command(BaseCommand):
+    help = ("Mesure le planificateur de tournees sur une instance synthetique a l'echelle de Madagascar "
+            "(lieux du gazetteer, fenetres sur plusieurs jours), sans base de donnees.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stops", type=int, default=500, help="Nombre d'arrets (2 par demande)")
+        parser.add_argument("--trucks", type=int, default=40)
+        parser.add_argument("--time-limit", type=float, default=3.0)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        towns = [Location(**row) for row in read_gazetteer()]
+        matrix = compute_block(towns, towns)
+        distance, duration = matrix[DISTANCE].tolist(), matrix[DURATION].tolist()
+
+        requests = []
+        for k in range(options["stops"] // 2):
+            pickup, delivery = rng.sample(range(len(towns)), 2)
+            earliest = rng.uniform(0, 3 * 24 * 60)
+            latest = earliest + distance[pickup][delivery] * 1.5 + rng.uniform(24 * 60, 4 * 24 * 60)
+            requests.append(PlanRequest(k, pickup, delivery, earliest, latest, round(rng.uniform(0.5, 8), 1)))
+        vehicles = [Vehicle(k, float(rng.choice([10, 15, 20, 25, 30])), None) for k in range(options["trucks"])]
+
+        start = time.perf_counter()
+        planner = RoutePlanner(requests, vehicles, distance, duration=duration, time_limit=options["time_limit"],
+                               seed=options["seed"]).solve()
+        elapsed = time.perf_counter() - start
+
+        baseline = planner.baseline_distance()
+        saved = baseline - planner.total_distance
+        self.stdout.write(f"stops={len(requests) * 2} trucks={len(vehicles)} time={elapsed:.2f}s "
+                          f"tours={len(planner.routes)} unplanned={len(planner.unplanned)} "
+                          f"distance={planner.total_distance:.0f}km baseline={baseline:.0f}km "
+                          f"saved={saved:.0f}km ({saved / baseline * 100 if baseline else 0:.1f}%)")
@@ -0,0 +1,73 @@
+import random
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.sendingRequest.models import SendingRequest
+from apps.truck.models import Truck
+from apps.truck.recommendation import recommend_trucks, truck_index
+from apps.users.models import ChiefFleet, IndividualClient
+
+
+class Command(BaseCommand):
+    help = ("Mesure le temps de recommandation de camions pour une demande, sur une flotte synthetique "
+            "(annulee a la fin).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--trucks", type=int, default=5000)
+        parser.add_argument("--runs", type=int, default=200)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            chief, requests = self.seed(options["trucks"], options["runs"])
+            truck_index.clear()
+            recommend_trucks(requests[0], chief.pk)  # chargement de l'index
+
+            timings = []
+            for sending_request in requests:
+                start = time.perf_counter()
+                recommend_trucks(sending_request, chief.pk)
+                timings.append((time.perf_counter() - start) * 1000)
+
+            timings.sort()
+            self.stdout.write(f"trucks={options['trucks']} runs={len(timings)} "
+                              f"mean={statistics.mean(timings):.2f}ms "
+                              f"p95={timings[int(len(timings) * 0.95) - 1]:.2f}ms max={timings[-1]:.2f}ms")
+            transaction.set_rollback(True)
+        truck_index.clear()
+
+    def seed(self, truck_count, request_count):
+        suffix = uuid.uuid4().hex[:8]
+        client = IndividualClient.objects.create(
+            email=f"bench-{suffix}-client@logisty.mg", username=f"bench-{suffix}-client", first_name="Bench",
+            last_name="Client", phone="0340000000", role="client",
+        )
+        chief = ChiefFleet.objects.create(
+            email=f"bench-{suffix}-chief@logisty.mg", username=f"bench-{suffix}-chief", first_name="Bench",
+            last_name="Chief", phone="0340000000", role="chief", company_name="Bench",
+        )
+        today = timezone.localdate()
+        Truck.objects.bulk_create(
+            Truck(chief_fleet=chief, license_plate=f"R{i:07d}", brand="Isuzu", model="NPR", year=2018,
+                  max_load_capacity=round(random.uniform(1, 40), 1), mileage=random.randint(0, 400_000),
+                  next_maintenance_due=today + timedelta(days=random.randint(-10, 120)),
+                  status=random.choice(['available'] * 8 + ['maintenance', 'on mission']))
+            for i in range(truck_count)
+        )
+        now = timezone.now()
+        requests = SendingRequest.objects.bulk_create(
+            SendingRequest(
+                client=client, recipient_name="Bench", recipient_email="bench@logisty.mg",
+                recipient_phone="0340000000", cargo_type="other", weight=random.randint(50, 5000),
+                dimensions="1x1x1 cm", quantity=random.randint(1, 8), pickup_location="Antananarivo",
+                pickup_date_time=now + timedelta(days=random.randint(1, 30)), delivery_location="Toamasina",
+                delivery_date_time=now + timedelta(days=31), status="accepted",
+            )
+            for _ in range(request_count)
+        )
+        return chief, requests
@@ -0,0 +1,175 @@
+import json
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.sendingRequest.claims import claim_queue
+from apps.sendingRequest.models import SendingRequest, SendingRequestFleetAssignment
+from apps.sendingRequest.scheduling import free_trucks
+from apps.sendingRequest.search import search_sending_requests
+from apps.subscription.models import Subscription, SubscriptionPlan
+from apps.truck.models import Truck
+from apps.users.models import ChiefFleet, IndividualClient
+
+
+# Recherche verifiee : un numero de telephone, celui d'un seul destinataire des donnees synthetiques (voir `seed`)
+SEARCH_TERMS = "0340000042"
+
+# Chefs de flotte et clients des donnees synthetiques : les lignes d'un chef ou d'un client restent une petite
+# partie de chaque table, comme en production
+SEED_OWNERS = 100
+
+SEED_TOWNS = ("Antananarivo", "Toamasina", "Mahajanga", "Fianarantsoa", "Toliara", "Antsiranana", "Antsirabe",
+              "Morondava", "Ambatondrazaka", "Manakara", "Sambava", "Nosy Be")
+
+
+def hot_queries(client_id, chief_id, sending_request_id):
+    """
+    Requetes les plus frequentes de l'API, avec les memes filtres et le meme ordre que les vues, et l'index que
+    chacune doit utiliser.
+    """
+    return [
+        ("SendingRequest par statut", 'sending_req_status_date_idx',
+         SendingRequest.objects.filter(status="accepted").order_by('-request_date', '-id')[:51]),
+        ("SendingRequest par client", 'sending_req_client_date_idx',
+         SendingRequest.objects.filter(client=client_id).order_by('-request_date', '-id')[:51]),
+        ("Recherche de demandes", 'sending_req_search_idx',
+         search_sending_requests(SendingRequest.objects.all(), SEARCH_TERMS)[:51]),
+        ("Demandes acceptees par volume", 'sending_req_status_volume_idx',
+         SendingRequest.objects.filter(status="accepted", volume__lte=2.0)),
+        ("Prochaine demande de la file des chefs", 'sending_req_claim_queue_idx',
+         claim_queue(timezone.now()).select_for_update(skip_locked=True)[:1]),
+        ("Assignation en cours d'une demande", 'assignment_assigned_req_idx',
+         SendingRequestFleetAssignment.objects.filter(sending_request=sending_request_id, status="assigned")),
+        ("Assignations d'un chef de flotte", 'assignment_manager_status_idx',
+         SendingRequestFleetAssignment.objects.filter(fleet_manager=chief_id)),
+        ("Camions libres d'un chef sur une periode", 'truck_active_chief_idx',
+         free_trucks(chief_id, timezone.now(), timezone.now() + timedelta(days=1))),
+        ("Abonnement actif d'un client", 'subscription_active_client_idx',
+         Subscription.objects.filter(client=client_id, status="active")),
+    ]
+
+
+def index_scans(plan):
+    """
+    Retourne les index parcourus (Index Scan, Index Only Scan, Bitmap Index Scan) dans un plan EXPLAIN
+    (format JSON).
+    """
+    found = set()
+    if "Index Name" in plan:
+        found.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        found |= index_scans(child)
+    return found
+
+
+class Command(BaseCommand):
+    help = ("Lance EXPLAIN sur les requetes critiques et echoue si l'une d'elles n'utilise pas l'index prevu "
+            "(index supprime, ou que le planificateur n'utilise plus).")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help="Inserer N lignes synthetiques par table (annulees a la fin) avant l'analyse",
+        )
+        parser.add_argument(
+            "--disable-seqscan", action="store_true",
+            help="enable_seqscan=off : sur une petite base, verifier seulement que l'index prevu est utilisable "
+                 "(par defaut, le planificateur garde ses reglages et choisit comme en production)",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("This command requires PostgreSQL")
+
+        failures = []
+        with transaction.atomic():
+            if options["seed"]:
+                self.seed(options["seed"])
+            with connection.cursor() as cursor:
+                for table in (SendingRequest, SendingRequestFleetAssignment, Truck, Subscription):
+                    cursor.execute(f'ANALYZE "{table._meta.db_table}"')
+                if options["disable_seqscan"]:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+
+            client_id = SendingRequest.objects.values_list("client", flat=True).first() or uuid.uuid4()
+            chief_id = ChiefFleet.objects.values_list("pk", flat=True).first() or uuid.uuid4()
+            sending_request_id = SendingRequestFleetAssignment.objects.filter(status="assigned").values_list(
+                "sending_request", flat=True).first() or 0
+
+            for label, index, queryset in hot_queries(client_id, chief_id, sending_request_id):
+                plan = json.loads(queryset.explain(format="json"))[0]["Plan"]
+                indexes = index_scans(plan)
+                if index not in indexes:
+                    failures.append(label)
+                    used = ', '.join(sorted(indexes)) or plan['Node Type']
+                    self.stdout.write(self.style.ERROR(f"[NO {index}] {label}: {used}"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"[OK] {label}: {index}"))
+                if options["verbosity"] > 1:
+                    self.stdout.write(queryset.explain())
+
+            # Les donnees synthetiques ne doivent jamais etre gardees
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot query(ies) do not use their index")
+
+    def seed(self, count):
+        clients = [
+            IndividualClient.objects.create(
+                email=f"seed-{uuid.uuid4().hex[:8]}@logisty.mg", username=f"seed-{uuid.uuid4().hex[:8]}",
+                first_name="Seed", last_name="Client", phone="0340000000", role="client",
+            )
+            for _ in range(SEED_OWNERS)
+        ]
+        chiefs = [
+            ChiefFleet.objects.create(
+                email=f"seed-{uuid.uuid4().hex[:8]}@logisty.mg", username=f"seed-{uuid.uuid4().hex[:8]}",
+                first_name="Seed", last_name="Chief", phone="0340000000", role="chief", company_name="Seed",
+            )
+            for _ in range(SEED_OWNERS)
+        ]
+        plan = SubscriptionPlan.objects.create(name="Seed", description="Seed", price=0, duration_month=1)
+        now = timezone.now()
+        # Les demandes acceptees (en attente d'un chef) sont une petite partie de la table
+        statuses = [value for value, _ in SendingRequest.STATUS_CHOICES if value != "accepted"]
+
+        requests = SendingRequest.objects.bulk_create(
+            SendingRequest(
+                client=clients[i % SEED_OWNERS], recipient_name=f"Destinataire {i:06d}",
+                recipient_email="seed@logisty.mg", recipient_phone=f"034{i:07d}", cargo_type="other", weight=1,
+                dimensions="1x1x1 cm", quantity=1,
+                pickup_location=SEED_TOWNS[i % len(SEED_TOWNS)], pickup_date_time=now + timedelta(hours=i),
+                delivery_location=SEED_TOWNS[i * 7 % len(SEED_TOWNS)], delivery_date_time=now + timedelta(hours=i + 8),
+                status="accepted" if i % 50 == 0 else statuses[i % len(statuses)],
+            )
+            for i in range(count)
+        )
+        SendingRequestFleetAssignment.objects.bulk_create(
+            SendingRequestFleetAssignment(sending_request=request, fleet_manager=chiefs[i % SEED_OWNERS],
+                                          status="completed" if i % 10 else "assigned")
+            for i, request in enumerate(requests)
+        )
+        Truck.objects.bulk_create(
+            Truck(chief_fleet=chiefs[i % SEED_OWNERS], license_plate=f"S{i:07d}"[:10], brand="Seed", model="Seed",
+                  year=2020, max_load_capacity=10, is_active=bool(i % 10))
+            for i in range(count)
+        )
+        Subscription.objects.bulk_create(
+            Subscription(client=clients[i % SEED_OWNERS], sub_plan=plan,
+                         status="active" if i < SEED_OWNERS else "expired")
+            for i in range(count)
+        )
+        # Les lignes inserees en masse restent dans la liste d'attente des index GIN (fastupdate), que le
+        # planificateur compte comme a parcourir ; en production, l'autovacuum la vide
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT gin_clean_pending_list(i.indexrelid) FROM pg_index i "
+                "JOIN pg_class c ON c.oid = i.indexrelid JOIN pg_am a ON a.oid = c.relam "
+                "WHERE a.amname = 'gin' AND i.indrelid = %s::regclass",
+                [f'"{SendingRequest._meta.db_table}"'],
+            )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.sendingRequest.changes import compact_changes
+
+
+class Command(BaseCommand):
+    help = ("Supprime les entrees du journal des assignations remplacees par une entree plus recente "
+            "(la synchronisation `?since=` renvoie le meme resultat).")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{compact_changes()} superseded changes deleted")
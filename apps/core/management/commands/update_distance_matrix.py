@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.location.matrix import matrix_path, update_distance_matrix
+
+
+class Command(BaseCommand):
+    help = ("Ajoute les nouveaux lieux a la matrice des distances partagee par les workers "
+            "(ou la recalcule entierement avec --rebuild).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild", action="store_true", help="Recalculer toute la matrice")
+
+    def handle(self, *args, **options):
+        size, added = update_distance_matrix(rebuild=options["rebuild"])
+        self.stdout.write(f"{matrix_path()}: {size} locations, {added} added")
@@ -0,0 +1,141 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from drf_yasg import openapi
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination par curseur opaque sur un couple (date, id).
+
+    Contrairement a OFFSET, la page suivante est recuperee avec un filtre
+    `(date, id) < (derniere_date, dernier_id)` : le cout d'une page profonde
+    est le meme que celui de la premiere page tant que l'index (date, id) existe.
+    """
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    date_field = 'request_date'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def key_fields(self):
+        """
+        Cle de pagination, triee par ordre decroissant, et conversion de chaque valeur lue dans le curseur.
+        """
+        return ((self.date_field, parse_datetime), ('id', int))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        fields = [field for field, _ in self.key_fields()]
+        queryset = queryset.order_by(*(f'-{field}' for field in fields))
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            # (a, b, c) < (x, y, z) : a < x, ou a = x et b < y, ou a = x, b = y et c < z
+            after = Q()
+            for index, field in enumerate(fields):
+                after |= Q(**dict(zip(fields[:index], position)), **{f'{field}__lt': position[index]})
+            queryset = queryset.filter(after)
+
+        # Une ligne de plus pour savoir s'il existe une page suivante
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(last))
+
+    def encode_cursor(self, row):
+        values = (getattr(row, field) for field, _ in self.key_fields())
+        raw = '|'.join(value.isoformat() if hasattr(value, 'isoformat') else str(value) for value in values)
+        return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        parsers = [parse for _, parse in self.key_fields()]
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            values = raw.split('|')
+            if len(values) != len(parsers):
+                raise ValueError
+            position = [parse(value) for parse, value in zip(parsers, values)]
+        except (binascii.Error, UnicodeError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+
+class RankedKeysetPagination(KeysetPagination):
+    """
+    Pagination par curseur des resultats classes par pertinence, sur le triplet (rang, date, id).
+
+    Le rang n'est pas indexe : chaque page recalcule le rang des lignes trouvees, mais ne renvoie que celles
+    qui suivent le curseur, sans OFFSET.
+    """
+    rank_field = 'rank'
+
+    def key_fields(self):
+        return ((self.rank_field, float), *super().key_fields())
+
+
+def paginated_parameters():
+    """
+    Parametres swagger communs aux listes paginees par curseur.
+    """
+    return [
+        openapi.Parameter(
+            KeysetPagination.cursor_query_param,
+            openapi.IN_QUERY,
+            description="Curseur opaque renvoye dans `next`",
+            type=openapi.TYPE_STRING,
+            required=False
+        ),
+        openapi.Parameter(
+            KeysetPagination.page_size_query_param,
+            openapi.IN_QUERY,
+            description=f"Nombre d'elements par page (max {KeysetPagination.max_page_size})",
+            type=openapi.TYPE_INTEGER,
+            required=False
+        ),
+    ]
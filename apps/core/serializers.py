@@ -0,0 +1,74 @@
+from drf_yasg import openapi
+
+
+class DynamicFieldsMixin:
+    """
+    Serializer acceptant une selection de champs (`?fields=`) et de relations imbriquees (`?expand=`).
+
+    - sans `fields` ni `expand` : representation complete, comme avant ;
+    - `fields=a,b` : seulement ces champs (`fields=summary` donne `summary_fields`) ;
+    - `expand=client` : ajoute le detail imbrique declare dans `expandable_fields`.
+    """
+    # nom d'expansion -> champ imbrique (ex. {'client': 'client_details'})
+    expandable_fields = {}
+    # representation compacte pour les listes
+    summary_fields = ()
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None and expand is None:
+            return
+
+        selected = self.selected_fields(fields, expand)
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+
+    def selected_fields(self, fields, expand):
+        expanded = {self.expandable_fields[name] for name in (expand or []) if name in self.expandable_fields}
+        nested = set(self.expandable_fields.values())
+
+        if fields is None:
+            return (set(self.fields) - nested) | expanded
+
+        requested = set()
+        for name in fields:
+            requested.update(self.summary_fields if name == 'summary' else [name])
+        return (requested - nested) | expanded
+
+
+def fieldset_from_request(request):
+    """
+    Lit `?fields=` et `?expand=` (listes separees par des virgules) pour un DynamicFieldsMixin.
+    """
+    options = {}
+    for param in ('fields', 'expand'):
+        value = request.query_params.get(param)
+        if value is not None:
+            options[param] = [name.strip() for name in value.split(',') if name.strip()]
+    return options
+
+
+def fieldset_parameters(serializer_class):
+    """
+    Parametres swagger pour les listes supportant `?fields=` et `?expand=`.
+    """
+    parameters = [
+        openapi.Parameter(
+            'fields',
+            openapi.IN_QUERY,
+            description="Champs a renvoyer, separes par des virgules (`summary` pour la version compacte : "
+                        f"{', '.join(serializer_class.summary_fields)})",
+            type=openapi.TYPE_STRING,
+            required=False
+        ),
+    ]
+    if serializer_class.expandable_fields:
+        parameters.append(openapi.Parameter(
+            'expand',
+            openapi.IN_QUERY,
+            description=f"Details imbriques a inclure ({', '.join(serializer_class.expandable_fields)})",
+            type=openapi.TYPE_STRING,
+            required=False
+        ))
+    return parameters
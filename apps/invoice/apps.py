@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class InvoiceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.invoice'
+
+    def ready(self):
+        # Suppression des PDF en cache des factures modifiees
+        from apps.invoice import signals  # noqa: F401
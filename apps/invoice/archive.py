@@ -0,0 +1,97 @@
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.invoice.pdf import invoice_pdf_cache, render_to_file
+from apps.invoice.rendering import INVOICE_KINDS, process_pool
+
+# Nombre de factures lues par le curseur serveur
+ARCHIVE_CHUNK_SIZE = 500
+
+# Rendus en attente par processus : borne les PDF gardes en memoire avant d'etre ajoutes au ZIP
+ARCHIVE_PENDING_PER_WORKER = 4
+
+
+class ZipStream:
+    """
+    Pseudo-fichier non seekable pour zipfile : ce qui est ecrit est repris par `drain` et envoye au client.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def archive_entry(kind, invoice):
+    date_time = timezone.localtime(invoice.created_at).timetuple()[:6]
+    return zipfile.ZipInfo(f"{kind}/{invoice.invoice_number}.pdf", date_time=date_time)
+
+
+def cached_pdf(path):
+    try:
+        with open(path, 'rb') as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+def invoice_archive_chunks(selections):
+    """
+    Archive ZIP des factures de `selections` ((type, queryset) ...), par morceaux.
+
+    Les PDF deja en cache sont lus sur le disque, les autres sont rendus en parallele dans un pool de processus
+    (et enregistres dans le cache). Chaque PDF est ajoute au ZIP des qu'il est pret, sans compression (le contenu
+    des pages est deja compresse). Au plus ARCHIVE_PENDING_PER_WORKER rendus par processus sont en attente et les
+    factures sont lues par un curseur serveur : la memoire ne depend pas du nombre de factures.
+    """
+    workers = settings.INVOICE_ARCHIVE_WORKERS
+    pool = process_pool(workers) if workers != 0 else None
+    max_pending = ARCHIVE_PENDING_PER_WORKER * (workers or os.cpu_count() or 1)
+    stream = ZipStream()
+    archive = zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED)
+    pending = {}  # Future -> entree du ZIP
+
+    def add_finished():
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for job in done:
+            archive.writestr(pending.pop(job), job.result())
+
+    try:
+        for kind, invoices in selections:
+            lines_of = INVOICE_KINDS[kind][1]
+            for invoice in invoices.iterator(chunk_size=ARCHIVE_CHUNK_SIZE):
+                lines = lines_of(invoice)
+                path = invoice_pdf_cache.path(kind, invoice.pk, lines)
+                content = cached_pdf(path)
+                if content is None and pool is None:
+                    content = render_to_file(lines, str(path))
+                if content is not None:
+                    archive.writestr(archive_entry(kind, invoice), content)
+                else:
+                    pending[pool.submit(render_to_file, lines, str(path))] = archive_entry(kind, invoice)
+                    if len(pending) >= max_pending:
+                        add_finished()
+                yield stream.drain()
+        while pending:
+            add_finished()
+            yield stream.drain()
+        archive.close()
+        yield stream.drain()
+    finally:
+        # Client deconnecte : les rendus pas encore commences sont abandonnes
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
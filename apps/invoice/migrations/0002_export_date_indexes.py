@@ -0,0 +1,24 @@
+# Generated by Django 5.1.5 on 2026-10-18 10:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoice', '0001_initial'),
+        ('sendingRequest', '0007_updated_at'),
+        ('subscription', '0005_hot_lookup_indexes'),
+        ('users', '0010_alter_member_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sendingrequestinvoice',
+            index=models.Index(fields=['created_at', 'id'], name='req_invoice_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscriptioninvoice',
+            index=models.Index(fields=['created_at', 'id'], name='sub_invoice_created_idx'),
+        ),
+    ]
@@ -36,6 +36,12 @@ class SubscriptionInvoice(models.Model):
     def __str__(self):
         return f"Subscription Invoice {self.invoice_number} - {self.total_ttc} Ar"
 
+    class Meta:
+        indexes = [
+            # Exports par periode (apps.invoice.views_export)
+            models.Index(fields=['created_at', 'id'], name='sub_invoice_created_idx'),
+        ]
+
 
 class SendingRequestInvoice(models.Model):
     invoice_number = models.CharField(max_length=50, unique=True, editable=False)
@@ -55,3 +61,9 @@ class SendingRequestInvoice(models.Model):
 
     def __str__(self):
         return f"Sending Request Invoice {self.invoice_number} - {self.total_ttc} Ar"
+
+    class Meta:
+        indexes = [
+            # Exports par periode (apps.invoice.views_export)
+            models.Index(fields=['created_at', 'id'], name='req_invoice_created_idx'),
+        ]
@@ -0,0 +1,316 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from functools import cached_property
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from reportlab import rl_config
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from rest_framework import serializers
+
+from apps.invoice.models import SendingRequestInvoice, SubscriptionInvoice
+from apps.subscription.models import Subscription
+
+# A incrementer quand le dessin change (hors textes) : les PDF deja en cache ne sont plus servis
+LAYOUT_VERSION = 2
+
+# Flux compresses sans encodage ASCII85 (plus gros, et le plus long a produire sans l'extension C de ReportLab)
+rl_config.useA85 = 0
+
+TITLE = ("Helvetica-Bold", 16)
+TEXT = ("Helvetica", 12)
+
+# Dates et heures au meme format que l'API
+datetime_field = serializers.DateTimeField()
+
+
+def text_object(p, texts):
+    """
+    Textes (police, x, distance au haut de la page, texte) dans un seul objet texte (BT ... ET), la police
+    n'etant changee que si elle differe de la precedente.
+    """
+    height = A4[1]
+    text = p.beginText()
+    current = None
+    for font, x, top, value in texts:
+        if font != current:
+            text.setFont(*font)
+            current = font
+        text.setTextOrigin(x, height - top)
+        text.textOut(value)
+    return text
+
+
+def draw_texts(p, texts):
+    p.drawText(text_object(p, texts))
+
+
+class PageTemplate:
+    """
+    Partie fixe d'une page (titre, intitules, libelles des champs). Ses operateurs PDF sont generes une fois par
+    processus puis recopies tels quels dans chaque document : pour chaque facture, seules les valeurs des champs
+    sont dessinees.
+    """
+
+    def __init__(self, name, texts, fields):
+        self.name = name
+        self.texts = texts  # (police, x, distance au haut de la page, texte)
+        self.fields = fields  # (police, x, distance au haut de la page, libelle) : la valeur suit le libelle
+
+    @property
+    def static_texts(self):
+        return [*self.texts, *self.fields]
+
+    @cached_property
+    def fonts(self):
+        return list(dict.fromkeys(font for font, _, _, _ in self.static_texts))
+
+    @cached_property
+    def code(self):
+        # Noms internes des polices (/F1, /F2...) : attribues dans l'ordre de `fonts`, voir `draw`
+        return text_object(canvas.Canvas(BytesIO(), pagesize=A4), self.static_texts).getCode()
+
+    @cached_property
+    def value_positions(self):
+        # Largeur des libelles calculee une fois par processus
+        return [(font, x + stringWidth(f"{label} ", *font), top) for font, x, top, label in self.fields]
+
+    def lines(self, values):
+        """
+        Tous les textes de la page avec les valeurs `values` des champs.
+        """
+        return [*self.texts, *((font, x, top, f"{label} {value}")
+                               for (font, x, top, label), value in zip(self.fields, values))]
+
+    def draw(self, p):
+        """
+        Recopie la partie fixe dans la page de `p`, un canvas neuf : les polices y sont declarees dans le meme
+        ordre que pour `code`, donc sous les memes noms internes.
+        """
+        for font in self.fonts:
+            p.setFont(*font)
+        p.addLiteral(self.code)
+
+    def draw_values(self, p, values):
+        draw_texts(p, [(font, x, top, value) for (font, x, top), value in zip(self.value_positions, values)])
+
+
+CLIENT_TEXTS = [(TEXT, 50, 160, "Informations du client:")]
+
+CLIENT_FIELDS = [
+    (TEXT, 70, 180, "Nom:"),
+    (TEXT, 70, 200, "Email:"),
+    (TEXT, 70, 220, "Téléphone:"),
+    (TEXT, 70, 240, "Adresse:"),
+]
+
+INVOICE_FIELDS = [
+    (TEXT, 50, 100, "Numéro de facture:"),
+    (TEXT, 50, 120, "Date de création:"),
+]
+
+TEMPLATES = {template.name: template for template in (
+    PageTemplate('subscription', [
+        (TITLE, 200, 50, "FACTURE D'ABONNEMENT"),
+        *CLIENT_TEXTS,
+        (TEXT, 50, 280, "Détails de l'abonnement:"),
+        (TEXT, 50, 400, "Informations de paiement:"),
+    ], [
+        *INVOICE_FIELDS,
+        *CLIENT_FIELDS,
+        (TEXT, 70, 300, "Nom du plan:"),
+        (TEXT, 70, 320, "Date de début:"),
+        (TEXT, 70, 340, "Date de fin:"),
+        (TEXT, 70, 360, "Statut:"),
+        (TEXT, 70, 420, "Montant total:"),
+        (TEXT, 70, 440, "Méthode de paiement:"),
+        (TEXT, 70, 460, "Statut de paiement:"),
+    ]),
+    PageTemplate('sending_request', [
+        (TITLE, 200, 50, "FACTURE DE DEMANDE D'ENVOI"),
+        *CLIENT_TEXTS,
+        (TEXT, 50, 280, "Détails de l'envoi:"),
+        (TEXT, 50, 540, "Informations de paiement:"),
+    ], [
+        *INVOICE_FIELDS,
+        *CLIENT_FIELDS,
+        (TEXT, 70, 300, "Destinataire:"),
+        (TEXT, 70, 320, "Téléphone:"),
+        (TEXT, 70, 340, "Email:"),
+        (TEXT, 70, 360, "Type de colis:"),
+        (TEXT, 70, 380, "Poids:"),
+        (TEXT, 70, 400, "Quantité:"),
+        (TEXT, 70, 420, "Lieu de prise en charge:"),
+        (TEXT, 70, 440, "Date de prise en charge:"),
+        (TEXT, 70, 460, "Lieu de livraison:"),
+        (TEXT, 70, 480, "Date de livraison:"),
+        (TEXT, 70, 500, "Priorité:"),
+        (TEXT, 70, 560, "Montant total:"),
+        (TEXT, 70, 600, "Statut de paiement:"),
+    ]),
+)}
+
+
+def field_values(*values):
+    # Champs vides (adresse du client...) : rien apres le libelle
+    return tuple("" if value is None else str(value) for value in values)
+
+
+def invoice_values(invoice):
+    client = invoice.client
+    return [
+        invoice.invoice_number,
+        timezone.localdate(invoice.created_at).isoformat(),
+        f"{client.first_name} {client.last_name}",
+        client.email,
+        client.phone,
+        client.address,
+    ]
+
+
+def subscription_invoice_lines(invoice):
+    """
+    Contenu de la facture d'abonnement : (modele, valeurs des champs dans l'ordre du modele). L'abonnement actif
+    du client est lu dans les annotations `active_*` (voir `subscription_invoices`). L'abonnement facture peut
+    avoir ete supprime (SET_NULL) : nom du plan vide.
+    """
+    return 'subscription', field_values(
+        *invoice_values(invoice),
+        invoice.sub_plan.sub_plan.name if invoice.sub_plan is not None else None,
+        invoice.active_start_date,
+        invoice.active_end_date,
+        invoice.active_status,
+        f"{invoice.total_ttc} Ar",
+        invoice.payment_method,
+        invoice.status,
+    )
+
+
+def sending_request_details(sending_request):
+    if sending_request is None:
+        # Demande supprimee par le client (SET_NULL) : details de l'envoi vides
+        return (None,) * 11
+    return (
+        sending_request.recipient_name,
+        sending_request.recipient_phone,
+        sending_request.recipient_email,
+        sending_request.cargo_type,
+        f"{sending_request.weight} kg",
+        sending_request.quantity,
+        sending_request.pickup_location,
+        datetime_field.to_representation(sending_request.pickup_date_time),
+        sending_request.delivery_location,
+        datetime_field.to_representation(sending_request.delivery_date_time),
+        sending_request.priority,
+    )
+
+
+def sending_request_invoice_lines(invoice):
+    return 'sending_request', field_values(
+        *invoice_values(invoice),
+        *sending_request_details(invoice.sending_request),
+        f"{invoice.total_ttc} Ar",
+        invoice.status,
+    )
+
+
+def render_pdf(lines):
+    name, values = lines
+    template = TEMPLATES[name]
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    template.draw(p)
+    template.draw_values(p, values)
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def write_pdf(path, content):
+    """
+    Enregistre un PDF du cache et supprime les autres versions de la meme facture.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Ecrit a cote puis renomme : un autre worker ne lit jamais un PDF a moitie ecrit
+    fd, temporary = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as file:
+        file.write(content)
+    os.replace(temporary, path)
+    for other in path.parent.glob('*.pdf'):
+        if other != path:
+            other.unlink(missing_ok=True)
+
+
+def render_to_file(lines, path):
+    """
+    Rendu d'un PDF du cache, execute dans un processus d'un pool (apps.invoice.rendering, apps.invoice.archive) :
+    sans acces a la base. Renvoie le contenu du PDF.
+    """
+    content = render_pdf(lines)
+    write_pdf(Path(path), content)
+    return content
+
+
+def lines_digest(lines):
+    return hashlib.sha256(repr((LAYOUT_VERSION, lines)).encode()).hexdigest()
+
+
+def subscription_invoices():
+    """
+    Factures d'abonnement avec tout ce que le PDF affiche, en une seule requete (l'abonnement actif du client
+    en sous-requetes).
+    """
+    active = Subscription.objects.filter(client=OuterRef('client'), status='active').order_by('-start_date', '-id')
+    return SubscriptionInvoice.objects.select_related('client', 'sub_plan__sub_plan').annotate(
+        **{f'active_{field}': Subquery(active.values(field)[:1]) for field in ('start_date', 'end_date', 'status')})
+
+
+def sending_request_invoices():
+    return SendingRequestInvoice.objects.select_related('client', 'sending_request')
+
+
+class InvoicePdfCache:
+    """
+    PDF des factures sur disque, nommes par le hash de tout ce qui est dessine : une facture, une demande ou
+    un client modifies (meme par un UPDATE sans signal) donnent un autre nom, jamais un PDF perime.
+    Un seul PDF est garde par facture ; les signaux de apps.invoice suppriment ceux des factures modifiees.
+    """
+
+    def __init__(self, root=None):
+        self._root = root
+
+    @property
+    def root(self):
+        return Path(self._root or settings.INVOICE_PDF_CACHE_DIR)
+
+    def directory(self, kind, pk):
+        return self.root / kind / str(pk)
+
+    def path(self, kind, pk, lines):
+        return self.directory(kind, pk) / f"{lines_digest(lines)}.pdf"
+
+    def open(self, kind, pk, lines):
+        """
+        Fichier du PDF en cache (ouvert en binaire, a envoyer tel quel), rendu et enregistre au premier appel.
+        """
+        path = self.path(kind, pk, lines)
+        try:
+            return open(path, 'rb')
+        except FileNotFoundError:
+            content = render_pdf(lines)
+            write_pdf(path, content)
+            return BytesIO(content)
+
+    def invalidate(self, kind, pks):
+        for pk in pks:
+            shutil.rmtree(self.directory(kind, pk), ignore_errors=True)
+
+
+invoice_pdf_cache = InvoicePdfCache()
@@ -0,0 +1,111 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.db import transaction
+
+from apps.invoice.pdf import invoice_pdf_cache, render_to_file, sending_request_invoice_lines, \
+    sending_request_invoices, subscription_invoice_lines, subscription_invoices
+
+# Type de facture -> (factures avec les donnees du PDF, lignes du PDF)
+INVOICE_KINDS = {
+    'subscription': (subscription_invoices, subscription_invoice_lines),
+    'sending_request': (sending_request_invoices, sending_request_invoice_lines),
+}
+
+
+def process_pool(max_workers):
+    """
+    Pool de processus de rendu. Les processus viennent d'un serveur forkserver et non d'un fork du worker web :
+    ils n'heritent ni de ses threads, ni de ses verrous, ni de ses connexions a la base. Chacun initialise Django
+    avant de recevoir son premier rendu (les fonctions de rendu importent les modeles).
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('forkserver'),
+                               initializer=django.setup)
+
+
+class RenderQueue:
+    """
+    Rendu des PDF de factures en arriere-plan, dans un pool de processus local (ReportLab est limite par le CPU
+    et le GIL). Le resultat est le fichier du cache (apps.invoice.pdf) : n'importe quel worker web voit qu'un
+    rendu est termine, seul celui qui l'a lance connait un rendu en cours ou en echec.
+
+    Avec INVOICE_RENDER_WORKERS = 0, le rendu est fait tout de suite dans le processus courant.
+    """
+
+    def __init__(self):
+        self.pool = None
+        self.jobs = {}  # chemin du PDF -> Future
+        self.lock = threading.Lock()
+
+    def executor(self):
+        # Cree au premier rendu, donc apres le fork des workers web
+        if self.pool is None:
+            self.pool = process_pool(settings.INVOICE_RENDER_WORKERS)
+        return self.pool
+
+    def submit(self, path, lines):
+        if path.exists():
+            return
+        if not settings.INVOICE_RENDER_WORKERS:
+            render_to_file(lines, str(path))
+            return
+        with self.lock:
+            job = self.jobs.get(path)
+            if job is not None and not job.done():
+                return
+            job = self.jobs[path] = self.executor().submit(render_to_file, lines, str(path))
+        job.add_done_callback(lambda done: self.forget(path, done))
+
+    def forget(self, path, job):
+        # Les echecs sont gardes pour etre signales par `status`
+        if job.exception() is None:
+            with self.lock:
+                if self.jobs.get(path) is job:
+                    del self.jobs[path]
+
+    def status(self, path):
+        """
+        'done', 'pending', 'failed' (l'echec est oublie une fois signale), ou None si ce worker ne connait pas
+        le rendu.
+        """
+        if path.exists():
+            return 'done'
+        with self.lock:
+            job = self.jobs.get(path)
+            if job is None:
+                return None
+            if not job.done():
+                return 'pending'
+            del self.jobs[path]
+        return 'failed' if job.exception() is not None else None
+
+
+render_queue = RenderQueue()
+
+
+def enqueue_render(kind, invoice):
+    """
+    Lance le rendu du PDF de `invoice` s'il n'est pas deja en cache ; renvoie le chemin du PDF attendu.
+    """
+    lines = INVOICE_KINDS[kind][1](invoice)
+    path = invoice_pdf_cache.path(kind, invoice.pk, lines)
+    render_queue.submit(path, lines)
+    return path
+
+
+def prerender_invoices(kind, pks):
+    """
+    Pre-rendu des factures qui viennent d'etre creees, apres le commit (une requete pour toutes les factures).
+    """
+    pks = list(pks)
+
+    def enqueue():
+        for invoice in INVOICE_KINDS[kind][0]().filter(pk__in=pks):
+            enqueue_render(kind, invoice)
+
+    if pks:
+        # robust : un pre-rendu en echec ne fait pas echouer la creation de la facture (il sera refait a la demande)
+        transaction.on_commit(enqueue, robust=True)
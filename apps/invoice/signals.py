@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.invoice.models import SendingRequestInvoice, SubscriptionInvoice
+from apps.invoice.pdf import invoice_pdf_cache
+from apps.sendingRequest.models import SendingRequest
+from apps.subscription.models import Subscription
+
+
+@receiver(post_save, sender=SubscriptionInvoice)
+@receiver(post_delete, sender=SubscriptionInvoice)
+def subscription_invoice_changed(sender, instance, **kwargs):
+    invoice_pdf_cache.invalidate('subscription', [instance.pk])
+
+
+@receiver(post_save, sender=SendingRequestInvoice)
+@receiver(post_delete, sender=SendingRequestInvoice)
+def sending_request_invoice_changed(sender, instance, **kwargs):
+    invoice_pdf_cache.invalidate('sending_request', [instance.pk])
+
+
+@receiver(post_save, sender=SendingRequest)
+def sending_request_changed(sender, instance, created, **kwargs):
+    if not created:
+        invoices = SendingRequestInvoice.objects.filter(sending_request=instance.pk)
+        invoice_pdf_cache.invalidate('sending_request', invoices.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def subscription_changed(sender, instance, **kwargs):
+    # L'abonnement actif du client est affiche sur toutes ses factures d'abonnement
+    invoices = SubscriptionInvoice.objects.filter(client=instance.client_id)
+    invoice_pdf_cache.invalidate('subscription', invoices.values_list('pk', flat=True))
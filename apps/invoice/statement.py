@@ -0,0 +1,243 @@
+import datetime
+import math
+import zlib
+from io import BytesIO
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from apps.invoice.pdf import TEXT, TITLE, text_object
+from apps.sendingRequest.models import SendingRequest
+
+# Demandes facturees sur le releve
+STATEMENT_STATUSES = ('accepted', 'in_progress', 'completed')
+
+# Nombre de demandes lues par le curseur serveur
+STATEMENT_CHUNK_SIZE = 2000
+
+LINES_PER_PAGE = 40
+LINE_HEIGHT = 16
+
+SMALL = ("Helvetica", 9)
+SMALL_BOLD = ("Helvetica-Bold", 9)
+
+# Colonnes des lignes du releve : (titre, x, aligne a droite)
+COLUMNS = (
+    ("Date", 40, False),
+    ("Demande", 105, False),
+    ("Destinataire", 160, False),
+    ("Type de colis", 330, False),
+    ("Poids (kg)", 480, True),
+    ("Montant (Ar)", 555, True),
+)
+
+cargo_types = dict(SendingRequest.CARGO_TYPE_CHOICES)
+
+
+def month_bounds(month):
+    """
+    Debut et fin (exclue) du mois de la date `month`, dans le fuseau du projet.
+    """
+    start = datetime.date(month.year, month.month, 1)
+    end = (start + datetime.timedelta(days=31)).replace(day=1)
+    return tuple(timezone.make_aware(datetime.datetime.combine(day, datetime.time.min)) for day in (start, end))
+
+
+def statement_requests(company, month):
+    start, end = month_bounds(month)
+    return SendingRequest.objects.filter(client=company, request_date__gte=start, request_date__lt=end,
+                                         status__in=STATEMENT_STATUSES)
+
+
+def statement_totals(requests):
+    """
+    Sous-totaux par type de colis et total general, calcules par PostgreSQL.
+    """
+    totals = {'count': Count('id'), 'weight': Sum('weight'), 'amount': Sum('total_price')}
+    subtotals = list(requests.order_by('cargo_type').values('cargo_type').annotate(**totals))
+    return subtotals, requests.aggregate(**totals)
+
+
+def amount(value):
+    return "-" if value is None else f"{value:.2f}"
+
+
+def row_texts(top, cells, font=SMALL):
+    """
+    Textes d'une ligne du tableau (pour `draw_texts`), alignes selon COLUMNS.
+    """
+    return [(font, x - stringWidth(text, *font) if right else x, top, text)
+            for (_, x, right), text in zip(COLUMNS, cells)]
+
+
+class StreamedPdf:
+    """
+    PDF ecrit au fil de l'eau dans `file` : chaque page est compressee et ecrite des qu'elle est terminee. Seuls
+    les decalages des objets (table xref) et les numeros des pages restent en memoire, quelques octets par page.
+
+    Canvas de ReportLab garde toutes les pages jusqu'a `save()` : il ne sert ici qu'a produire les operateurs
+    des objets texte (`text_object`), les objets du document sont ecrits par cette classe.
+    """
+
+    # Polices standard, declarees dans cet ordre sur le canvas de brouillon (Helvetica y est toujours /F1)
+    FONTS = ("Helvetica", "Helvetica-Bold")
+
+    # Polices standard a encodage propre (pas de WinAnsiEncoding)
+    SYMBOL_FONTS = ("Symbol", "ZapfDingbats")
+
+    def __init__(self, file, title):
+        self.file = file
+        self.position = 0
+        self.offsets = {}  # numero d'objet -> decalage dans le fichier
+        self.pages = []
+        self.forms = {}
+        self.fonts = {}  # nom de la police dans les pages (/F1 ...) -> numero d'objet
+        self.scratch = canvas.Canvas(BytesIO(), pagesize=A4)
+        for name in self.FONTS:
+            self.scratch.setFont(name, 12)
+        self.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        # 1 : catalogue, 2 : arbre des pages, ecrits a la fin
+        self.next_number = 3
+        self.info = self.add_object(f"<< /Title {self.pdf_text(title)} /Producer (Logisty) >>")
+
+    def font_dictionary(self, name):
+        encoding = "" if name in self.SYMBOL_FONTS else " /Encoding /WinAnsiEncoding"
+        return f"<< /Type /Font /Subtype /Type1 /BaseFont /{name}{encoding} >>"
+
+    @staticmethod
+    def pdf_text(value):
+        return f"<{(chr(0xfeff) + value).encode('utf-16-be').hex()}>"
+
+    def write(self, data):
+        self.file.write(data)
+        self.position += len(data)
+
+    def add_object(self, body, stream=None, number=None):
+        if number is None:
+            number, self.next_number = self.next_number, self.next_number + 1
+        self.offsets[number] = self.position
+        if stream is None:
+            self.write(f"{number} 0 obj\n{body}\nendobj\n".encode())
+        else:
+            stream = zlib.compress(stream.encode('latin-1'))
+            self.write(f"{number} 0 obj\n<< {body} /Filter /FlateDecode /Length {len(stream)} >>\nstream\n".encode())
+            self.write(stream)
+            self.write(b"\nendstream\nendobj\n")
+        return number
+
+    def resources(self):
+        """
+        Ressources d'une page ou d'un form, a calculer apres son contenu : toutes les polices deja utilisees sur le
+        canvas de brouillon, y compris celle que ReportLab prend pour les caracteres hors WinAnsi (ZapfDingbats).
+        """
+        for name, internal_name in self.scratch._doc.fontMapping.items():
+            if internal_name not in self.fonts:
+                self.fonts[internal_name] = self.add_object(self.font_dictionary(name))
+        fonts = ' '.join(f"{internal_name} {number} 0 R" for internal_name, number in self.fonts.items())
+        forms = ' '.join(f"/{name} {number} 0 R" for name, number in self.forms.items())
+        return f"<< /Font << {fonts} >> /XObject << {forms} >> /ProcSet [/PDF /Text] >>"
+
+    def code(self, texts):
+        return text_object(self.scratch, texts).getCode()
+
+    def add_form(self, name, texts):
+        """
+        Form XObject : ecrit une fois, dessine sur une page par `page(..., form=name)`.
+        """
+        code = self.code(texts)
+        self.forms[name] = self.add_object(
+            f"/Type /XObject /Subtype /Form /BBox [0 0 {A4[0]:.4f} {A4[1]:.4f}] /Resources {self.resources()}",
+            code)
+
+    def add_page(self, texts, form=None):
+        content = self.code(texts)
+        if form is not None:
+            content = f"q /{form} Do Q\n{content}"
+        contents = self.add_object("", content)
+        self.pages.append(self.add_object(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {A4[0]:.4f} {A4[1]:.4f}] /Resources {self.resources()} "
+            f"/Contents {contents} 0 R >>"))
+
+    def close(self):
+        kids = ' '.join(f"{number} 0 R" for number in self.pages)
+        self.add_object(f"<< /Type /Pages /Kids [{kids}] /Count {len(self.pages)} >>", number=2)
+        self.add_object("<< /Type /Catalog /Pages 2 0 R >>", number=1)
+        xref = self.position
+        size = self.next_number
+        self.write(f"xref\n0 {size}\n0000000000 65535 f \n".encode())
+        self.write(''.join(f"{self.offsets[number]:010d} 00000 n \n" for number in range(1, size)).encode())
+        self.write(f"trailer\n<< /Size {size} /Root 1 0 R /Info {self.info} 0 R >>\n"
+                   f"startxref\n{xref}\n%%EOF\n".encode())
+
+
+def write_statement(file, company, month):
+    """
+    Ecrit dans `file` le releve mensuel (PDF de plusieurs pages) des demandes de `company`.
+
+    Les totaux (qui donnent aussi le nombre de pages) et les lignes sont lus dans une meme transaction
+    REPEATABLE READ : le meme instantane, donc des « Page x/y » justes. Les lignes arrivent du curseur serveur
+    dans l'ordre de l'index sending_req_client_date_idx et chaque page est ecrite dans `file` des qu'elle est
+    pleine (`StreamedPdf`) : la memoire ne depend pas du nombre de lignes. L'entete des pages de lignes est un
+    form XObject, ecrit une fois et reference sur chaque page.
+    """
+    outermost = not connection.in_atomic_block
+    with transaction.atomic():
+        if outermost:
+            # Doit preceder toute requete de la transaction (dans une transaction deja ouverte, celle-ci decide)
+            with connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        requests = statement_requests(company, month)
+        subtotals, total = statement_totals(requests)
+        rows = requests.order_by('request_date', 'id').values_list(
+            'request_date', 'id', 'recipient_name', 'cargo_type', 'weight', 'total_price',
+        ).iterator(chunk_size=STATEMENT_CHUNK_SIZE)
+        pdf = StreamedPdf(file, f"Releve {month:%Y-%m} - {company.company_name}")
+        draw_statement(pdf, company, month, subtotals, total, rows)
+        pdf.close()
+
+
+def draw_statement(pdf, company, month, subtotals, total, rows):
+    pages = max(math.ceil(total['count'] / LINES_PER_PAGE), 1) + 1
+    header = [
+        (TEXT, 40, 75, f"{company.company_name} - {company.email}"),
+        (TEXT, 40, 92, f"Mois: {month:%Y-%m}"),
+    ]
+    pdf.add_form('StatementPage', [(TITLE, 40, 50, "RELEVE MENSUEL DES ENVOIS"), *header,
+                                   *row_texts(125, [title for title, _, _ in COLUMNS], SMALL_BOLD)])
+
+    def page_number():
+        text = f"Page {len(pdf.pages) + 1}/{pages}"
+        return [(SMALL, 555 - stringWidth(text, *SMALL), 92, text)]
+
+    texts = []
+    for index, (request_date, pk, recipient_name, cargo_type, weight, total_price) in enumerate(rows):
+        line = index % LINES_PER_PAGE
+        if line == 0:
+            if index:
+                pdf.add_page(texts, form='StatementPage')
+            texts = page_number()
+        texts += row_texts(125 + (line + 1) * LINE_HEIGHT, [
+            timezone.localdate(request_date).isoformat(), f"#{pk}", recipient_name[:32],
+            cargo_types.get(cargo_type, cargo_type)[:22], f"{weight:.2f}", amount(total_price),
+        ])
+    if not texts:
+        texts = [*page_number(), (TEXT, 40, 150, "Aucun envoi facture ce mois.")]
+    pdf.add_page(texts, form='StatementPage')
+
+    top = 125
+    texts = [(TITLE, 40, 50, "RECAPITULATIF"), *header, *page_number(),
+             *row_texts(top, ["", "Envois", "Type de colis", "", "Poids (kg)", "Montant (Ar)"], SMALL_BOLD)]
+    for subtotal in subtotals:
+        top += LINE_HEIGHT
+        texts += row_texts(top, [
+            "", str(subtotal['count']), cargo_types.get(subtotal['cargo_type'], subtotal['cargo_type']), "",
+            amount(subtotal['weight']), amount(subtotal['amount']),
+        ])
+    top += LINE_HEIGHT * 2
+    texts += row_texts(top, ["", str(total['count']), "Total", "", amount(total['weight']), amount(total['amount'])],
+                       SMALL_BOLD)
+    pdf.add_page(texts)
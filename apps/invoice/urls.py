@@ -1,8 +1,18 @@
 from django.urls import path
 
-from apps.invoice.views import SubscriptionInvoiceView, SendingRequestInvoiceView
+from apps.invoice.views import SubscriptionInvoiceView, SendingRequestInvoiceView, InvoiceRenderJobView
+from apps.invoice.views_export import SendingRequestInvoiceExportView, SubscriptionInvoiceExportView, \
+    InvoiceArchiveExportView
+from apps.invoice.views_statement import CompanyStatementView
 
 invoice_urlpatterns = [
     path("invoice/subscription/<int:pk>", SubscriptionInvoiceView.as_view(), name="Invoice for subscription"),
-    path("invoice/sending_request/<int:pk>", SendingRequestInvoiceView.as_view(), name="Invoice for sending request")
+    path("invoice/sending_request/<int:pk>", SendingRequestInvoiceView.as_view(), name="Invoice for sending request"),
+    path("invoice/render_job/<str:kind>/<int:pk>", InvoiceRenderJobView.as_view(), name="Invoice render job"),
+    path("invoice/subscription/export_admin/", SubscriptionInvoiceExportView.as_view(),
+         name="Export subscription invoices"),
+    path("invoice/sending_request/export_admin/", SendingRequestInvoiceExportView.as_view(),
+         name="Export sending request invoices"),
+    path("invoice/company_statement/", CompanyStatementView.as_view(), name="Company monthly statement"),
+    path("invoice/archive_export_admin/", InvoiceArchiveExportView.as_view(), name="Export invoice archive"),
 ]
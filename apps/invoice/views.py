@@ -1,19 +1,18 @@
-from io import BytesIO
-
+from django.db import connection
 from django.http import Http404, FileResponse
+from django.urls import reverse
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
+from rest_framework import status
 from rest_framework.parsers import JSONParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.invoice.models import SubscriptionInvoice, SendingRequestInvoice
+from apps.invoice.pdf import invoice_pdf_cache, sending_request_invoices, subscription_invoices
+from apps.invoice.rendering import INVOICE_KINDS, enqueue_render, prerender_invoices, render_queue
 from apps.invoice.serializers import SubscriptionInvoiceSerializer, SendingRequestInvoiceSerializer
-from apps.sendingRequest.serializers import SendingRequestSerializer
-from apps.subscription.models import SubscriptionPlan, Subscription
-from apps.subscription.serializers import SubscriptionPlanSerializer, SubscriptionSerializer
 
 
 def invoice_sending_request_post(request):
@@ -24,7 +23,32 @@ def invoice_sending_request_post(request):
     }
     serializer = SendingRequestInvoiceSerializer(data=data)
     if serializer.is_valid():
-        serializer.save()
+        invoice = serializer.save()
+        prerender_invoices('sending_request', [invoice.pk])
+
+
+def reserve_invoice_ids(model, count):
+    """
+    Reserve `count` ids dans la sequence de la table, pour connaitre les numeros de facture avant l'insertion.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+                       [model._meta.db_table, count])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def bulk_invoice_sending_requests(sending_requests):
+    """
+    Equivalent de `invoice_sending_request_post` pour une liste de demandes deja inserees : un seul INSERT.
+    """
+    ids = reserve_invoice_ids(SendingRequestInvoice, len(sending_requests))
+    invoices = SendingRequestInvoice.objects.bulk_create(
+        SendingRequestInvoice(id=pk, invoice_number=f"REQ-INV-{pk:04d}", client_id=sending_request.client_id,
+                              sending_request=sending_request, total_ttc=None)
+        for pk, sending_request in zip(ids, sending_requests)
+    )
+    prerender_invoices('sending_request', ids)
+    return invoices
 
 
 def subscription_request_post(request, price):
@@ -35,25 +59,57 @@ def subscription_request_post(request, price):
     }
     serializer = SubscriptionInvoiceSerializer(data=data)
     if serializer.is_valid():
-        serializer.save()
+        invoice = serializer.save()
+        prerender_invoices('subscription', [invoice.pk])
 
 
 def get_subscription_invoices(request, pk):
     try:
-        return SubscriptionInvoice.objects.get(pk=pk, client=request.user)
+        return subscription_invoices().get(pk=pk, client=request.user)
     except SubscriptionInvoice.DoesNotExist:
         raise Http404("Subscription not found")
 
 
 def get_sending_request_invoice(request, pk):
     try:
-        return SendingRequestInvoice.objects.get(pk=pk, client=request.user)
+        return sending_request_invoices().get(pk=pk, client=request.user)
     except SendingRequestInvoice.DoesNotExist:
         raise Http404("Invoice not found")
 
 
 tags = "Generate Invoice"
 
+async_parameter = openapi.Parameter(
+    'async', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN, required=False,
+    description="Rendu en arriere-plan : reponse 202 avec l'URL de suivi (invoice/render_job/...) au lieu du PDF",
+)
+
+invoice_getters = {
+    'subscription': get_subscription_invoices,
+    'sending_request': get_sending_request_invoice,
+}
+
+
+def invoice_filename(kind, invoice):
+    prefix = "invoice" if kind == 'subscription' else "sending_request_invoice"
+    return f"{prefix}_{invoice.invoice_number}_{invoice.client.username}.pdf"
+
+
+def invoice_pdf_response(request, kind, invoice):
+    """
+    PDF de la facture (servi depuis le cache disque s'il est deja rendu), ou avec `?async=true` : rendu lance en
+    arriere-plan et reponse 202 avec l'URL de suivi.
+    """
+    if request.query_params.get('async', '').lower() not in ('1', 'true'):
+        # PDF deja rendu pour ce contenu : envoye directement depuis le disque
+        pdf = invoice_pdf_cache.open(kind, invoice.pk, INVOICE_KINDS[kind][1](invoice))
+        return FileResponse(pdf, as_attachment=True, filename=invoice_filename(kind, invoice))
+
+    path = enqueue_render(kind, invoice)
+    url = request.build_absolute_uri(reverse("Invoice render job", kwargs={'kind': kind, 'pk': invoice.pk}))
+    return Response({"job": f"{kind}/{invoice.pk}", "status": render_queue.status(path) or "pending", "url": url},
+                    status=status.HTTP_202_ACCEPTED)
+
 
 class SubscriptionInvoiceView(APIView):
     permission_classes = [IsAuthenticated]
@@ -61,67 +117,16 @@ class SubscriptionInvoiceView(APIView):
 
     @swagger_auto_schema(
         operation_description="Creer un facture pour la subscription",
+        manual_parameters=[async_parameter],
         responses={
             200: openapi.Response("Invoice pdf"),
+            202: openapi.Response("Rendering job (job, status, url) with ?async=true"),
             400: openapi.Response("Bad Request")
         },
         tags=[tags]
     )
     def post(self, request, pk):
-        invoice = get_subscription_invoices(request, pk)
-        serializer = SubscriptionInvoiceSerializer(invoice)
-        invoice_data = serializer.data
-
-        # Génération du PDF
-        buffer = BytesIO()
-        p = canvas.Canvas(buffer, pagesize=A4)
-        width, height = A4
-
-        # Title
-        p.setFont("Helvetica-Bold", 16)
-        p.drawString(200, height - 50, "FACTURE D'ABONNEMENT")
-
-        # Invoice Details
-        p.setFont("Helvetica", 12)
-        p.drawString(50, height - 100, f"Numéro de facture: {invoice_data['invoice_number']}")
-        p.drawString(50, height - 120, f"Date de création: {invoice_data['created_at'][:10]}")
-
-        # Client Details
-        client = invoice_data['client_details']
-        p.drawString(50, height - 160, "Informations du client:")
-        p.drawString(70, height - 180, f"Nom: {client['first_name']} {client['last_name']}")
-        p.drawString(70, height - 200, f"Email: {client['email']}")
-        p.drawString(70, height - 220, f"Téléphone: {client['phone']}")
-        p.drawString(70, height - 240, f"Adresse: {client['address']}")
-
-        # Subscription Plan Details
-        sub_plan = invoice_data['sub_plan_details']
-        subscription = SubscriptionSerializer(Subscription.objects.get(client=request.user, status="active"))
-        sub_plan_data = SubscriptionPlanSerializer(SubscriptionPlan.objects.get(pk=sub_plan['sub_plan']))
-
-        sub_name = sub_plan_data.data["name"]
-        p.drawString(50, height - 280, "Détails de l'abonnement:")
-        p.drawString(70, height - 300, f"Nom du plan: {sub_name}")
-        p.drawString(70, height - 320, f"Date de début: {subscription.data['start_date']}")
-        p.drawString(70, height - 340, f"Date de fin: {subscription.data['end_date']}")
-        p.drawString(70, height - 360, f"Statut: {subscription.data['status']}")
-
-        # Payment Details
-        p.drawString(50, height - 400, "Informations de paiement:")
-        p.drawString(70, height - 420, f"Montant total: {invoice_data['total_ttc']} Ar")
-        p.drawString(70, height - 440, f"Méthode de paiement: {invoice_data['payment_method']}")
-        p.drawString(70, height - 460, f"Statut de paiement: {invoice_data['status']}")
-
-        # Save the PDF
-        p.showPage()
-        p.save()
-        buffer.seek(0)
-
-        # Retourner le fichier PDF en réponse
-        response = FileResponse(buffer, as_attachment=True,
-                                filename=f"invoice_{invoice_data['invoice_number']}_{client['username']}.pdf")
-
-        return response
+        return invoice_pdf_response(request, 'subscription', get_subscription_invoices(request, pk))
 
 
 class SendingRequestInvoiceView(APIView):
@@ -130,68 +135,47 @@ class SendingRequestInvoiceView(APIView):
 
     @swagger_auto_schema(
         operation_description="Créer une facture pour la demande d'envoi",
+        manual_parameters=[async_parameter],
         responses={
             200: openapi.Response("Invoice pdf"),
+            202: openapi.Response("Rendering job (job, status, url) with ?async=true"),
             400: openapi.Response("Bad Request")
         },
         tags=[tags]
     )
     def post(self, request, pk):
-        invoice = get_sending_request_invoice(request, pk)
-        invoice_serializer = SendingRequestInvoiceSerializer(invoice)
-        invoice_data = invoice_serializer.data
-
-        sending_request = invoice.sending_request
-        sending_request_serializer = SendingRequestSerializer(sending_request)
-        sending_request_data = sending_request_serializer.data
-
-        # Génération du PDF
-        buffer = BytesIO()
-        p = canvas.Canvas(buffer, pagesize=A4)
-        width, height = A4
-
-        # Titre de la facture
-        p.setFont("Helvetica-Bold", 16)
-        p.drawString(200, height - 50, "FACTURE DE DEMANDE D'ENVOI")
-
-        # Détails de la facture
-        p.setFont("Helvetica", 12)
-        p.drawString(50, height - 100, f"Numéro de facture: {invoice_data['invoice_number']}")
-        p.drawString(50, height - 120, f"Date de création: {invoice_data['created_at'][:10]}")
-
-        # Informations du client
-        client = invoice_data['client_details']
-        p.drawString(50, height - 160, "Informations du client:")
-        p.drawString(70, height - 180, f"Nom: {client['first_name']} {client['last_name']}")
-        p.drawString(70, height - 200, f"Email: {client['email']}")
-        p.drawString(70, height - 220, f"Téléphone: {client['phone']}")
-        p.drawString(70, height - 240, f"Adresse: {client['address']}")
-
-        # Détails de la demande d'envoi
-        p.drawString(50, height - 280, "Détails de l'envoi:")
-        p.drawString(70, height - 300, f"Destinataire: {sending_request_data['recipient_name']}")
-        p.drawString(70, height - 320, f"Téléphone: {sending_request_data['recipient_phone']}")
-        p.drawString(70, height - 340, f"Email: {sending_request_data['recipient_email']}")
-        p.drawString(70, height - 360, f"Type de colis: {sending_request_data['cargo_type']}")
-        p.drawString(70, height - 380, f"Poids: {sending_request_data['weight']} kg")
-        p.drawString(70, height - 400, f"Quantité: {sending_request_data['quantity']}")
-        p.drawString(70, height - 420, f"Lieu de prise en charge: {sending_request_data['pickup_location']}")
-        p.drawString(70, height - 440, f"Date de prise en charge: {sending_request_data['pickup_date_time']}")
-        p.drawString(70, height - 460, f"Lieu de livraison: {sending_request_data['delivery_location']}")
-        p.drawString(70, height - 480, f"Date de livraison: {sending_request_data['delivery_date_time']}")
-        p.drawString(70, height - 500, f"Priorité: {sending_request_data['priority']}")
-
-        # Informations de paiement
-        p.drawString(50, height - 540, "Informations de paiement:")
-        p.drawString(70, height - 560, f"Montant total: {invoice_data['total_price']} Ar")
-        p.drawString(70, height - 600, f"Statut de paiement: {invoice_data['status']}")
-
-        # Sauvegarde du PDF
-        p.showPage()
-        p.save()
-        buffer.seek(0)
-
-        # Retourner le fichier PDF en réponse
-        response = FileResponse(buffer, as_attachment=True,
-                                filename=f"sending_request_invoice_{invoice_data['invoice_number']}_{client['username']}.pdf")
-        return response
+        return invoice_pdf_response(request, 'sending_request', get_sending_request_invoice(request, pk))
+
+
+class InvoiceRenderJobView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Suivi d'un rendu lance avec ?async=true : le PDF une fois rendu, 202 tant qu'il est "
+                              "en cours (`kind` : subscription ou sending_request)",
+        responses={
+            200: openapi.Response("Invoice pdf"),
+            202: openapi.Response("Rendering in progress"),
+            404: openapi.Response("Invoice not found"),
+            500: openapi.Response("Rendering failed (the next call starts it again)"),
+        },
+        tags=[tags]
+    )
+    def get(self, request, kind, pk):
+        if kind not in invoice_getters:
+            raise Http404("Invoice not found")
+        invoice = invoice_getters[kind](request, pk)
+        lines = INVOICE_KINDS[kind][1](invoice)
+        path = invoice_pdf_cache.path(kind, invoice.pk, lines)
+
+        job_status = render_queue.status(path)
+        if job_status == 'failed':
+            return Response({"error": "Invoice rendering failed"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        if job_status is None:
+            # Lance par un autre worker, ou perdu : relance (sans effet si le PDF est rendu entre-temps)
+            render_queue.submit(path, lines)
+            job_status = render_queue.status(path)
+        if job_status == 'done':
+            pdf = invoice_pdf_cache.open(kind, invoice.pk, lines)
+            return FileResponse(pdf, as_attachment=True, filename=invoice_filename(kind, invoice))
+        return Response({"job": f"{kind}/{invoice.pk}", "status": "pending"}, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,92 @@
+from django.http import StreamingHttpResponse
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+from apps.core.export import export_filters, export_parameters, export_response
+from apps.invoice.archive import invoice_archive_chunks
+from apps.invoice.models import SendingRequestInvoice, SubscriptionInvoice, STATUS_CHOICES
+from apps.invoice.rendering import INVOICE_KINDS
+
+# Views for exports
+
+tags = "Generate Invoice"
+
+invoice_statuses = [value for value, _ in STATUS_CHOICES]
+
+sending_request_invoice_columns = (
+    'id', 'invoice_number', 'client', 'client__email', 'sending_request', 'total_ttc', 'payment_method', 'status',
+    'created_at',
+)
+
+subscription_invoice_columns = (
+    'id', 'invoice_number', 'client', 'client__email', 'sub_plan', 'sub_plan__sub_plan__name', 'total_ttc',
+    'payment_method', 'status', 'created_at',
+)
+
+export_responses = {
+    200: openapi.Response("Export file"),
+    400: openapi.Response("Bad request"),
+    403: openapi.Response("User unauthorized"),
+}
+
+
+class SendingRequestInvoiceExportView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="Exporter les factures des demandes d'envoi (CSV ou NDJSON, en streaming)",
+        manual_parameters=export_parameters(invoice_statuses),
+        responses=export_responses,
+        tags=[tags]
+    )
+    def get(self, request):
+        invoices = export_filters(request, SendingRequestInvoice.objects.all(), 'created_at', invoice_statuses)
+        return export_response(request, invoices, sending_request_invoice_columns, "sending_request_invoices")
+
+
+class SubscriptionInvoiceExportView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="Exporter les factures d'abonnement (CSV ou NDJSON, en streaming)",
+        manual_parameters=export_parameters(invoice_statuses),
+        responses=export_responses,
+        tags=[tags]
+    )
+    def get(self, request):
+        invoices = export_filters(request, SubscriptionInvoice.objects.all(), 'created_at', invoice_statuses)
+        return export_response(request, invoices, subscription_invoice_columns, "subscription_invoices")
+
+
+class InvoiceArchiveExportView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="Exporter les PDF des factures dans une archive ZIP (en streaming, PDF rendus en "
+                              "parallele ou lus dans le cache)",
+        manual_parameters=[
+            openapi.Parameter('kind', openapi.IN_QUERY,
+                              description=f"Types de factures separes par des virgules ({', '.join(INVOICE_KINDS)}, "
+                                          f"tous par defaut)",
+                              type=openapi.TYPE_STRING, required=False),
+            *[parameter for parameter in export_parameters(invoice_statuses) if parameter.name != 'file_format'],
+        ],
+        responses=export_responses,
+        tags=[tags]
+    )
+    def get(self, request):
+        kinds = request.query_params.get('kind')
+        kinds = kinds.split(',') if kinds else list(INVOICE_KINDS)
+        if any(kind not in INVOICE_KINDS for kind in kinds):
+            raise ValidationError({"kind": f"Expected one of: {', '.join(INVOICE_KINDS)}"})
+
+        selections = [
+            (kind, export_filters(request, INVOICE_KINDS[kind][0](), 'created_at', invoice_statuses))
+            for kind in kinds
+        ]
+        response = StreamingHttpResponse(invoice_archive_chunks(selections), content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="invoices.zip"'
+        return response
@@ -0,0 +1,51 @@
+import datetime
+import tempfile
+
+from django.http import FileResponse
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.invoice.statement import write_statement
+from apps.users.models import ClientCompany
+
+# Views for the monthly statements of client companies
+
+tags = "Generate Invoice"
+
+
+class CompanyStatementView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Releve mensuel (PDF de plusieurs pages) des envois de l'entreprise cliente, avec les "
+                              "sous-totaux par type de colis et le total",
+        manual_parameters=[
+            openapi.Parameter('month', openapi.IN_QUERY, description="Mois du releve (AAAA-MM)",
+                              type=openapi.TYPE_STRING, required=True),
+        ],
+        responses={
+            200: openapi.Response("Statement pdf"),
+            400: openapi.Response("Bad request"),
+            403: openapi.Response("User unauthorized"),
+        },
+        tags=[tags]
+    )
+    def get(self, request):
+        if request.user.role != "company":
+            return Response({"error": "You must be a client company to perform this request"},
+                            status=status.HTTP_403_FORBIDDEN)
+        try:
+            month = datetime.datetime.strptime(request.query_params.get('month', ''), '%Y-%m').date()
+        except ValueError:
+            return Response({"error": "Invalid month, expected YYYY-MM"}, status=status.HTTP_400_BAD_REQUEST)
+
+        company = ClientCompany.objects.get(pk=request.user.pk)
+        # Envoye depuis un fichier temporaire, par morceaux
+        pdf = tempfile.TemporaryFile()
+        write_statement(pdf, company, month)
+        pdf.seek(0)
+        return FileResponse(pdf, as_attachment=True, filename=f"statement_{month:%Y-%m}_{company.username}.pdf")
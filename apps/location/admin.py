@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from apps.location.models import Location
+
+
+@admin.register(Location)
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ('name', 'kind', 'region', 'latitude', 'longitude')
+    list_filter = ('kind', 'region')
+    search_fields = ('name', 'aliases')
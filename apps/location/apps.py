@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class LocationConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.location'
+
+    def ready(self):
+        # Cache du resolveur vide a chaque modification de lieu, lieux resolus a l'enregistrement des demandes
+        from apps.location import signals  # noqa: F401
@@ -0,0 +1,35 @@
+import csv
+from pathlib import Path
+
+from apps.core.geo import normalize_place
+from apps.location.models import Location
+
+# Gazetteer hors ligne : chefs-lieux de region et de district de Madagascar
+GAZETTEER_PATH = Path(__file__).resolve().parent / 'data' / 'gazetteer.csv'
+
+
+def read_gazetteer(path=GAZETTEER_PATH):
+    """
+    Lignes du gazetteer, pretes pour Location (noms et alias normalises).
+    """
+    with open(path, newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            yield {
+                'name': row['name'],
+                'normalized_name': normalize_place(row['name']),
+                'kind': row['kind'],
+                'region': row['region'],
+                'latitude': float(row['latitude']),
+                'longitude': float(row['longitude']),
+                'aliases': [normalize_place(alias) for alias in row['aliases'].split(';') if alias.strip()],
+            }
+
+
+def load_gazetteer(path=GAZETTEER_PATH):
+    """
+    Cree ou met a jour les lieux du gazetteer (la migration 0002 en garde sa propre copie figee).
+    """
+    rows = list(read_gazetteer(path))
+    for row in rows:
+        Location.objects.update_or_create(normalized_name=row.pop('normalized_name'), defaults=row)
+    return len(rows)
@@ -0,0 +1,165 @@
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from apps.core.geo import AVERAGE_SPEED_KMH, EARTH_RADIUS_KM, ROAD_FACTOR
+from apps.location.models import Location
+
+# Etat des routes par region : (facteur route / vol d'oiseau, vitesse moyenne en km/h).
+# Entre deux regions, on garde le facteur le plus eleve et la vitesse la plus faible.
+ROAD_CONDITIONS = {
+    'Melaky': (1.8, 25),
+    'Sava': (1.6, 30),
+    'Menabe': (1.5, 30),
+    'Androy': (1.5, 30),
+    'Analanjirofo': (1.5, 30),
+    'Atsimo-Andrefana': (1.4, 35),
+    'Sofia': (1.4, 35),
+    'Diana': (1.4, 35),
+}
+DEFAULT_ROAD_CONDITIONS = (ROAD_FACTOR, AVERAGE_SPEED_KMH)
+
+# Couches du fichier : tableau float32 de forme (2, n, n), indexe par Location.matrix_index
+DISTANCE, DURATION = 0, 1
+
+# Delai entre deux verifications du fichier par un worker (remplace lors d'une mise a jour)
+RELOAD_INTERVAL = 30
+
+
+def haversine_km_matrix(lat_a, lon_a, lat_b, lon_b):
+    """
+    Distances a vol d'oiseau (km) entre deux series de points, de forme (len(a), len(b)).
+    """
+    lat_a, lon_a, lat_b, lon_b = (np.radians(np.asarray(values, dtype=np.float64))
+                                  for values in (lat_a, lon_a, lat_b, lon_b))
+    h = (np.sin((lat_b[None, :] - lat_a[:, None]) / 2) ** 2
+         + np.cos(lat_a)[:, None] * np.cos(lat_b)[None, :] * np.sin((lon_b[None, :] - lon_a[:, None]) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+
+
+def compute_block(rows, columns):
+    """
+    Distances (km) et durees (minutes) entre deux listes de lieux, de forme (2, len(rows), len(columns)).
+    """
+    def conditions(locations):
+        table = np.array([ROAD_CONDITIONS.get(location.region, DEFAULT_ROAD_CONDITIONS) for location in locations],
+                         dtype=np.float64).reshape(-1, 2)
+        return table[:, 0], table[:, 1]
+
+    row_factors, row_speeds = conditions(rows)
+    column_factors, column_speeds = conditions(columns)
+    km = haversine_km_matrix([location.latitude for location in rows], [location.longitude for location in rows],
+                             [location.latitude for location in columns],
+                             [location.longitude for location in columns])
+    km *= np.maximum(row_factors[:, None], column_factors[None, :])
+    minutes = km * 60 / np.minimum(row_speeds[:, None], column_speeds[None, :])
+    return np.stack([km, minutes])
+
+
+def matrix_path():
+    return Path(settings.DISTANCE_MATRIX_PATH)
+
+
+def update_distance_matrix(path=None, rebuild=False):
+    """
+    Ajoute au fichier les lieux qui n'y sont pas encore (seules leurs lignes et colonnes sont calculees),
+    ou recalcule tout avec `rebuild` (coordonnees modifiees). Retourne (taille, lieux ajoutes).
+
+    Le nouveau fichier remplace l'ancien d'un bloc (os.replace) : les workers qui lisent encore l'ancien
+    gardent une copie coherente jusqu'a leur prochaine verification.
+    """
+    path = Path(path or matrix_path())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with transaction.atomic():
+        # Une seule mise a jour a la fois
+        list(Location.objects.select_for_update().only('id'))
+        old = None if rebuild or not path.exists() else np.load(path, mmap_mode='r')
+        size = 0 if old is None else old.shape[1]
+
+        indexed = list(Location.objects.filter(matrix_index__lt=size))
+        added = list(Location.objects.filter(Q(matrix_index__isnull=True) | Q(matrix_index__gte=size)).order_by('id'))
+        if old is not None and not added:
+            return size, 0
+        for index, location in enumerate(added, start=size):
+            location.matrix_index = index
+
+        # Les lignes des lieux supprimes restent dans le fichier, sans etre utilisees
+        count = size + len(added)
+        everyone = [None] * count
+        for location in indexed + added:
+            everyone[location.matrix_index] = location
+        placeholder = Location(latitude=np.nan, longitude=np.nan, region='')
+        everyone = [location or placeholder for location in everyone]
+
+        temporary = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+        array = np.lib.format.open_memmap(temporary, mode='w+', dtype=np.float32, shape=(2, count, count))
+        if size:
+            array[:, :size, :size] = old
+        block = compute_block(everyone, added)
+        array[:, :, size:] = block
+        array[:, size:, :] = block.transpose(0, 2, 1)
+        array.flush()
+        del array, old
+
+        Location.objects.bulk_update(added, ['matrix_index'])
+        os.replace(temporary, path)
+    location_matrix.clear()
+    return count, len(added)
+
+
+class DistanceMatrix:
+    """
+    Lecture de la matrice en memoire partagee (np.load en mmap) : le systeme garde une seule copie
+    des pages du fichier pour tous les processus, rien n'est charge dans le tas de chaque worker.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.array = None
+        self.file_key = None
+        self.checked_at = None
+
+    def clear(self):
+        self.array, self.file_key, self.checked_at = None, None, None
+
+    def load(self):
+        now = time.monotonic()
+        if self.checked_at is not None and now - self.checked_at < RELOAD_INTERVAL:
+            return self.array
+        self.checked_at = now
+        path = Path(self.path or matrix_path())
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.array, self.file_key = None, None
+            return None
+        file_key = (stat.st_ino, stat.st_mtime_ns)
+        if file_key != self.file_key:
+            self.array, self.file_key = np.load(path, mmap_mode='r'), file_key
+        return self.array
+
+    def submatrix(self, locations):
+        """
+        Distances et durees (2, n, n) entre les lieux donnes ; calculees a la volee pour les lieux pas encore
+        dans le fichier.
+        """
+        array = self.load()
+        indexes = [location.matrix_index for location in locations]
+        if array is not None and all(index is not None and index < array.shape[1] for index in indexes):
+            return array[:, indexes][:, :, indexes].astype(np.float64)
+        return compute_block(locations, locations)
+
+    def between(self, origin, destination):
+        """
+        (distance en km, duree en minutes) entre deux lieux.
+        """
+        block = self.submatrix([origin, destination])
+        return float(block[DISTANCE, 0, 1]), float(block[DURATION, 0, 1])
+
+
+location_matrix = DistanceMatrix()
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.5 on 2026-10-18 11:40
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('normalized_name', models.CharField(max_length=100, unique=True)),
+                ('kind', models.CharField(choices=[('capital', 'Region capital'), ('district', 'District seat')], default='district', max_length=10)),
+                ('region', models.CharField(max_length=50)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('aliases', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=100), blank=True, default=list, help_text='Usual or colonial names, normalized (e.g. tamatave)', size=None)),
+            ],
+        ),
+    ]
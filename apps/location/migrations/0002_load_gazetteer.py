@@ -0,0 +1,119 @@
+# Generated by Django 5.1.5 on 2026-10-18 11:40
+
+import unicodedata
+
+from django.db import migrations
+
+# Copie figee de apps/location/data/gazetteer.csv au moment de la migration : le fichier et son chargeur
+# peuvent evoluer, cette migration doit toujours charger les memes lignes.
+# (nom, type, region, latitude, longitude, alias)
+GAZETTEER = (
+    ('Antananarivo', 'capital', 'Analamanga', -18.8792, 47.5079, ('Tana', 'Tananarive')),
+    ('Toamasina', 'capital', 'Atsinanana', -18.1492, 49.4023, ('Tamatave',)),
+    ('Antsirabe', 'capital', 'Vakinankaratra', -19.8659, 47.0333, ()),
+    ('Fianarantsoa', 'capital', 'Haute Matsiatra', -21.4536, 47.0858, ('Fianar',)),
+    ('Mahajanga', 'capital', 'Boeny', -15.7167, 46.3167, ('Majunga',)),
+    ('Toliara', 'capital', 'Atsimo-Andrefana', -23.3500, 43.6667, ('Tulear', 'Toliary')),
+    ('Antsiranana', 'capital', 'Diana', -12.2787, 49.2917, ('Diego Suarez', 'Diego')),
+    ('Ambatondrazaka', 'capital', 'Alaotra-Mangoro', -17.8333, 48.4167, ()),
+    ('Morondava', 'capital', 'Menabe', -20.2833, 44.2833, ()),
+    ('Taolagnaro', 'capital', 'Anosy', -25.0325, 46.9833, ('Fort Dauphin', 'Tolagnaro')),
+    ('Ambositra', 'capital', "Amoron'i Mania", -20.5311, 47.2436, ()),
+    ('Manakara', 'capital', 'Fitovinany', -22.1500, 48.0000, ()),
+    ('Mananjary', 'capital', 'Vatovavy', -21.2167, 48.3333, ()),
+    ('Sambava', 'capital', 'Sava', -14.2667, 50.1667, ()),
+    ('Farafangana', 'capital', 'Atsimo-Atsinanana', -22.8167, 47.8333, ()),
+    ('Ihosy', 'capital', 'Ihorombe', -22.4000, 46.1167, ()),
+    ('Maevatanana', 'capital', 'Betsiboka', -16.9500, 46.8333, ()),
+    ('Miarinarivo', 'capital', 'Itasy', -18.9667, 46.9000, ()),
+    ('Tsiroanomandidy', 'capital', 'Bongolava', -18.7667, 46.0333, ()),
+    ('Fenoarivo Atsinanana', 'capital', 'Analanjirofo', -17.3833, 49.4167, ('Fenerive Est', 'Fenerive')),
+    ('Antsohihy', 'capital', 'Sofia', -14.8796, 47.9875, ()),
+    ('Ambovombe', 'capital', 'Androy', -25.1667, 46.0833, ('Ambovombe Androy',)),
+    ('Maintirano', 'capital', 'Melaky', -18.0667, 44.0167, ()),
+    ('Nosy Be', 'district', 'Diana', -13.4000, 48.2667, ('Hell Ville', 'Andoany')),
+    ('Ambanja', 'district', 'Diana', -13.6833, 48.4500, ()),
+    ('Ambilobe', 'district', 'Diana', -13.2000, 49.0500, ()),
+    ('Antalaha', 'district', 'Sava', -14.9003, 50.2788, ()),
+    ('Vohemar', 'district', 'Sava', -13.3667, 50.0000, ('Iharana',)),
+    ('Andapa', 'district', 'Sava', -14.6500, 49.6500, ()),
+    ('Moramanga', 'district', 'Alaotra-Mangoro', -18.9333, 48.2000, ()),
+    ('Amparafaravola', 'district', 'Alaotra-Mangoro', -17.5833, 48.2167, ()),
+    ('Andilamena', 'district', 'Alaotra-Mangoro', -17.0167, 48.5833, ()),
+    ("Anosibe An'ala", 'district', 'Alaotra-Mangoro', -19.4000, 48.2200, ()),
+    ('Ambatolampy', 'district', 'Vakinankaratra', -19.3833, 47.4333, ()),
+    ('Betafo', 'district', 'Vakinankaratra', -19.8333, 46.8500, ()),
+    ('Faratsiho', 'district', 'Vakinankaratra', -19.4000, 46.9500, ()),
+    ('Antanifotsy', 'district', 'Vakinankaratra', -19.6500, 47.3167, ()),
+    ('Ambohimahasoa', 'district', 'Haute Matsiatra', -21.1000, 47.2167, ()),
+    ('Ambalavao', 'district', 'Haute Matsiatra', -21.8333, 46.9333, ()),
+    ('Fandriana', 'district', "Amoron'i Mania", -20.2333, 47.3833, ()),
+    ('Ambatofinandrahana', 'district', "Amoron'i Mania", -20.5500, 46.8000, ()),
+    ('Vohipeno', 'district', 'Fitovinany', -22.3500, 47.8333, ()),
+    ('Ifanadiana', 'district', 'Vatovavy', -21.3000, 47.6333, ()),
+    ('Vangaindrano', 'district', 'Atsimo-Atsinanana', -23.3500, 47.6000, ()),
+    ('Betroka', 'district', 'Anosy', -23.2667, 46.1000, ()),
+    ('Amboasary Atsimo', 'district', 'Anosy', -25.0333, 46.3833, ('Amboasary Sud', 'Amboasary')),
+    ('Tsihombe', 'district', 'Androy', -25.3167, 45.4833, ()),
+    ('Bekily', 'district', 'Androy', -24.2167, 45.3167, ()),
+    ('Sakaraha', 'district', 'Atsimo-Andrefana', -22.9000, 44.5333, ()),
+    ('Morombe', 'district', 'Atsimo-Andrefana', -21.7500, 43.3667, ()),
+    ('Ankazoabo', 'district', 'Atsimo-Andrefana', -22.2833, 44.5167, ()),
+    ('Ampanihy', 'district', 'Atsimo-Andrefana', -24.6833, 44.7500, ()),
+    ('Belo sur Tsiribihina', 'district', 'Menabe', -19.7000, 44.5500, ('Belo Tsiribihina',)),
+    ('Miandrivazo', 'district', 'Menabe', -19.5167, 45.4667, ()),
+    ('Mahabo', 'district', 'Menabe', -20.3667, 44.6667, ()),
+    ('Manja', 'district', 'Menabe', -21.4333, 44.3333, ()),
+    ('Besalampy', 'district', 'Melaky', -16.7500, 44.4833, ()),
+    ('Antsalova', 'district', 'Melaky', -18.6667, 44.6167, ()),
+    ('Marovoay', 'district', 'Boeny', -16.1000, 46.6333, ()),
+    ('Ambato Boeni', 'district', 'Boeny', -16.4667, 46.7167, ()),
+    ('Tsaratanana', 'district', 'Betsiboka', -16.7833, 47.6500, ()),
+    ('Mandritsara', 'district', 'Sofia', -15.8333, 48.8167, ()),
+    ('Befandriana Avaratra', 'district', 'Sofia', -15.2667, 48.5333, ('Befandriana Nord',)),
+    ('Port Berge', 'district', 'Sofia', -15.5833, 47.6167, ('Boriziny',)),
+    ('Analalava', 'district', 'Sofia', -14.6333, 47.7667, ()),
+    ('Bealanana', 'district', 'Sofia', -14.5500, 48.7333, ()),
+    ('Maroantsetra', 'district', 'Analanjirofo', -15.4333, 49.7333, ()),
+    ('Mananara Avaratra', 'district', 'Analanjirofo', -16.1667, 49.7667, ('Mananara Nord', 'Mananara')),
+    ('Soanierana Ivongo', 'district', 'Analanjirofo', -16.9167, 49.5833, ()),
+    ('Sainte Marie', 'district', 'Analanjirofo', -16.9900, 49.8500, ('Nosy Boraha', 'Ambodifotatra')),
+    ('Vavatenina', 'district', 'Analanjirofo', -17.4667, 49.2000, ()),
+    ('Brickaville', 'district', 'Atsinanana', -18.8167, 49.0667, ('Vohibinany',)),
+    ('Vatomandry', 'district', 'Atsinanana', -19.3333, 48.9833, ()),
+    ('Mahanoro', 'district', 'Atsinanana', -19.9000, 48.8000, ()),
+    ('Marolambo', 'district', 'Atsinanana', -20.0500, 48.1167, ()),
+    ('Arivonimamo', 'district', 'Itasy', -19.0167, 47.1833, ()),
+    ('Soavinandriana', 'district', 'Itasy', -19.1667, 46.7333, ()),
+    ('Ankazobe', 'district', 'Analamanga', -18.3167, 47.1167, ()),
+    ('Anjozorobe', 'district', 'Analamanga', -18.4000, 47.8667, ()),
+    ('Manjakandriana', 'district', 'Analamanga', -18.9167, 47.8000, ()),
+    ('Andramasina', 'district', 'Analamanga', -19.1833, 47.5833, ()),
+    ('Fenoarivobe', 'district', 'Bongolava', -18.4333, 46.5667, ()),
+)
+
+
+def normalize_place(text):
+    # Copie figee de apps.core.geo.normalize_place
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(text.lower().replace("'", '').replace('-', ' ').replace(',', ' ').split())
+
+
+def load(apps, schema_editor):
+    Location = apps.get_model('location', 'Location')
+    for name, kind, region, latitude, longitude, aliases in GAZETTEER:
+        Location.objects.update_or_create(normalized_name=normalize_place(name), defaults={
+            'name': name, 'kind': kind, 'region': region, 'latitude': latitude, 'longitude': longitude,
+            'aliases': [normalize_place(alias) for alias in aliases],
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(load, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0002_load_gazetteer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='matrix_index',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
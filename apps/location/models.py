@@ -0,0 +1,26 @@
+from django.contrib.postgres.fields import ArrayField
+from django.db import models
+
+
+class Location(models.Model):
+    """
+    Lieu du gazetteer (chef-lieu de region ou de district), voir apps.location.gazetteer.
+    """
+    KIND_CHOICES = [
+        ('capital', 'Region capital'),
+        ('district', 'District seat'),
+    ]
+
+    name = models.CharField(max_length=100)
+    normalized_name = models.CharField(max_length=100, unique=True)  # voir apps.core.geo.normalize_place
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default='district')
+    region = models.CharField(max_length=50)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    aliases = ArrayField(models.CharField(max_length=100), blank=True, default=list,
+                         help_text="Usual or colonial names, normalized (e.g. tamatave)")
+    # Ligne / colonne du lieu dans la matrice des distances (voir apps.location.matrix)
+    matrix_index = models.PositiveIntegerField(null=True, blank=True, editable=False)
+
+    def __str__(self):
+        return self.name
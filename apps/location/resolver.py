@@ -0,0 +1,79 @@
+import difflib
+from functools import lru_cache
+
+from apps.core.geo import normalize_place
+from apps.location.models import Location
+
+# Ressemblance minimale (difflib) pour accepter une faute de frappe ("Toamsina" -> Toamasina)
+FUZZY_CUTOFF = 0.85
+FUZZY_MIN_LENGTH = 4
+# Nombre de mots consecutifs compares au gazetteer ("fenoarivo atsinanana", "belo sur tsiribihina")
+MAX_NAME_WORDS = 3
+
+
+@lru_cache(maxsize=1)
+def gazetteer_names():
+    """
+    Noms et alias normalises -> id du lieu, les plus longs d'abord ("diego suarez" avant "diego").
+    """
+    names = {}
+    for pk, name, aliases in Location.objects.values_list('id', 'normalized_name', 'aliases'):
+        names[name] = pk
+        for alias in aliases:
+            names.setdefault(alias, pk)
+    return dict(sorted(names.items(), key=lambda item: len(item[0]), reverse=True))
+
+
+@lru_cache(maxsize=4096)
+def resolve_normalized(text):
+    names = gazetteer_names()
+    if text in names:
+        return names[text]
+
+    # Nom du lieu dans une adresse libre ("port de tamatave", "analakely antananarivo")
+    padded = f' {text} '
+    for name, pk in names.items():
+        if f' {name} ' in padded:
+            return pk
+
+    # Fautes de frappe : groupes de mots consecutifs compares aux noms connus
+    words = text.split()
+    best, best_ratio = None, 0.0
+    for size in range(1, MAX_NAME_WORDS + 1):
+        for start in range(len(words) - size + 1):
+            candidate = ' '.join(words[start:start + size])
+            if len(candidate) < FUZZY_MIN_LENGTH:
+                continue
+            matches = difflib.get_close_matches(candidate, names, n=1, cutoff=FUZZY_CUTOFF)
+            if matches:
+                ratio = difflib.SequenceMatcher(None, candidate, matches[0]).ratio()
+                if ratio > best_ratio:
+                    best, best_ratio = names[matches[0]], ratio
+    return best
+
+
+def resolve_location_id(text):
+    """
+    Id du lieu (Location) d'une adresse libre, ou None. Les resultats sont gardes en cache (LRU) par processus.
+    """
+    if not text:
+        return None
+    return resolve_normalized(normalize_place(text))
+
+
+def resolve_location(text):
+    pk = resolve_location_id(text)
+    return Location.objects.get(pk=pk) if pk is not None else None
+
+
+def resolve_places(instance):
+    """
+    Renseigne les lieux resolus d'une demande ou d'un bon de livraison, a partir des adresses libres.
+    """
+    instance.pickup_place_id = resolve_location_id(instance.pickup_location)
+    instance.delivery_place_id = resolve_location_id(instance.delivery_location)
+
+
+def clear_cache():
+    gazetteer_names.cache_clear()
+    resolve_normalized.cache_clear()
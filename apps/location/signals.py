@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.location.models import Location
+from apps.location.resolver import clear_cache, resolve_places
+from apps.sendingRequest.models import DeliveryNote, SendingRequest
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def location_changed(sender, **kwargs):
+    clear_cache()
+
+
+@receiver(pre_save, sender=SendingRequest)
+@receiver(pre_save, sender=DeliveryNote)
+def sending_request_saved(sender, instance, **kwargs):
+    resolve_places(instance)
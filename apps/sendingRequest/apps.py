@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ExpressrequestConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.sendingRequest'
+
+    def ready(self):
+        # Colonnes numeriques des dimensions et journal des modifications des assignations
+        from apps.sendingRequest import signals  # noqa: F401
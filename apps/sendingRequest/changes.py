@@ -0,0 +1,77 @@
+from django.db import connection, transaction
+from django.db.models import Max
+
+from apps.sendingRequest.models import AssignmentChange
+
+# Cle (premier entier) des verrous consultatifs du journal ; la seconde cle est le hash du chef de flotte
+CHANGE_FEED_LOCK = 7018
+
+# Nombre maximal d'entrees du journal lues par appel de synchronisation
+CHANGES_PAGE_SIZE = 500
+
+
+def lock_feeds(chief_ids):
+    """
+    Serialise les ajouts au journal de chaque chef jusqu'au commit : une transaction qui obtient un numero
+    de sequence plus grand commit forcement apres, et un client ne saute jamais une entree avec son curseur.
+    Les chefs sont verrouilles dans un ordre fixe (pas d'interblocage).
+    """
+    with connection.cursor() as cursor:
+        for chief_id in sorted(map(str, chief_ids)):
+            cursor.execute("SELECT pg_advisory_xact_lock(%s, hashtext(%s))", [CHANGE_FEED_LOCK, chief_id])
+
+
+def record_changes(assignments):
+    """
+    Ajoute au journal l'etat courant des assignations de `assignments` (un queryset).
+    """
+    rows = list(assignments.order_by().values_list('pk', 'fleet_manager', 'status', 'sending_request__status'))
+    if not rows:
+        return
+    with transaction.atomic():
+        lock_feeds({row[1] for row in rows})
+        AssignmentChange.objects.bulk_create(
+            AssignmentChange(assignment_id=pk, fleet_manager_id=chief_id, status=status, request_status=request_status)
+            for pk, chief_id, status, request_status in rows
+        )
+
+
+def record_deletion(assignment):
+    with transaction.atomic():
+        lock_feeds([assignment.fleet_manager_id])
+        AssignmentChange.objects.create(assignment_id=assignment.pk, fleet_manager_id=assignment.fleet_manager_id,
+                                        status=assignment.status, deleted=True)
+
+
+def changes_since(chief, since, limit=CHANGES_PAGE_SIZE):
+    """
+    Assignations du chef modifiees apres le numero de sequence `since`.
+
+    Renvoie (curseur, ids modifies, ids supprimes, suite) : plusieurs entrees d'une meme assignation
+    n'en donnent qu'une, la plus recente. `suite` est vrai s'il reste des entrees apres le curseur.
+    """
+    entries = list(AssignmentChange.objects.filter(fleet_manager=chief, pk__gt=since).order_by('pk').values_list(
+        'pk', 'assignment_id', 'deleted')[:limit + 1])
+    more = len(entries) > limit
+    entries = entries[:limit]
+    if not entries:
+        return since, [], [], False
+
+    latest = {}
+    for _, assignment_id, deleted in entries:
+        latest[assignment_id] = deleted
+    changed = [pk for pk, deleted in latest.items() if not deleted]
+    deleted = [pk for pk, deleted in latest.items() if deleted]
+    return entries[-1][0], changed, deleted, more
+
+
+def compact_changes():
+    """
+    Supprime les entrees remplacees par une entree plus recente de la meme assignation. Le resultat d'un
+    `changes_since` ne change pas (seule la derniere entree de chaque assignation est lue), le journal ne
+    grandit plus qu'avec le nombre d'assignations.
+    """
+    latest = AssignmentChange.objects.values('assignment_id').annotate(last=Max('pk')).values('last')
+    deleted, _ = AssignmentChange.objects.exclude(pk__in=latest).delete()
+    return deleted
+
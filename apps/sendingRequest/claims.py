@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.sendingRequest.models import SendingRequest
+
+# Ordre de distribution : priorite haute d'abord ('high' < 'medium'), puis la prise en charge la plus proche.
+# Suit l'index partiel sending_req_claim_queue_idx.
+CLAIM_ORDER = ('priority', 'pickup_date_time', 'id')
+
+
+def claim_lease():
+    return timedelta(seconds=settings.SENDING_REQUEST_CLAIM_LEASE)
+
+
+def available_to(chief, now):
+    """
+    Demandes non reservees, reservees par `chief`, ou dont la reservation a expire (liberee sans ecriture).
+    """
+    return Q(claimed_by__isnull=True) | Q(claimed_by=chief) | Q(claim_expires_at__lte=now)
+
+
+def claim_queue(now):
+    """
+    Demandes acceptees libres dans l'ordre de distribution.
+    """
+    return SendingRequest.objects.filter(
+        Q(claimed_by__isnull=True) | Q(claim_expires_at__lte=now), status='accepted',
+    ).order_by(*CLAIM_ORDER)
+
+
+def claim_next(chief, now=None):
+    """
+    Reserve pour `chief` la prochaine demande acceptee libre, ou renvoie None si la file est vide.
+    Un chef ne tient qu'une reservation a la fois : tant qu'elle n'a pas expire, elle est renvoyee telle quelle.
+
+    `FOR UPDATE SKIP LOCKED` : les chefs qui reservent en meme temps sautent les lignes qu'un autre est en
+    train de prendre au lieu d'attendre son commit, chacun repart avec une demande differente. Les appels
+    simultanes d'un meme chef attendent sur sa ligne utilisateur.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        get_user_model().objects.select_for_update().filter(pk=chief.pk).first()
+        sending_request = SendingRequest.objects.filter(claimed_by=chief, claim_expires_at__gt=now,
+                                                        status='accepted').first()
+        if sending_request is not None:
+            return sending_request
+        sending_request = claim_queue(now).select_for_update(skip_locked=True).first()
+        if sending_request is None:
+            return None
+        expires_at = now + claim_lease()
+        SendingRequest.objects.filter(pk=sending_request.pk).update(claimed_by=chief, claim_expires_at=expires_at,
+                                                                   updated_at=now)
+    sending_request.claimed_by, sending_request.claim_expires_at, sending_request.updated_at = chief, expires_at, now
+    return sending_request
+
+
+def release_claim(chief, pk):
+    """
+    Rend une demande reservee par `chief` a la file. Renvoie False si `chief` ne la reserve pas (ou plus).
+    """
+    return bool(SendingRequest.objects.filter(pk=pk, claimed_by=chief, status='accepted').update(
+        claimed_by=None, claim_expires_at=None, updated_at=timezone.now()))
@@ -0,0 +1,216 @@
+from collections import defaultdict
+
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.core.geo import normalize_place
+from apps.sendingRequest.claims import available_to
+from apps.sendingRequest.models import SendingRequest
+from apps.truck.recommendation import busy_trucks_between, required_capacity, truck_index
+
+# Petits envois qui peuvent partager un camion
+CONSOLIDABLE_CARGO_TYPES = ('pallets_boxes', 'furniture_tools')
+
+# Nombre maximal de demandes acceptees examinees en une fois (les plus proches de la prise en charge)
+CONSOLIDATION_MAX_REQUESTS = 2000
+
+# Conditions speciales reconnues dans le texte libre (`special_conditions`, `additional_details`)
+CONDITION_KEYWORDS = {
+    'refrigerated': ('refriger', 'frigo', 'froid', 'cold', 'chilled', 'frozen', 'congel'),
+    'animals': ('animal', 'animaux', 'livestock', 'betail', 'volaille', 'poultry'),
+    'hazardous': ('hazard', 'danger', 'inflammable', 'flammable', 'toxi', 'chimique', 'chemical'),
+    'food': ('food', 'aliment', 'perishable', 'perissable', 'denree'),
+}
+# Conditions qui ne peuvent pas voyager dans le meme camion
+INCOMPATIBLE_CONDITIONS = (
+    frozenset({'hazardous', 'food'}),
+    frozenset({'hazardous', 'animals'}),
+    frozenset({'animals', 'food'}),
+)
+# Conditions qui imposent le meme regime a tout le chargement (tout refrigere ou rien)
+EXCLUSIVE_CONDITIONS = ('refrigerated',)
+
+
+def special_conditions(sending_request):
+    text = normalize_place(f"{sending_request.special_conditions or ''} {sending_request.additional_details or ''}")
+    tags = {tag for tag, keywords in CONDITION_KEYWORDS.items() if any(keyword in text for keyword in keywords)}
+    if sending_request.cargo_type == 'animals':
+        tags.add('animals')
+    return frozenset(tags)
+
+
+def compatible(tags, other):
+    if any((tag in tags) != (tag in other) for tag in EXCLUSIVE_CONDITIONS):
+        return False
+    return not any(frozenset({a, b}) in INCOMPATIBLE_CONDITIONS for a in tags for b in other)
+
+
+class Item:
+    def __init__(self, sending_request):
+        self.sending_request = sending_request
+        self.id = sending_request.pk
+        self.load = required_capacity(sending_request)
+        self.volume = sending_request.volume  # None : dimensions illisibles, seul le poids est verifie
+        self.conditions = special_conditions(sending_request)
+
+
+class Load:
+    """
+    Chargement d'un camion : demandes, poids (t) et volume (m3) cumules.
+    """
+
+    def __init__(self, truck):
+        self.truck = truck
+        self.items = []
+        self.load = 0.0
+        self.volume = 0.0
+
+    def fits(self, item, truck=None):
+        truck = truck or self.truck
+        if self.load + item.load > truck.capacity:
+            return False
+        if truck.cargo_volume is not None and self.volume + (item.volume or 0) > truck.cargo_volume:
+            return False
+        return all(compatible(item.conditions, other.conditions) for other in self.items)
+
+    def holds(self, truck):
+        return self.load <= truck.capacity and (truck.cargo_volume is None or self.volume <= truck.cargo_volume)
+
+    def add(self, item):
+        self.items.append(item)
+        self.load += item.load
+        self.volume += item.volume or 0
+
+
+def check_load(sending_requests, truck):
+    """
+    Message d'erreur si les demandes ne tiennent pas ensemble dans le camion (TruckEntry), sinon None.
+    """
+    load = Load(truck)
+    for sending_request in sending_requests:
+        item = Item(sending_request)
+        if not load.fits(item):
+            if any(not compatible(item.conditions, other.conditions) for other in load.items):
+                return f"Request {item.id} cannot travel with the others (special conditions)"
+            return f"Request {item.id} exceeds the truck capacity (weight or volume)"
+        load.add(item)
+    return None
+
+
+def check_grouping(sending_requests):
+    """
+    Message d'erreur si les demandes ne forment pas un groupage que `plan_consolidation` pourrait proposer
+    (petits envois, meme corridor, meme jour de prise en charge), sinon None.
+    """
+    first = sending_requests[0]
+    day = timezone.localdate(first.pickup_date_time)
+    for sending_request in sending_requests:
+        if sending_request.cargo_type not in CONSOLIDABLE_CARGO_TYPES:
+            return f"Request {sending_request.pk} cannot be consolidated (cargo type {sending_request.cargo_type})"
+        if sending_request.pickup_place_id is None or sending_request.delivery_place_id is None:
+            return f"Request {sending_request.pk} has unresolved pickup or delivery location"
+        if (sending_request.pickup_place_id, sending_request.delivery_place_id) != (first.pickup_place_id,
+                                                                                    first.delivery_place_id):
+            return "All requests of a trip must share the same pickup and delivery places"
+        if timezone.localdate(sending_request.pickup_date_time) != day:
+            return "All requests of a trip must be picked up the same day"
+    return None
+
+
+def pack(items, trucks):
+    """
+    First-fit decreasing : chaque demande (la plus lourde d'abord) rejoint le premier chargement ou elle
+    tient, sinon ouvre un chargement sur le plus grand camion libre. Chaque chargement passe ensuite sur
+    le plus petit camion libre qui le porte encore. `trucks` (camions libres) est modifiee.
+    """
+    loads, unplaced = [], []
+    trucks.sort(key=lambda truck: (-truck.capacity, truck.id))
+    for item in sorted(items, key=lambda item: (-item.load, -(item.volume or 0), item.id)):
+        load = next((load for load in loads if load.fits(item)), None)
+        if load is None:
+            truck = next((truck for truck in trucks if Load(truck).fits(item)), None)
+            if truck is None:
+                unplaced.append(item.id)
+                continue
+            trucks.remove(truck)
+            load = Load(truck)
+            loads.append(load)
+        load.add(item)
+
+    for load in sorted(loads, key=lambda load: load.load):
+        smaller = min((truck for truck in trucks if truck.capacity < load.truck.capacity and load.holds(truck)),
+                      key=lambda truck: (truck.capacity, truck.id), default=None)
+        if smaller is not None:
+            trucks.remove(smaller)
+            trucks.append(load.truck)
+            load.truck = smaller
+    return loads, unplaced
+
+
+def consolidation_candidates(max_volume=None, now=None, chief=None):
+    now = now or timezone.now()
+    candidates = SendingRequest.objects.filter(
+        status='accepted', cargo_type__in=CONSOLIDABLE_CARGO_TYPES, pickup_date_time__gte=now,
+        pickup_place__isnull=False, delivery_place__isnull=False,
+    )
+    if chief is not None:
+        # Sans les demandes reservees par un autre chef (apps.sendingRequest.claims)
+        candidates = candidates.filter(available_to(chief, now))
+    if max_volume is not None:
+        # Filtre fait par PostgreSQL (colonne `volume` indexee) : rien a charger pour les envois trop volumineux
+        candidates = candidates.filter(Q(volume__isnull=True) | Q(volume__lte=max_volume))
+    return candidates.select_related('pickup_place', 'delivery_place').order_by(
+        'pickup_date_time', 'id')[:CONSOLIDATION_MAX_REQUESTS]
+
+
+def plan_consolidation(chief_id):
+    """
+    Propose des groupages des petites demandes acceptees : meme corridor (lieux resolus de prise en charge
+    et de livraison) et meme jour de prise en charge, avec les camions disponibles du chef ce jour-la.
+    Rien n'est reserve : le chef confirme un groupage avec FleetTripView.
+    """
+    trucks = list(truck_index.get(chief_id).trucks.values())
+    volumes = [truck.cargo_volume for truck in trucks]
+    max_volume = max(volumes) if volumes and None not in volumes else None
+
+    days = defaultdict(lambda: defaultdict(list))
+    for sending_request in consolidation_candidates(max_volume, chief=chief_id):
+        day = timezone.localdate(sending_request.pickup_date_time)
+        days[day][(sending_request.pickup_place, sending_request.delivery_place)].append(sending_request)
+
+    trips, unplaced = [], []
+    for day, corridors in sorted(days.items()):
+        requests = [sending_request for corridor in corridors.values() for sending_request in corridor]
+        busy = busy_trucks_between(chief_id, min(r.pickup_date_time for r in requests),
+                                   max(r.delivery_date_time for r in requests))
+        free = [truck for truck in trucks if truck.id not in busy
+                and (truck.next_maintenance_due is None or truck.next_maintenance_due > day)]
+
+        # Les corridors les plus charges choisissent leurs camions en premier
+        for (pickup, delivery), group in sorted(corridors.items(), key=lambda corridor: -len(corridor[1])):
+            if len(group) < 2:
+                continue
+            loads, missing = pack([Item(sending_request) for sending_request in group], free)
+            unplaced.extend(missing)
+            # Une demande seule garde l'assignation simple : son camion reste libre
+            free.extend(load.truck for load in loads if len(load.items) == 1)
+            trips.extend(
+                {
+                    'pickup_day': day,
+                    'pickup_place': pickup.name,
+                    'delivery_place': delivery.name,
+                    'sending_requests': sorted(item.id for item in load.items),
+                    'truck': {
+                        'id': load.truck.id,
+                        'license_plate': load.truck.license_plate,
+                        'max_load_capacity': load.truck.capacity,
+                        'cargo_volume': load.truck.cargo_volume,
+                    },
+                    'load_tonnes': round(load.load, 3),
+                    'volume_m3': round(load.volume, 3),
+                    'load_ratio': round(load.load / load.truck.capacity, 3) if load.truck.capacity else None,
+                    'conditions': sorted(set().union(*(item.conditions for item in load.items))),
+                }
+                for load in loads if len(load.items) > 1
+            )
+    return {'trips': trips, 'unplaced': unplaced}
@@ -0,0 +1,53 @@
+import re
+import unicodedata
+
+# Metres par unite ; `dimensions` est documente en "LxWxH" avec l'unite a la fin ("100x50x30 cm")
+UNIT_TO_METRES = {
+    'mm': 0.001, 'millimetre': 0.001, 'millimeter': 0.001,
+    'cm': 0.01, 'centimetre': 0.01, 'centimeter': 0.01,
+    'dm': 0.1,
+    'm': 1.0, 'metre': 1.0, 'meter': 1.0,
+    'in': 0.0254, 'inch': 0.0254, 'inches': 0.0254, '"': 0.0254,
+    'ft': 0.3048, 'feet': 0.3048, 'foot': 0.3048,
+}
+DEFAULT_UNIT = 'cm'
+
+# Au-dela, la valeur est sans doute une faute de saisie (unite oubliee, zero en trop)
+MAX_SIDE_METRES = 30
+
+_UNIT = '|'.join(sorted((re.escape(unit) for unit in UNIT_TO_METRES), key=len, reverse=True))
+# Nombre, suivi d'une unite eventuelle ("100", "1,20 m", "80cm", "30 centimetres")
+SIDE_RE = re.compile(rf'(\d+(?:[.,]\d+)?)\s*(?:({_UNIT})s?(?![a-z0-9]))?')
+
+
+def parse_dimensions(text):
+    """
+    (longueur, largeur, hauteur) en metres, ou None si le texte ne contient pas exactement trois cotes.
+
+    Accepte les separateurs usuels ("100x50x30 cm", "120 × 80 × 100", "100*50*30"), les libelles
+    ("L: 1,20 m, l: 80 cm, H: 1 m") et une unite par cote ; sans unite, celle du dernier cote s'applique,
+    et "cm" par defaut.
+    """
+    text = (text or '').replace('×', 'x')
+    normalized = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+    sides = SIDE_RE.findall(normalized)
+    if len(sides) != 3:
+        return None
+    default = sides[-1][1] or DEFAULT_UNIT
+    metres = tuple(float(value.replace(',', '.')) * UNIT_TO_METRES[unit or default] for value, unit in sides)
+    if not all(0 < side <= MAX_SIDE_METRES for side in metres):
+        return None
+    return metres
+
+
+def fill_dimensions(instance):
+    """
+    Renseigne les colonnes numeriques d'une demande ou d'un bon de livraison a partir de `dimensions`.
+    `volume` est le volume total (un element x quantite), en m3.
+    """
+    sides = parse_dimensions(instance.dimensions)
+    if sides is None:
+        instance.length = instance.width = instance.height = instance.volume = None
+        return
+    instance.length, instance.width, instance.height = (round(side, 4) for side in sides)
+    instance.volume = round(sides[0] * sides[1] * sides[2] * instance.quantity, 6)
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.5 on 2026-10-18 10:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sendingRequest', '0004_remove_sendingrequest_payment_method_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sendingrequest',
+            index=models.Index(fields=['request_date', 'id'], name='sending_req_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.5 on 2026-10-18 10:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sendingRequest', '0005_sendingrequest_date_id_index'),
+        ('truck', '0004_remove_truck_current_location_and_more'),
+        ('users', '0010_alter_member_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sendingrequest',
+            index=models.Index(fields=['status', 'request_date', 'id'], name='sending_req_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sendingrequest',
+            index=models.Index(fields=['client', 'request_date', 'id'], name='sending_req_client_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sendingrequestfleetassignment',
+            index=models.Index(condition=models.Q(('status', 'assigned')), fields=['sending_request'], name='assignment_assigned_req_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sendingrequestfleetassignment',
+            index=models.Index(fields=['fleet_manager', 'status'], name='assignment_manager_status_idx'),
+        ),
+    ]
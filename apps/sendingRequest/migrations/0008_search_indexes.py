@@ -0,0 +1,44 @@
+# Generated by Django 5.1.5 on 2026-10-18 10:38
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sendingRequest', '0007_updated_at'),
+        ('users', '0010_alter_member_status'),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        migrations.AddField(
+            model_name='sendingrequest',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('recipient_name', config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector('pickup_location', 'delivery_location', config='simple', weight='B'), django.contrib.postgres.search.SearchConfig('simple')), '||', django.contrib.postgres.search.SearchVector('additional_details', 'special_conditions', config='simple', weight='C'), django.contrib.postgres.search.SearchConfig('simple')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='sendingrequest',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='sending_req_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sendingrequest',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('recipient_name'), name='gin_trgm_ops'), name='sending_req_name_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sendingrequest',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('recipient_phone'), name='gin_trgm_ops'), name='sending_req_phone_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sendingrequest',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('pickup_location'), name='gin_trgm_ops'), name='sending_req_pickup_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sendingrequest',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('delivery_location'), name='gin_trgm_ops'), name='sending_req_delivery_trgm_idx'),
+        ),
+    ]
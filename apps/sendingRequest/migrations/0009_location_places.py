@@ -0,0 +1,35 @@
+# Generated by Django 5.1.5 on 2026-10-18 11:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0001_initial'),
+        ('sendingRequest', '0008_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deliverynote',
+            name='delivery_place',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='location.location'),
+        ),
+        migrations.AddField(
+            model_name='deliverynote',
+            name='pickup_place',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='location.location'),
+        ),
+        migrations.AddField(
+            model_name='sendingrequest',
+            name='delivery_place',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='location.location'),
+        ),
+        migrations.AddField(
+            model_name='sendingrequest',
+            name='pickup_place',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='location.location'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.5 on 2026-10-18 13:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sendingRequest', '0009_location_places'),
+        ('truck', '0007_cargo_volume'),
+        ('users', '0010_alter_member_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FleetTrip',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('planned', 'Planned'), ('in_progress', 'In Progress'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], default='planned', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('driver', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trips', to='users.driver')),
+                ('fleet_manager', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trips', to='users.chieffleet')),
+                ('truck', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trips', to='truck.truck')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='sendingrequestfleetassignment',
+            name='trip',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assignments', to='sendingRequest.fleettrip'),
+        ),
+    ]
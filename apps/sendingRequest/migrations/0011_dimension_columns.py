@@ -0,0 +1,67 @@
+# Generated by Django 5.1.5 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0003_matrix_index'),
+        ('sendingRequest', '0010_fleet_trip'),
+        ('users', '0010_alter_member_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deliverynote',
+            name='height',
+            field=models.FloatField(blank=True, help_text='Item height in metres', null=True),
+        ),
+        migrations.AddField(
+            model_name='deliverynote',
+            name='length',
+            field=models.FloatField(blank=True, help_text='Item length in metres', null=True),
+        ),
+        migrations.AddField(
+            model_name='deliverynote',
+            name='volume',
+            field=models.FloatField(blank=True, help_text='Total volume in cubic metres (all items)', null=True),
+        ),
+        migrations.AddField(
+            model_name='deliverynote',
+            name='width',
+            field=models.FloatField(blank=True, help_text='Item width in metres', null=True),
+        ),
+        migrations.AddField(
+            model_name='sendingrequest',
+            name='height',
+            field=models.FloatField(blank=True, help_text='Item height in metres', null=True),
+        ),
+        migrations.AddField(
+            model_name='sendingrequest',
+            name='length',
+            field=models.FloatField(blank=True, help_text='Item length in metres', null=True),
+        ),
+        migrations.AddField(
+            model_name='sendingrequest',
+            name='volume',
+            field=models.FloatField(blank=True, help_text='Total volume in cubic metres (all items)', null=True),
+        ),
+        migrations.AddField(
+            model_name='sendingrequest',
+            name='width',
+            field=models.FloatField(blank=True, help_text='Item width in metres', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='deliverynote',
+            index=models.Index(fields=['volume'], name='delivery_note_volume_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sendingrequest',
+            index=models.Index(fields=['status', 'volume'], name='sending_req_status_volume_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sendingrequest',
+            index=models.Index(fields=['status', 'height', 'width', 'length'], name='sending_req_status_dims_idx'),
+        ),
+    ]
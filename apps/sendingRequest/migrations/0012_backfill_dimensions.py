@@ -0,0 +1,83 @@
+# Generated by Django 5.1.5 on 2026-10-18 13:42
+
+import re
+import unicodedata
+
+from django.db import migrations, transaction
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+# Copie figee de apps/sendingRequest/dimensions.py au moment de la migration : le parseur peut evoluer,
+# cette migration doit toujours remplir les colonnes de la meme facon.
+UNIT_TO_METRES = {
+    'mm': 0.001, 'millimetre': 0.001, 'millimeter': 0.001,
+    'cm': 0.01, 'centimetre': 0.01, 'centimeter': 0.01,
+    'dm': 0.1,
+    'm': 1.0, 'metre': 1.0, 'meter': 1.0,
+    'in': 0.0254, 'inch': 0.0254, 'inches': 0.0254, '"': 0.0254,
+    'ft': 0.3048, 'feet': 0.3048, 'foot': 0.3048,
+}
+DEFAULT_UNIT = 'cm'
+MAX_SIDE_METRES = 30
+
+_UNIT = '|'.join(sorted((re.escape(unit) for unit in UNIT_TO_METRES), key=len, reverse=True))
+SIDE_RE = re.compile(rf'(\d+(?:[.,]\d+)?)\s*(?:({_UNIT})s?(?![a-z0-9]))?')
+
+
+def parse_dimensions(text):
+    text = (text or '').replace('×', 'x')
+    normalized = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+    sides = SIDE_RE.findall(normalized)
+    if len(sides) != 3:
+        return None
+    default = sides[-1][1] or DEFAULT_UNIT
+    metres = tuple(float(value.replace(',', '.')) * UNIT_TO_METRES[unit or default] for value, unit in sides)
+    if not all(0 < side <= MAX_SIDE_METRES for side in metres):
+        return None
+    return metres
+
+
+def fill_dimensions(instance):
+    sides = parse_dimensions(instance.dimensions)
+    if sides is None:
+        instance.length = instance.width = instance.height = instance.volume = None
+        return
+    instance.length, instance.width, instance.height = (round(side, 4) for side in sides)
+    instance.volume = round(sides[0] * sides[1] * sides[2] * instance.quantity, 6)
+
+
+def backfill(apps, schema_editor):
+    """
+    Remplit les colonnes numeriques des lignes existantes, par lots (une transaction par lot).
+    """
+    for name in ('SendingRequest', 'DeliveryNote'):
+        model = apps.get_model('sendingRequest', name)
+        fields = ['length', 'width', 'height', 'volume']
+        if name == 'SendingRequest':
+            fields.append('updated_at')  # la mise a jour doit invalider les ETag des listes
+        last_id = 0
+        while True:
+            rows = list(model.objects.filter(id__gt=last_id, volume__isnull=True).order_by('id').only(
+                'id', 'dimensions', 'quantity')[:BATCH_SIZE])
+            if not rows:
+                break
+            now = timezone.now()
+            for row in rows:
+                fill_dimensions(row)
+                row.updated_at = now
+            with transaction.atomic():
+                model.objects.bulk_update([row for row in rows if row.volume is not None], fields)
+            last_id = rows[-1].id
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('sendingRequest', '0011_dimension_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
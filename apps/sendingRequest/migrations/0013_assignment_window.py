@@ -0,0 +1,76 @@
+# Generated by Django 5.1.5 on 2026-10-18 14:10
+
+from collections import defaultdict
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+BUSY_STATUSES = ('assigned', 'in_progress')
+
+
+def backfill(apps, schema_editor):
+    """
+    Fenetre de chaque assignation depuis sa demande. Une assignation dont la livraison ne suit pas la prise en
+    charge, ou une assignation en cours qui chevauche une assignation plus ancienne du meme chauffeur ou camion,
+    garde une fenetre vide : elle echappe aux contraintes au lieu de bloquer la migration. Ces assignations sont
+    listees dans la sortie de `migrate`, pour etre corrigees a la main.
+    """
+    Assignment = apps.get_model('sendingRequest', 'SendingRequestFleetAssignment')
+    taken = defaultdict(list)  # ('driver' | 'truck', id) -> [(debut, fin, trajet)]
+    assignments = []
+    invalid, overlapping = [], []
+    for assignment in Assignment.objects.select_related('sending_request').order_by('assigned_at', 'id').iterator():
+        start = assignment.sending_request.pickup_date_time
+        end = assignment.sending_request.delivery_date_time
+        if start >= end:
+            invalid.append(assignment.id)
+            continue
+        if assignment.status in BUSY_STATUSES:
+            key = assignment.trip_id or -assignment.id
+            resources = [resource for resource in (('driver', assignment.driver_id), ('truck', assignment.truck_id))
+                         if resource[1] is not None]
+            if any(other_start < end and start < other_end and other_key != key
+                   for resource in resources for other_start, other_end, other_key in taken[resource]):
+                overlapping.append(assignment.id)
+                continue
+            for resource in resources:
+                taken[resource].append((start, end, key))
+        assignment.window = (start, end)
+        assignments.append(assignment)
+    Assignment.objects.bulk_update(assignments, ['window'], batch_size=1000)
+
+    if invalid:
+        print(f"\n  Assignments without window (delivery not after pickup): {invalid}")
+    if overlapping:
+        print(f"\n  Assignments without window (driver or truck already busy): {overlapping}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sendingRequest', '0012_backfill_dimensions'),
+        ('truck', '0007_cargo_volume'),
+        ('users', '0010_alter_member_status'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddField(
+            model_name='sendingrequestfleetassignment',
+            name='window',
+            field=django.contrib.postgres.fields.ranges.DateTimeRangeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='sendingrequestfleetassignment',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status__in', ('assigned', 'in_progress'))), expressions=[('driver', '='), ('window', '&&'), (django.db.models.functions.comparison.Coalesce('trip', django.db.models.expressions.CombinedExpression(models.F('id'), '*', models.Value(-1))), '<>')], name='assignment_driver_no_overlap'),
+        ),
+        migrations.AddConstraint(
+            model_name='sendingrequestfleetassignment',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status__in', ('assigned', 'in_progress'))), expressions=[('truck', '='), ('window', '&&'), (django.db.models.functions.comparison.Coalesce('trip', django.db.models.expressions.CombinedExpression(models.F('id'), '*', models.Value(-1))), '<>')], name='assignment_truck_no_overlap'),
+        ),
+    ]
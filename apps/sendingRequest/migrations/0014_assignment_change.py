@@ -0,0 +1,45 @@
+# Generated by Django 5.1.5 on 2026-10-18 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed(apps, schema_editor):
+    """
+    Une entree par assignation existante : un client qui synchronise depuis 0 recoit tout.
+    """
+    Assignment = apps.get_model('sendingRequest', 'SendingRequestFleetAssignment')
+    AssignmentChange = apps.get_model('sendingRequest', 'AssignmentChange')
+    rows = Assignment.objects.order_by('id').values_list('id', 'fleet_manager', 'status', 'sending_request__status')
+    AssignmentChange.objects.bulk_create(
+        (AssignmentChange(assignment_id=pk, fleet_manager_id=chief_id, status=status, request_status=request_status)
+         for pk, chief_id, status, request_status in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sendingRequest', '0013_assignment_window'),
+        ('users', '0010_alter_member_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssignmentChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assignment_id', models.BigIntegerField()),
+                ('status', models.CharField(blank=True, max_length=20)),
+                ('request_status', models.CharField(blank=True, max_length=20)),
+                ('deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('fleet_manager', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignment_changes', to='users.chieffleet')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['fleet_manager', 'id'], name='assignment_change_seq_idx'), models.Index(fields=['assignment_id', 'id'], name='assignment_change_object_idx')],
+            },
+        ),
+        migrations.RunPython(seed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.5 on 2026-10-18 16:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0003_matrix_index'),
+        ('sendingRequest', '0014_assignment_change'),
+        ('users', '0010_alter_member_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sendingrequest',
+            name='claim_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='sendingrequest',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='users.chieffleet'),
+        ),
+        migrations.AddIndex(
+            model_name='sendingrequest',
+            index=models.Index(condition=models.Q(('status', 'accepted')), fields=['priority', 'pickup_date_time', 'id'], name='sending_req_claim_queue_idx'),
+        ),
+    ]
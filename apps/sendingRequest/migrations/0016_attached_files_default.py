@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sendingRequest', '0015_claim_queue'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='deliverynote',
+            name='attached_files',
+            field=models.FileField(blank=True, default=None, null=True, upload_to='sending_requests'),
+        ),
+        migrations.AlterField(
+            model_name='sendingrequest',
+            name='attached_files',
+            field=models.FileField(blank=True, default=None, null=True, upload_to='sending_requests'),
+        ),
+    ]
@@ -1,5 +1,11 @@
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeOperators
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models.functions import Coalesce, Upper
 
+from apps.location.models import Location
 from apps.truck.models import Truck
 from apps.users.models import Member, ChiefFleet, Driver
 
@@ -51,6 +57,11 @@ class SendingRequest(models.Model):
     weight = models.DecimalField(max_digits=10, decimal_places=2, help_text="Weight in kg")
     dimensions = models.CharField(max_length=100, help_text="Dimensions in LxWxH format (e.g., 100x50x30 cm)")
     quantity = models.PositiveIntegerField(help_text="Number of items or quantity")
+    # Calcules depuis `dimensions` a l'enregistrement (voir apps.sendingRequest.dimensions), vides si illisible
+    length = models.FloatField(null=True, blank=True, help_text="Item length in metres")
+    width = models.FloatField(null=True, blank=True, help_text="Item width in metres")
+    height = models.FloatField(null=True, blank=True, help_text="Item height in metres")
+    volume = models.FloatField(null=True, blank=True, help_text="Total volume in cubic metres (all items)")
 
     # Lieu, date et heure de récupération (Pickup Details)
     pickup_location = models.CharField(max_length=100)
@@ -60,6 +71,10 @@ class SendingRequest(models.Model):
     delivery_location = models.CharField(max_length=100)
     delivery_date_time = models.DateTimeField()
 
+    # Lieux resolus depuis le gazetteer (voir apps.location.resolver), vides si l'adresse n'est pas reconnue
+    pickup_place = models.ForeignKey(Location, on_delete=models.SET_NULL, related_name='+', null=True, blank=True)
+    delivery_place = models.ForeignKey(Location, on_delete=models.SET_NULL, related_name='+', null=True, blank=True)
+
     # Autres spécifications détaillées (Additional Specifications)
     additional_details = models.TextField(blank=True, null=True, help_text="e.g., perishable goods, fragile items")
 
@@ -102,14 +117,50 @@ class SendingRequest(models.Model):
 
     # Métadonnées de la demande (Request Metadata)
     request_date = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
 
+    # Reservation d'une demande acceptee par un chef de flotte jusqu'a `claim_expires_at` (voir apps.sendingRequest.claims)
+    claimed_by = models.ForeignKey(ChiefFleet, on_delete=models.SET_NULL, related_name='+', null=True, blank=True)
+    claim_expires_at = models.DateTimeField(null=True, blank=True)
+
+    # Recherche plein texte, calculee et tenue a jour par PostgreSQL (voir apps.sendingRequest.search)
+    search_vector = models.GeneratedField(
+        expression=(
+                SearchVector('recipient_name', weight='A', config='simple')
+                + SearchVector('pickup_location', 'delivery_location', weight='B', config='simple')
+                + SearchVector('additional_details', 'special_conditions', weight='C', config='simple')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
     def __str__(self):
         return f"Sending Request #{self.client} - {self.cargo_type} ({self.pickup_location} → {self.delivery_location})"
 
     class Meta:
         verbose_name = "Sending Request"
         verbose_name_plural = "Sending Requests"
+        indexes = [
+            GinIndex(fields=['search_vector'], name='sending_req_search_idx'),
+            # Recherche par sous-chaine (icontains => UPPER(...) LIKE), y compris les numeros de telephone
+            *(
+                GinIndex(OpClass(Upper(field), name='gin_trgm_ops'), name=f'sending_req_{short}_trgm_idx')
+                for field, short in (('recipient_name', 'name'), ('recipient_phone', 'phone'),
+                                     ('pickup_location', 'pickup'), ('delivery_location', 'delivery'))
+            ),
+            # Pagination par curseur (voir apps.core.pagination.KeysetPagination)
+            models.Index(fields=['request_date', 'id'], name='sending_req_date_id_idx'),
+            # Listes filtrees par statut (admin, chef de flotte) ou par client, dans l'ordre de pagination
+            models.Index(fields=['status', 'request_date', 'id'], name='sending_req_status_date_idx'),
+            models.Index(fields=['client', 'request_date', 'id'], name='sending_req_client_date_idx'),
+            # Demandes qui tiennent dans un volume ou par un gabarit donnes (groupage, choix du camion)
+            models.Index(fields=['status', 'volume'], name='sending_req_status_volume_idx'),
+            models.Index(fields=['status', 'height', 'width', 'length'], name='sending_req_status_dims_idx'),
+            # File des demandes a prendre, dans l'ordre de distribution ('high' < 'medium')
+            models.Index(fields=['priority', 'pickup_date_time', 'id'], condition=models.Q(status='accepted'),
+                         name='sending_req_claim_queue_idx'),
+        ]
 
 
 class DeliveryNote(models.Model):
@@ -159,6 +210,11 @@ class DeliveryNote(models.Model):
     weight = models.DecimalField(max_digits=10, decimal_places=2, help_text="Weight in kg")
     dimensions = models.CharField(max_length=100, help_text="Dimensions in LxWxH format (e.g., 100x50x30 cm)")
     quantity = models.PositiveIntegerField(help_text="Number of items or quantity")
+    # Calcules depuis `dimensions` a l'enregistrement (voir apps.sendingRequest.dimensions), vides si illisible
+    length = models.FloatField(null=True, blank=True, help_text="Item length in metres")
+    width = models.FloatField(null=True, blank=True, help_text="Item width in metres")
+    height = models.FloatField(null=True, blank=True, help_text="Item height in metres")
+    volume = models.FloatField(null=True, blank=True, help_text="Total volume in cubic metres (all items)")
 
     # Lieu, date et heure de récupération (Pickup Details)
     pickup_location = models.CharField(max_length=100)
@@ -168,6 +224,10 @@ class DeliveryNote(models.Model):
     delivery_location = models.CharField(max_length=100)
     delivery_date_time = models.DateTimeField()
 
+    # Lieux resolus depuis le gazetteer (voir apps.location.resolver), vides si l'adresse n'est pas reconnue
+    pickup_place = models.ForeignKey(Location, on_delete=models.SET_NULL, related_name='+', null=True, blank=True)
+    delivery_place = models.ForeignKey(Location, on_delete=models.SET_NULL, related_name='+', null=True, blank=True)
+
     # Autres spécifications détaillées (Additional Specifications)
     additional_details = models.TextField(blank=True, null=True, help_text="e.g., perishable goods, fragile items")
 
@@ -191,6 +251,33 @@ class DeliveryNote(models.Model):
     class Meta:
         verbose_name = "Sending Request"
         verbose_name_plural = "Sending Requests"
+        indexes = [
+            models.Index(fields=['volume'], name='delivery_note_volume_idx'),
+        ]
+
+
+class FleetTrip(models.Model):
+    """
+    Trajet d'un camion : une ou plusieurs demandes du meme corridor chargees ensemble (voir
+    apps.sendingRequest.consolidation), chacune avec son assignation.
+    """
+    STATUS_CHOICES = [
+        ('planned', 'Planned'),
+        ('in_progress', 'In Progress'),
+        ('completed', 'Completed'),
+        ('cancelled', 'Cancelled'),
+    ]
+
+    fleet_manager = models.ForeignKey(ChiefFleet, on_delete=models.CASCADE, related_name='trips')
+    truck = models.ForeignKey(Truck, on_delete=models.SET_NULL, related_name='trips', null=True)
+    driver = models.ForeignKey(Driver, on_delete=models.SET_NULL, related_name='trips', null=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='planned')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Trip #{self.pk} - {self.truck} ({self.status})"
 
 
 class SendingRequestFleetAssignment(models.Model):
@@ -207,9 +294,60 @@ class SendingRequestFleetAssignment(models.Model):
                                       null=True)
     driver = models.ForeignKey(Driver, on_delete=models.SET_NULL, related_name="Driver", null=True)
     truck = models.ForeignKey(Truck, on_delete=models.SET_NULL, related_name="Truck", null=True)
+    # Trajet partage avec d'autres demandes (groupage), vide pour une assignation simple
+    trip = models.ForeignKey(FleetTrip, on_delete=models.SET_NULL, related_name='assignments', null=True, blank=True)
+    # Fenetre prise en charge -> livraison de la demande, copiee a l'assignation (voir apps.sendingRequest.scheduling)
+    window = DateTimeRangeField(null=True, blank=True)
 
     assigned_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='assigned')
 
     def __str__(self):
         return f"Sending Request {self.sending_request} → Flee Assignment to {self.fleet_manager} - {self.driver} - {self.assigned_at}"
+
+    class Meta:
+        indexes = [
+            # Verification d'une assignation en cours pour une demande
+            models.Index(fields=['sending_request'], condition=models.Q(status='assigned'),
+                         name='assignment_assigned_req_idx'),
+            models.Index(fields=['fleet_manager', 'status'], name='assignment_manager_status_idx'),
+        ]
+        # Un chauffeur ou un camion ne peut pas etre sur deux fenetres qui se chevauchent, sauf pour les demandes
+        # d'un meme trajet (groupage) ; une assignation simple a sa propre cle (-id). Index GiST (btree_gist).
+        constraints = [
+            ExclusionConstraint(
+                name=f'assignment_{field}_no_overlap',
+                expressions=[
+                    (field, RangeOperators.EQUAL),
+                    ('window', RangeOperators.OVERLAPS),
+                    (Coalesce('trip', -models.F('id')), RangeOperators.NOT_EQUAL),
+                ],
+                condition=models.Q(status__in=('assigned', 'in_progress')),
+            )
+            for field in ('driver', 'truck')
+        ]
+
+
+class AssignmentChange(models.Model):
+    """
+    Journal des modifications des assignations d'un chef de flotte (ajout seulement), lu par la
+    synchronisation incrementale `?since=` : l'id sert de numero de sequence (voir apps.sendingRequest.changes).
+    """
+    fleet_manager = models.ForeignKey(ChiefFleet, on_delete=models.CASCADE, related_name='assignment_changes')
+    # Pas de cle etrangere : l'entree (tombstone) survit a la suppression de l'assignation
+    assignment_id = models.BigIntegerField()
+    status = models.CharField(max_length=20, blank=True)
+    request_status = models.CharField(max_length=20, blank=True)
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"#{self.pk} Assignment {self.assignment_id} ({'deleted' if self.deleted else self.status})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['fleet_manager', 'id'], name='assignment_change_seq_idx'),
+            # Compactage : entrees remplacees par une entree plus recente de la meme assignation
+            models.Index(fields=['assignment_id', 'id'], name='assignment_change_object_idx'),
+        ]
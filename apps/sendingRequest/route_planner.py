@@ -0,0 +1,292 @@
+import random
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+from apps.core.geo import AVERAGE_SPEED_KMH
+from apps.location.matrix import DISTANCE, DURATION, location_matrix
+from apps.sendingRequest.models import SendingRequest
+from apps.truck.models import Truck
+from apps.truck.recommendation import required_capacity
+from apps.users.models import DriverChiefRequest
+
+# Temps de chargement / dechargement par arret
+SERVICE_MINUTES = 30
+
+# Nombre maximal d'insertions candidates dont on verifie la faisabilite pour une demande
+MAX_FEASIBILITY_CHECKS = 200
+
+# Demande a planifier : lieux en index de la matrice de distances, fenetre en minutes, charge en tonnes
+PlanRequest = namedtuple('PlanRequest', 'id pickup delivery earliest latest load')
+Vehicle = namedtuple('Vehicle', 'truck capacity driver')
+
+
+class Route:
+    def __init__(self, vehicle):
+        self.vehicle = vehicle
+        self.stops = []  # (index de la demande, True pour l'enlevement / False pour la livraison)
+        self.cost = 0.0
+
+
+class RoutePlanner:
+    """
+    Tournees multi-arrets (enlevement puis livraison) avec fenetres horaires et capacite des camions.
+
+    Heuristique d'insertion (chaque demande est inseree a la position la moins couteuse qui reste faisable,
+    ou ouvre une nouvelle tournee), puis recherche locale par relocalisation des demandes jusqu'a ce qu'aucun
+    deplacement ne reduise la distance, ou que `time_limit` soit atteint. Les tournees sont fermees
+    (retour au premier arret), comme un aller-retour pour une demande seule.
+    """
+
+    def __init__(self, requests, vehicles, distance, speed_kmh=AVERAGE_SPEED_KMH, service_minutes=SERVICE_MINUTES,
+                 time_limit=3.0, seed=0, duration=None):
+        self.requests = requests
+        self.free_vehicles = sorted(vehicles, key=lambda vehicle: vehicle.capacity)
+        self.distance = distance
+        # Temps de trajet en minutes ; a defaut, distance a vitesse moyenne constante
+        if duration is None:
+            duration = [[km * 60 / speed_kmh for km in row] for row in distance]
+        self.duration = duration
+        self.service = service_minutes
+        self.time_limit = time_limit
+        self.random = random.Random(seed)
+        self.routes = []
+        self.route_of = {}
+        self.unplanned = {}
+
+    def location(self, stop):
+        request = self.requests[stop[0]]
+        return request.pickup if stop[1] else request.delivery
+
+    def route_cost(self, stops):
+        if not stops:
+            return 0.0
+        d = self.distance
+        locations = [self.location(stop) for stop in stops]
+        return sum(d[a][b] for a, b in zip(locations, locations[1:])) + d[locations[-1]][locations[0]]
+
+    def schedule(self, stops, capacity):
+        """
+        Heures d'arrivee (minutes) a chaque arret, ou None si une fenetre ou la capacite n'est pas respectee.
+        """
+        duration = self.duration
+        arrivals = []
+        clock = None
+        load = 0.0
+        previous = None
+        for index, is_pickup in stops:
+            request = self.requests[index]
+            location = request.pickup if is_pickup else request.delivery
+            if previous is not None:
+                clock += self.service + duration[previous][location]
+            if is_pickup:
+                if clock is None or clock < request.earliest:
+                    clock = request.earliest
+                load += request.load
+                if load > capacity:
+                    return None
+            else:
+                if clock > request.latest:
+                    return None
+                load -= request.load
+            arrivals.append(clock)
+            previous = location
+        return arrivals
+
+    def insertions(self, index, route):
+        """
+        Couts d'insertion (delta, i, j) : enlevement avant stops[i], livraison avant stops[j] (j >= i).
+        """
+        d = self.distance
+        request = self.requests[index]
+        p, q = request.pickup, request.delivery
+        locations = [self.location(stop) for stop in route.stops]
+        n = len(locations)
+        if n == 0:
+            return [(d[p][q] + d[q][p], 0, 0)]
+
+        # Arete remplacee par une insertion avant la position k (tournee fermee)
+        edges = [(locations[k - 1], locations[k % n]) for k in range(n + 1)]
+        pickup_delta = [d[a][p] + d[p][b] - d[a][b] for a, b in edges]
+        delivery_delta = [d[a][q] + d[q][b] - d[a][b] for a, b in edges]
+
+        candidates = []
+        for i, (a, b) in enumerate(edges):
+            candidates.append((d[a][p] + d[p][q] + d[q][b] - d[a][b], i, i))
+            dp = pickup_delta[i]
+            candidates.extend((dp + delivery_delta[j], i, j) for j in range(i + 1, n + 1))
+        # Enlevement en tete et livraison en fin partagent l'arete de retour
+        first, last = locations[0], locations[-1]
+        candidates[n] = (d[p][first] + d[last][q] + d[q][p] - d[last][first], 0, n)
+        return candidates
+
+    @staticmethod
+    def inserted(stops, index, i, j):
+        return stops[:i] + [(index, True)] + stops[i:j] + [(index, False)] + stops[j:]
+
+    def best_insertion(self, index, routes):
+        """
+        Meilleure insertion faisable (delta, route, nouveaux arrets) parmi `routes`, ou None.
+        """
+        load = self.requests[index].load
+        candidates = []
+        for route in routes:
+            if route.vehicle.capacity < load:
+                continue
+            candidates.extend((delta, id(route), route, i, j) for delta, i, j in self.insertions(index, route))
+        candidates.sort(key=lambda candidate: candidate[:2])
+        for delta, _, route, i, j in candidates[:MAX_FEASIBILITY_CHECKS]:
+            stops = self.inserted(route.stops, index, i, j)
+            if self.schedule(stops, route.vehicle.capacity) is not None:
+                return delta, route, stops
+        return None
+
+    def new_route_option(self, index):
+        """
+        Tournee neuve pour une demande, avec le plus petit camion libre qui peut la porter.
+        """
+        load = self.requests[index].load
+        vehicle = next((vehicle for vehicle in self.free_vehicles if vehicle.capacity >= load), None)
+        if vehicle is None:
+            return None
+        route = Route(vehicle)
+        stops = [(index, True), (index, False)]
+        if self.schedule(stops, vehicle.capacity) is None:
+            return None
+        return self.route_cost(stops), route, stops
+
+    def apply(self, index, route, stops):
+        if route not in self.routes:
+            self.routes.append(route)
+            self.free_vehicles.remove(route.vehicle)
+        route.stops = stops
+        route.cost = self.route_cost(stops)
+        self.route_of[index] = route
+
+    def remove(self, index):
+        route = self.route_of.pop(index)
+        route.stops = [stop for stop in route.stops if stop[0] != index]
+        previous_cost, route.cost = route.cost, self.route_cost(route.stops)
+        if not route.stops:
+            self.routes.remove(route)
+            self.free_vehicles.append(route.vehicle)
+            self.free_vehicles.sort(key=lambda vehicle: vehicle.capacity)
+        return previous_cost - route.cost
+
+    def best_option(self, index):
+        options = [option for option in (self.best_insertion(index, self.routes), self.new_route_option(index))
+                   if option is not None]
+        return min(options, key=lambda option: option[0]) if options else None
+
+    def relocate(self, index):
+        """
+        Retire la demande de sa tournee et la reinsere ailleurs si la distance totale diminue.
+        """
+        route = self.route_of[index]
+        stops = route.stops
+        gain = self.remove(index)
+        option = self.best_option(index)
+        if option is not None and option[0] < gain - 1e-6:
+            self.apply(index, *option[1:])
+            return True
+        self.apply(index, route, stops)
+        return False
+
+    def solve(self):
+        start = time.perf_counter()
+        order = sorted(range(len(self.requests)), key=lambda k: (self.requests[k].earliest, self.requests[k].latest))
+        for index in order:
+            option = self.best_option(index)
+            if option is None:
+                load = self.requests[index].load
+                fits = any(vehicle.capacity >= load for vehicle in self.free_vehicles)
+                self.unplanned[self.requests[index].id] = 'infeasible' if fits else 'no_vehicle'
+            else:
+                self.apply(index, *option[1:])
+
+        improved = True
+        while improved and time.perf_counter() - start < self.time_limit:
+            improved = False
+            planned = list(self.route_of)
+            self.random.shuffle(planned)
+            for index in planned:
+                if time.perf_counter() - start >= self.time_limit:
+                    break
+                improved |= self.relocate(index)
+        return self
+
+    @property
+    def total_distance(self):
+        return sum(route.cost for route in self.routes)
+
+    def baseline_distance(self):
+        """
+        Distance si chaque demande planifiee etait un aller-retour separe.
+        """
+        d = self.distance
+        return sum(d[self.requests[k].pickup][self.requests[k].delivery] * 2 for k in self.route_of)
+
+
+def plan_chief_routes(chief, time_limit=3.0):
+    """
+    Propose des tournees pour les demandes assignees au chef de flotte (assignation `assigned`),
+    avec ses camions disponibles et ses chauffeurs acceptes (un chauffeur par camion).
+    """
+    requests = list(SendingRequest.objects.filter(
+        fleet_assignments__fleet_manager=chief, fleet_assignments__status='assigned',
+    ).distinct().select_related('pickup_place', 'delivery_place').only(
+        'id', 'weight', 'quantity', 'pickup_date_time', 'delivery_date_time', 'pickup_place', 'delivery_place'))
+    trucks = Truck.objects.filter(chief_fleet=chief, is_active=True, status='available').order_by(
+        '-max_load_capacity', 'id').values_list('id', 'max_load_capacity')
+    drivers = DriverChiefRequest.objects.filter(chief_fleet=chief, status='accepted').order_by(
+        'created_at').values_list('driver', flat=True)
+    vehicles = [Vehicle(truck, capacity, driver) for (truck, capacity), driver in zip(trucks, drivers)]
+
+    places = {}
+    plan_requests = []
+    unplanned = {}
+    origin = min((request.pickup_date_time for request in requests), default=None)
+    for request in requests:
+        pickup, delivery = request.pickup_place, request.delivery_place
+        if pickup is None or delivery is None:
+            unplanned[request.id] = 'unknown_location'
+            continue
+        plan_requests.append(PlanRequest(
+            request.id, places.setdefault(pickup, len(places)), places.setdefault(delivery, len(places)),
+            (request.pickup_date_time - origin).total_seconds() / 60,
+            (request.delivery_date_time - origin).total_seconds() / 60,
+            required_capacity(request),
+        ))
+
+    locations = list(places)
+    matrix = location_matrix.submatrix(locations)
+    planner = RoutePlanner(plan_requests, vehicles, matrix[DISTANCE].tolist(), duration=matrix[DURATION].tolist(),
+                           time_limit=time_limit).solve()
+    unplanned.update(planner.unplanned)
+
+    tours = []
+    for route in planner.routes:
+        arrivals = planner.schedule(route.stops, route.vehicle.capacity)
+        tours.append({
+            'truck': route.vehicle.truck,
+            'driver': route.vehicle.driver,
+            'distance_km': round(route.cost, 1),
+            'stops': [
+                {
+                    'sending_request': planner.requests[stop[0]].id,
+                    'type': 'pickup' if stop[1] else 'delivery',
+                    'location': locations[planner.location(stop)].name,
+                    'arrival': origin + timedelta(minutes=arrival),
+                }
+                for stop, arrival in zip(route.stops, arrivals)
+            ],
+        })
+
+    baseline = planner.baseline_distance()
+    return {
+        'tours': tours,
+        'unplanned': [{'sending_request': pk, 'reason': reason} for pk, reason in unplanned.items()],
+        'distance_km': round(planner.total_distance, 1),
+        'baseline_distance_km': round(baseline, 1),
+        'distance_saved_km': round(baseline - planner.total_distance, 1),
+    }
@@ -0,0 +1,59 @@
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db.models import Exists, OuterRef
+
+from apps.sendingRequest.models import SendingRequestFleetAssignment
+from apps.truck.models import Truck
+from apps.users.models import Driver
+
+# Assignations qui occupent un chauffeur et un camion sur leur fenetre (condition des contraintes d'exclusion)
+BUSY_ASSIGNMENT_STATUSES = ('assigned', 'in_progress')
+
+# Contraintes d'exclusion de SendingRequestFleetAssignment (index GiST sur chauffeur / camion + fenetre)
+SCHEDULE_CONSTRAINTS = ('assignment_driver_no_overlap', 'assignment_truck_no_overlap')
+
+
+def assignment_window(sending_request):
+    """
+    Fenetre [prise en charge, livraison) d'une demande, pour SendingRequestFleetAssignment.window.
+    """
+    return DateTimeTZRange(sending_request.pickup_date_time, sending_request.delivery_date_time)
+
+
+def window_error(sending_request):
+    """
+    Message d'erreur si la livraison n'est pas posterieure a la prise en charge, sinon None. PostgreSQL refuse
+    une fenetre inversee, et une fenetre vide echapperait aux contraintes de chevauchement.
+    """
+    if sending_request.pickup_date_time >= sending_request.delivery_date_time:
+        return f"Request {sending_request.pk} must be delivered after its pickup date"
+    return None
+
+
+def is_schedule_conflict(error):
+    """
+    Vrai si l'IntegrityError vient d'une contrainte de chevauchement (chauffeur ou camion deja pris).
+    """
+    diag = getattr(error.__cause__, 'diag', None)
+    return getattr(diag, 'constraint_name', None) in SCHEDULE_CONSTRAINTS
+
+
+def overlapping_assignments(start, end):
+    return SendingRequestFleetAssignment.objects.filter(status__in=BUSY_ASSIGNMENT_STATUSES,
+                                                        window__overlap=DateTimeTZRange(start, end))
+
+
+def free_trucks(chief, start, end):
+    """
+    Camions disponibles du chef sans assignation sur [start, end) : une seule requete, le NOT EXISTS
+    utilise l'index GiST (camion, fenetre) de la contrainte d'exclusion.
+    """
+    busy = overlapping_assignments(start, end).filter(truck=OuterRef('pk'))
+    return Truck.objects.filter(chief_fleet=chief, is_active=True, status='available').exclude(Exists(busy))
+
+
+def free_drivers(chief, start, end):
+    """
+    Chauffeurs acceptes par le chef sans assignation sur [start, end).
+    """
+    busy = overlapping_assignments(start, end).filter(driver=OuterRef('pk'))
+    return Driver.objects.filter(requests__chief_fleet=chief, requests__status='accepted').exclude(Exists(busy))
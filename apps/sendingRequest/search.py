@@ -0,0 +1,40 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+from drf_yasg import openapi
+from rest_framework.exceptions import ValidationError
+
+# En dessous de 3 caracteres, les index trigrammes ne sont pas utilisables
+SEARCH_MIN_LENGTH = 3
+
+# Champs cherches par sous-chaine, chacun avec son index trigramme sur UPPER(champ)
+SUBSTRING_FIELDS = ('recipient_name', 'recipient_phone', 'pickup_location', 'delivery_location')
+
+
+def search_sending_requests(queryset, terms):
+    """
+    Filtre les demandes par `search_vector` (plein texte, y compris `additional_details`) ou par
+    sous-chaine sur le nom, le telephone et les lieux, et les classe par pertinence.
+    """
+    terms = terms.strip()
+    if len(terms) < SEARCH_MIN_LENGTH:
+        raise ValidationError({"search": f"Search must be at least {SEARCH_MIN_LENGTH} characters"})
+
+    query = SearchQuery(terms, config='simple', search_type='websearch')
+    condition = Q(search_vector=query)
+    for field in SUBSTRING_FIELDS:
+        condition |= Q(**{f'{field}__icontains': terms})
+
+    # ts_rank rend un real : en double precision, le rang lu dans le curseur est compare sans perte
+    rank = Cast(SearchRank(F('search_vector'), query), FloatField())
+    return queryset.filter(condition).annotate(rank=rank).order_by('-rank', '-request_date', '-id')
+
+
+search_parameter = openapi.Parameter(
+    'search',
+    openapi.IN_QUERY,
+    description="Recherche (destinataire, telephone, lieux, details) ; resultats classes par pertinence, "
+                f"pages suivantes dans `next` ({SEARCH_MIN_LENGTH} caracteres minimum)",
+    type=openapi.TYPE_STRING,
+    required=False
+)
@@ -1,13 +1,19 @@
 from rest_framework import serializers
 
+from apps.core.serializers import DynamicFieldsMixin
 from apps.users.serializers import MemberSerializer
-from .models import SendingRequest, SendingRequestFleetAssignment, DeliveryNote
+from .models import SendingRequest, SendingRequestFleetAssignment, DeliveryNote, FleetTrip
+from .scheduling import window_error
 from ..truck.serializers import TruckSerializer
 
 
-class SendingRequestSerializer(serializers.ModelSerializer):
+class SendingRequestSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     client_details = MemberSerializer(source='client', read_only=True)
 
+    expandable_fields = {'client': 'client_details'}
+    summary_fields = ('id', 'cargo_type', 'weight', 'pickup_location', 'pickup_date_time', 'delivery_location',
+                      'delivery_date_time', 'priority')
+
     class Meta:
         model = SendingRequest
         fields = [
@@ -20,10 +26,16 @@ class SendingRequestSerializer(serializers.ModelSerializer):
             'weight',
             'dimensions',
             'quantity',
+            'length',
+            'width',
+            'height',
+            'volume',
             'pickup_location',
             'pickup_date_time',
             'delivery_location',
             'delivery_date_time',
+            'pickup_place',
+            'delivery_place',
             'additional_details',
             'attached_files',
             'special_conditions',
@@ -35,7 +47,25 @@ class SendingRequestSerializer(serializers.ModelSerializer):
             'status',
             'client_details'
         ]
-        read_only_fields = ['id', 'request_date', 'status', 'client_details']
+        read_only_fields = ['id', 'request_date', 'status', 'client_details', 'pickup_place', 'delivery_place',
+                            'length', 'width', 'height', 'volume']
+
+    def validate(self, attrs):
+        # Fenetre de l'assignation [prise en charge, livraison) : ni vide, ni inversee
+        pickup = attrs.get('pickup_date_time', getattr(self.instance, 'pickup_date_time', None))
+        delivery = attrs.get('delivery_date_time', getattr(self.instance, 'delivery_date_time', None))
+        if pickup is not None and delivery is not None and pickup >= delivery:
+            raise serializers.ValidationError({'delivery_date_time': "Delivery must be after pickup"})
+        return attrs
+
+
+class BulkSendingRequestSerializer(SendingRequestSerializer):
+    """
+    Validation d'un element d'un envoi groupe : le client est celui de la requete, sans requete SQL par element.
+    """
+
+    class Meta(SendingRequestSerializer.Meta):
+        read_only_fields = SendingRequestSerializer.Meta.read_only_fields + ['client']
 
 
 class AdminSendingRequestSerializer(serializers.ModelSerializer):
@@ -65,10 +95,16 @@ class DeliveryNoteSerializer(serializers.ModelSerializer):
             'weight',
             'dimensions',
             'quantity',
+            'length',
+            'width',
+            'height',
+            'volume',
             'pickup_location',
             'pickup_date_time',
             'delivery_location',
             'delivery_date_time',
+            'pickup_place',
+            'delivery_place',
             'additional_details',
             'attached_files',
             'special_conditions',
@@ -77,15 +113,24 @@ class DeliveryNoteSerializer(serializers.ModelSerializer):
             'status',
             'client_details'
         ]
-        read_only_fields = ['id', 'request_date', 'status', 'client_details']
+        read_only_fields = ['id', 'request_date', 'status', 'client_details', 'pickup_place', 'delivery_place',
+                            'length', 'width', 'height', 'volume']
 
 
-class SendingRequestFleetAssignmentSerializer(serializers.ModelSerializer):
+class SendingRequestFleetAssignmentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     driver_details = MemberSerializer(source='driver', read_only=True)
     sending_request_details = SendingRequestSerializer(source='sending_request', read_only=True)
     delivery_note_details = DeliveryNoteSerializer(source='delivery_note', read_only=True)
     truck_details = TruckSerializer(source='truck', read_only=True)
 
+    expandable_fields = {
+        'sending_request': 'sending_request_details',
+        'driver': 'driver_details',
+        'delivery_note': 'delivery_note_details',
+        'truck': 'truck_details',
+    }
+    summary_fields = ('id', 'sending_request', 'driver', 'truck', 'assigned_at', 'status')
+
     class Meta:
         model = SendingRequestFleetAssignment
         fields = ['id',
@@ -98,7 +143,24 @@ class SendingRequestFleetAssignmentSerializer(serializers.ModelSerializer):
                   'driver_details',
                   'delivery_note_details',
                   'truck_details',
+                  'trip',
                   'assigned_at',
                   'status']
         read_only_fields = ['id', 'driver_details', 'status', 'sending_request_details', 'truck_details',
-                            'delivery_note_details', 'assigned_at']
+                            'delivery_note_details', 'trip', 'assigned_at']
+
+    def validate_sending_request(self, value):
+        error = window_error(value)
+        if error is not None:
+            raise serializers.ValidationError(error)
+        return value
+
+
+class FleetTripSerializer(serializers.ModelSerializer):
+    assignments = SendingRequestFleetAssignmentSerializer(many=True, read_only=True,
+                                                          fields=['id', 'sending_request', 'delivery_note', 'status'])
+
+    class Meta:
+        model = FleetTrip
+        fields = ['id', 'fleet_manager', 'truck', 'driver', 'status', 'assignments', 'created_at', 'updated_at']
+        read_only_fields = fields
@@ -0,0 +1,37 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.sendingRequest.changes import record_changes, record_deletion
+from apps.sendingRequest.dimensions import fill_dimensions
+from apps.sendingRequest.models import DeliveryNote, SendingRequest, SendingRequestFleetAssignment
+from apps.users.models import User
+
+
+@receiver(pre_save, sender=SendingRequest)
+@receiver(pre_save, sender=DeliveryNote)
+def sending_request_saved(sender, instance, **kwargs):
+    fill_dimensions(instance)
+
+
+@receiver(post_save, sender=SendingRequestFleetAssignment)
+def assignment_saved(sender, instance, **kwargs):
+    record_changes(SendingRequestFleetAssignment.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=SendingRequestFleetAssignment)
+def assignment_deleted(sender, instance, origin=None, **kwargs):
+    # Le journal d'un chef supprime part avec lui (cascade) : pas de tombstone
+    if isinstance(origin, QuerySet):
+        chief_deleted = issubclass(origin.model, User) and origin.filter(pk=instance.fleet_manager_id).exists()
+    else:
+        chief_deleted = isinstance(origin, User) and origin.pk == instance.fleet_manager_id
+    if not chief_deleted:
+        record_deletion(instance)
+
+
+@receiver(post_save, sender=SendingRequest)
+def sending_request_changed(sender, instance, created, **kwargs):
+    # Les details de la demande sont imbriques dans ses assignations
+    if not created:
+        record_changes(SendingRequestFleetAssignment.objects.filter(sending_request=instance.pk))
@@ -1,17 +1,25 @@
 from django.urls import path
 
 from apps.sendingRequest.views import SendingRequestView, SendingRequestDetailsView, AdminSendingRequestDetailsView, \
-    AdminSendingRequestUpdateView, ChiefFleetSendingRequestDetailsView
-from apps.sendingRequest.views_fleet_assignment import FleetAssignmentView, FleetAssignmentDetailsView
+    AdminSendingRequestUpdateView, ChiefFleetSendingRequestDetailsView, SendingRequestBulkView
+from apps.sendingRequest.views_export import AdminSendingRequestExportView
+from apps.sendingRequest.views_fleet_assignment import FleetAssignmentView, FleetAssignmentDetailsView, \
+    FleetAssignmentChangesView
+from apps.sendingRequest.views_availability import FleetAvailabilityView
+from apps.sendingRequest.views_claim import SendingRequestClaimView, SendingRequestClaimDetailsView
+from apps.sendingRequest.views_consolidation import FleetTripView
+from apps.sendingRequest.views_route_planning import RoutePlanView
 
 sending_request_urlpatterns = [
     # Sending Request
     path("sending_request/", SendingRequestView.as_view(), name="sending_request"),
+    path("sending_request/bulk/", SendingRequestBulkView.as_view(), name="sending_request_bulk"),
     path("sending_request_details/<int:pk>", SendingRequestDetailsView.as_view(), name="sending_request_details"),
     path("sending_request_details_admin/", AdminSendingRequestDetailsView.as_view(),
          name="send_request_details_admin"),
     path("sending_request_update_admin/<int:pk>", AdminSendingRequestUpdateView.as_view(),
          name="send_request_update_admin"),
+    path("sending_request_export_admin/", AdminSendingRequestExportView.as_view(), name="send_request_export_admin"),
     path("sending_request_details_chief/", ChiefFleetSendingRequestDetailsView.as_view(),
          name="List of request for Chief"),
 
@@ -19,4 +27,11 @@ sending_request_urlpatterns = [
     path("sending_request_assignment/", FleetAssignmentView.as_view(), name="Assignment_request"),
     path("sending_request_assignment_details/<int:pk>", FleetAssignmentDetailsView.as_view(),
          name="Assignment_request_details"),
+    path("sending_request_assignment_changes/", FleetAssignmentChangesView.as_view(),
+         name="Assignment_request_changes"),
+    path("sending_request_claim/", SendingRequestClaimView.as_view(), name="Claim next request"),
+    path("sending_request_claim/<int:pk>", SendingRequestClaimDetailsView.as_view(), name="Release claim"),
+    path("sending_request_route_plan/", RoutePlanView.as_view(), name="Route plan for chief"),
+    path("sending_request_trip/", FleetTripView.as_view(), name="Consolidated trip"),
+    path("fleet_availability/", FleetAvailabilityView.as_view(), name="Fleet availability"),
 ]
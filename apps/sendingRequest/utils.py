@@ -1,37 +1,159 @@
-from rest_framework.response import Response
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
 
-from apps.sendingRequest.models import SendingRequest
-from apps.sendingRequest.serializers import DeliveryNoteSerializer
+from apps.sendingRequest.changes import record_changes
+from apps.sendingRequest.claims import available_to
+from apps.sendingRequest.models import DeliveryNote, FleetTrip, SendingRequest, SendingRequestFleetAssignment
+from apps.sendingRequest.scheduling import assignment_window, is_schedule_conflict
+
+
+class AssignmentConflict(Exception):
+    """
+    La demande n'est plus assignable : deja prise par un autre chef de flotte, ou pas (plus) acceptee.
+    """
+
+
+class ScheduleConflict(AssignmentConflict):
+    """
+    Le chauffeur ou le camion est deja assigne sur une fenetre qui chevauche celle de la demande.
+    """
+
+
+def save_assignment(save):
+    """
+    Execute `save` (creation ou modification d'assignations) ; un chevauchement refuse par les contraintes
+    d'exclusion devient un ScheduleConflict.
+    """
+    try:
+        with transaction.atomic():
+            return save()
+    except IntegrityError as e:
+        if is_schedule_conflict(e):
+            raise ScheduleConflict("Driver or truck already assigned on an overlapping window") from e
+        raise
+
+
+# Colonnes de la demande recopiees dans son bon de livraison (memes noms dans les deux modeles)
+DELIVERY_NOTE_FIELDS = (
+    'client', 'recipient_name', 'recipient_email', 'recipient_phone', 'cargo_type', 'weight', 'dimensions',
+    'quantity', 'length', 'width', 'height', 'volume', 'pickup_location', 'pickup_date_time', 'delivery_location',
+    'delivery_date_time', 'pickup_place', 'delivery_place', 'additional_details', 'attached_files',
+    'special_conditions', 'priority',
+)
+
+
+def delivery_note_copy_sql():
+    """
+    INSERT ... SELECT des bons de livraison : les ids sont tires de la sequence dans la CTE, qui donne aussi la
+    correspondance demande -> bon.
+    """
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(DeliveryNote._meta.get_field(name).column) for name in DELIVERY_NOTE_FIELDS)
+    source = ', '.join(f'request.{quote(SendingRequest._meta.get_field(name).column)}' for name in DELIVERY_NOTE_FIELDS)
+    note_table = quote(DeliveryNote._meta.db_table)
+    return (
+        f"WITH source AS ("
+        f" SELECT request.id AS request_id, nextval(pg_get_serial_sequence(%s, 'id')) AS note_id, {source}"
+        f" FROM {quote(SendingRequest._meta.db_table)} AS request WHERE request.id = ANY(%s)"
+        f"), inserted AS ("
+        f" INSERT INTO {note_table} (id, {columns}, request_date, status)"
+        f" SELECT note_id, {columns}, %s, %s FROM source RETURNING id"
+        f") SELECT request_id, note_id FROM source"
+    )
+
+
+def sending_requests_to_delivery_notes(sending_request_ids):
+    """
+    Cree le bon de livraison de chaque demande en une seule requete : PostgreSQL recopie les colonnes de la demande
+    (fichier joint, dimensions et lieux resolus compris), sans aller-retour par Python ni revalidation.
+
+    Renvoie {id de la demande: id du bon de livraison} ; une demande inexistante n'a pas de bon.
+    """
+    with connection.cursor() as cursor:
+        # pg_get_serial_sequence attend un nom quote (majuscules dans le nom de la table)
+        table = connection.ops.quote_name(DeliveryNote._meta.db_table)
+        cursor.execute(delivery_note_copy_sql(), [table, list(sending_request_ids),
+                                                  timezone.now(), 'pending'])
+        return dict(cursor.fetchall())
 
 
 def sending_request_to_delivery_note(id_sending_request: int, ):
     """
     Cette fonction permet de creer un bon de commande correspondant au demande.
     """
-    sending_request = SendingRequest.objects.values(
-        'client',
-        'recipient_name',
-        'recipient_email',
-        'recipient_phone',
-        'cargo_type',
-        'weight',
-        'dimensions',
-        'quantity',
-        'pickup_location',
-        'pickup_date_time',
-        'delivery_location',
-        'delivery_date_time',
-        'additional_details',
-        # 'attached_files',  # il faut bien gerer ceci
-        'special_conditions',
-        'priority',
-    ).get(pk=id_sending_request)
-
-    serializer = DeliveryNoteSerializer(data=sending_request)
-
-    if serializer.is_valid():
-        new_instance = serializer.save()
-        return new_instance.id
-    else:
-        print(serializer.errors)  # Afficher les erreurs dans la console
-        return Response(serializer.errors, status=400)  # Retourner les erreurs dans la réponse
+    try:
+        return sending_requests_to_delivery_notes([id_sending_request])[id_sending_request]
+    except KeyError:
+        raise SendingRequest.DoesNotExist(f"Sending request {id_sending_request} does not exist")
+
+
+def assign_sending_request(serializer):
+    """
+    Assigne une demande acceptee au chef de flotte, en une seule transaction.
+
+    La demande est reservee par une mise a jour conditionnelle (`accepted` -> `in_progress`) : si deux chefs
+    assignent la meme demande en meme temps, PostgreSQL bloque le second UPDATE jusqu'au commit du premier,
+    qui ne trouve alors plus de ligne `accepted`. Le bon de livraison et l'assignation ne sont crees
+    qu'apres cette reservation, et annules avec elle en cas d'erreur.
+
+    `serializer` est un SendingRequestFleetAssignmentSerializer deja valide.
+    """
+    sending_request = serializer.validated_data['sending_request']
+    chief = serializer.validated_data['fleet_manager']
+    with transaction.atomic():
+        now = timezone.now()
+        # Une demande reservee par un autre chef dans la file (apps.sendingRequest.claims) n'est pas assignable
+        claimed = SendingRequest.objects.filter(available_to(chief, now), pk=sending_request.pk,
+                                                status='accepted').update(
+            status='in_progress', claimed_by=None, claim_expires_at=None, updated_at=now)
+        if not claimed:
+            raise AssignmentConflict("Request already assigned, not accepted or claimed by another chief")
+        sending_request.status, sending_request.updated_at = 'in_progress', now
+
+        id_delivery_note = sending_request_to_delivery_note(sending_request.pk)
+        return save_assignment(lambda: serializer.save(delivery_note_id=id_delivery_note,
+                                                       window=assignment_window(sending_request)))
+
+
+def assign_trip(chief, sending_request_ids, truck, driver):
+    """
+    Assigne plusieurs demandes acceptees a un meme trajet (groupage), en une seule transaction.
+
+    Comme pour `assign_sending_request`, les demandes sont reservees par une seule mise a jour
+    conditionnelle ; si l'une d'elles n'est plus `accepted`, rien n'est assigne.
+    """
+    with transaction.atomic():
+        now = timezone.now()
+        claimed = SendingRequest.objects.filter(available_to(chief, now), pk__in=sending_request_ids,
+                                                status='accepted').update(
+            status='in_progress', claimed_by=None, claim_expires_at=None, updated_at=now)
+        if claimed != len(sending_request_ids):
+            raise AssignmentConflict("Some requests are already assigned, not accepted or claimed by another chief")
+
+        trip = FleetTrip.objects.create(fleet_manager=chief, truck=truck, driver=driver)
+        delivery_notes = sending_requests_to_delivery_notes(sending_request_ids)
+        assignments = [
+            SendingRequestFleetAssignment(
+                sending_request=sending_request, fleet_manager=chief, driver=driver, truck=truck, trip=trip,
+                delivery_note_id=delivery_notes[sending_request.pk],
+                window=assignment_window(sending_request),
+            )
+            for sending_request in SendingRequest.objects.filter(pk__in=sending_request_ids).only(
+                'id', 'pickup_date_time', 'delivery_date_time')
+        ]
+        save_assignment(lambda: SendingRequestFleetAssignment.objects.bulk_create(assignments))
+        # bulk_create n'envoie pas post_save
+        record_changes(trip.assignments.all())
+        return trip
+
+
+def release_sending_request(assignment):
+    """
+    Annule une assignation et rend la demande de nouveau assignable par les chefs de flotte.
+    """
+    with transaction.atomic():
+        SendingRequest.objects.filter(pk=assignment.sending_request_id, status='in_progress').update(
+            status='accepted', updated_at=timezone.now())
+        # Enregistree apres la demande : le journal des modifications lit les deux statuts
+        assignment.status = "cancelled"
+        assignment.save()
@@ -1,4 +1,6 @@
+from django.db import transaction
 from django.http import Http404
+from django.utils import timezone
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
@@ -8,10 +10,18 @@ from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.core.conditional import list_validators, not_modified, object_validators, with_validators
+from apps.core.pagination import KeysetPagination, RankedKeysetPagination, paginated_parameters
+from apps.core.fast_serializer import ValuesSerializer
+from apps.core.serializers import fieldset_from_request, fieldset_parameters
+from apps.location.resolver import resolve_places
 from apps.users.models import Member
+from .claims import available_to
+from .dimensions import fill_dimensions
 from .models import SendingRequest
-from .serializers import SendingRequestSerializer, AdminSendingRequestSerializer
-from ..invoice.views import invoice_sending_request_post
+from .search import search_parameter, search_sending_requests
+from .serializers import SendingRequestSerializer, AdminSendingRequestSerializer, BulkSendingRequestSerializer
+from ..invoice.views import invoice_sending_request_post, bulk_invoice_sending_requests
 
 # Views for Sending Request
 
@@ -133,6 +143,38 @@ body_parameters = openapi.Schema(
     ]
 )
 
+# Nombre maximal de demandes par envoi groupe
+BULK_MAX_ITEMS = 500
+
+
+def paginated_sending_requests(request, queryset, view, search_enabled=False):
+    """
+    Page de demandes avec les champs demandes (`?fields=`, `?expand=`) ; les autres colonnes ne sont pas chargees.
+    Repond 304 sans serialiser la page si le client a deja la version courante (ETag de la page).
+    """
+    search = request.query_params.get('search') if search_enabled else None
+    if search:
+        queryset = search_sending_requests(queryset, search)
+
+    fieldset = fieldset_from_request(request)
+    always = ['id', 'request_date', 'updated_at']
+    if search:
+        # Classement par pertinence : le curseur porte aussi le rang
+        serializer = ValuesSerializer(SendingRequestSerializer(**fieldset), always=[*always, 'rank'])
+        paginator = RankedKeysetPagination()
+    else:
+        serializer = ValuesSerializer(SendingRequestSerializer(**fieldset), always=always)
+        paginator = KeysetPagination()
+    page = paginator.paginate_queryset(serializer.queryset(queryset), request, view=view)
+
+    etag = list_validators(request, page, ('updated_at',), paginator.has_next)
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+
+    response = paginator.get_paginated_response(serializer.data(page))
+    return with_validators(response, etag)
+
 
 class SendingRequestView(APIView):
     permission_classes = [IsAuthenticated]
@@ -171,8 +213,10 @@ class SendingRequestView(APIView):
 
     @swagger_auto_schema(
         operation_description="Lister les demandes envoyes",
+        manual_parameters=paginated_parameters() + fieldset_parameters(SendingRequestSerializer),
         responses={
             200: openapi.Response("List of sending request", SendingRequestSerializer),
+            304: openapi.Response("Not modified"),
             403: openapi.Response("User unauthorized"),
         },
         tags=[tags]
@@ -186,8 +230,70 @@ class SendingRequestView(APIView):
         else:
             return Response({"error": "User unauthorized"}, status=status.HTTP_403_FORBIDDEN)
 
-        serializer = SendingRequestSerializer(requests, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginated_sending_requests(request, requests, self)
+
+
+class SendingRequestBulkView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser]
+
+    @swagger_auto_schema(
+        operation_description=f"Envoyer plusieurs demandes en une fois (entreprise cliente, {BULK_MAX_ITEMS} maximum). "
+                              "Les demandes valides sont creees avec leur facture, les autres renvoient leurs erreurs.",
+        request_body=openapi.Schema(type=openapi.TYPE_ARRAY, items=body_parameters),
+        responses={
+            201: openapi.Response("All requests created"),
+            207: openapi.Response("Some requests created, see per-item results"),
+            400: openapi.Response("Bad Request"),
+            403: openapi.Response("User unauthorized"),
+        },
+        tags=[tags]
+    )
+    def post(self, request):
+        if request.user.role != "company":
+            return Response({"error": "You must be a client company to perform this request"},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({"error": "Expected a non-empty list of requests"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > BULK_MAX_ITEMS:
+            return Response({"error": f"At most {BULK_MAX_ITEMS} requests per call"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # Validation de tous les elements, sans requete SQL
+        results = []
+        valid = []
+        for index, item in enumerate(items):
+            serializer = BulkSendingRequestSerializer(data=item)
+            if serializer.is_valid():
+                sending_request = SendingRequest(client_id=request.user.pk, **serializer.validated_data)
+                # bulk_create n'envoie pas pre_save
+                resolve_places(sending_request)
+                fill_dimensions(sending_request)
+                valid.append((index, sending_request))
+            else:
+                results.append({"index": index, "status": status.HTTP_400_BAD_REQUEST, "errors": serializer.errors})
+
+        if valid:
+            with transaction.atomic():
+                sending_requests = SendingRequest.objects.bulk_create(obj for _, obj in valid)
+                invoices = bulk_invoice_sending_requests(sending_requests)
+            results.extend(
+                {"index": index, "status": status.HTTP_201_CREATED, "id": obj.id,
+                 "invoice_number": invoice.invoice_number}
+                for (index, obj), invoice in zip(valid, invoices)
+            )
+        results.sort(key=lambda result: result["index"])
+
+        if not valid:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif len(valid) < len(items):
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_201_CREATED
+        return Response({"created": len(valid), "failed": len(items) - len(valid), "results": results},
+                        status=response_status)
 
 
 class SendingRequestDetailsView(APIView):
@@ -196,7 +302,7 @@ class SendingRequestDetailsView(APIView):
 
     def get_object(self, pk):
         try:
-            return SendingRequest.objects.get(pk=pk, client=self.request.user)
+            return SendingRequest.objects.select_related('client').get(pk=pk, client=self.request.user)
         except SendingRequest.DoesNotExist:
             raise NotFound("Request not found")
 
@@ -204,6 +310,7 @@ class SendingRequestDetailsView(APIView):
         operation_description="Recuperer un demande specifique",
         responses={
             200: openapi.Response("Details for request", SendingRequestSerializer),
+            304: openapi.Response("Not modified"),
             403: openapi.Response("User unauthorized"),
             404: openapi.Response("Request not found"),
         },
@@ -212,8 +319,12 @@ class SendingRequestDetailsView(APIView):
     def get(self, request, pk):
         try:
             request_obj = self.get_object(pk)
+            etag, last_modified = object_validators(request, request_obj)
+            response = not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
             serializer = SendingRequestSerializer(request_obj)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return with_validators(Response(serializer.data, status=status.HTTP_200_OK), etag, last_modified)
         except NotFound as e:
             return Response({"detail": str(e)}, status=status.HTTP_404_NOT_FOUND)
 
@@ -348,10 +459,14 @@ class AdminSendingRequestDetailsView(APIView):
                 description="Filtrer les demandes par statut (ex: accepted, canceled)",
                 type=openapi.TYPE_STRING,
                 required=False
-            )
+            ),
+            search_parameter,
+            *paginated_parameters(),
+            *fieldset_parameters(SendingRequestSerializer),
         ],
         responses={
             200: openapi.Response("List of sending request", SendingRequestSerializer),
+            304: openapi.Response("Not modified"),
             403: openapi.Response("User unauthorized"),
         },
         tags=[tags]
@@ -372,9 +487,8 @@ class AdminSendingRequestDetailsView(APIView):
             # Si aucun filtre n'est fourni, retourner toutes les demandes
             send_requests = SendingRequest.objects.all()
 
-        # Sérialiser les résultats
-        serializer = SendingRequestSerializer(send_requests, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Paginer puis sérialiser les résultats
+        return paginated_sending_requests(request, send_requests, self, search_enabled=True)
 
 
 class ChiefFleetSendingRequestDetailsView(APIView):
@@ -382,17 +496,20 @@ class ChiefFleetSendingRequestDetailsView(APIView):
     parser_classes = [JSONParser]
 
     @swagger_auto_schema(
-        operation_description="Afficher la liste des demandes pas encore pris en charge",
+        operation_description="Afficher la liste des demandes pas encore pris en charge (sans celles reservees "
+                              "par un autre chef)",
+        manual_parameters=[search_parameter, *paginated_parameters(), *fieldset_parameters(SendingRequestSerializer)],
         responses={
             200: openapi.Response("List of sending request", SendingRequestSerializer),
+            304: openapi.Response("Not modified"),
             403: openapi.Response("User unauthorized"),
         },
         tags=[tags]
     )
     def get(self, request):
         if request.user.role == "chief":
-            send_requests = SendingRequest.objects.filter(status="accepted")
-            serializer = SendingRequestSerializer(send_requests, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            send_requests = SendingRequest.objects.filter(available_to(request.user, timezone.now()),
+                                                          status="accepted")
+            return paginated_sending_requests(request, send_requests, self, search_enabled=True)
         else:
             return Response({"error": "User unauthorized"}, status=status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,65 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.sendingRequest.scheduling import free_drivers, free_trucks
+
+# Views for fleet availability
+
+tags = "Fleet Assignment"
+
+availability_parameters = [
+    openapi.Parameter(name, openapi.IN_QUERY, description=description, type=openapi.TYPE_STRING,
+                      format=openapi.FORMAT_DATETIME, required=True)
+    for name, description in (('start', "Debut de la periode (ISO 8601)"), ('end', "Fin de la periode (ISO 8601)"))
+]
+
+
+def period_from_request(request):
+    """
+    (start, end) lus dans `?start=` et `?end=`, ou None si absents, invalides ou vides.
+    """
+    period = []
+    for name in ('start', 'end'):
+        value = parse_datetime(request.query_params.get(name, ''))
+        if value is None:
+            return None
+        period.append(timezone.make_aware(value) if timezone.is_naive(value) else value)
+    return tuple(period) if period[0] < period[1] else None
+
+
+class FleetAvailabilityView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Chauffeurs et camions du chef libres sur une periode (aucune assignation en cours "
+                              "dont la fenetre chevauche la periode)",
+        manual_parameters=availability_parameters,
+        responses={
+            200: openapi.Response("Free trucks and drivers"),
+            400: openapi.Response("Bad Request"),
+            403: openapi.Response("User unauthorized"),
+        },
+        tags=[tags]
+    )
+    def get(self, request):
+        chief_fleet = request.user
+        if chief_fleet.role != "chief":
+            return Response({"error": "You must be a chief to perform this request"},
+                            status=status.HTTP_403_FORBIDDEN)
+        period = period_from_request(request)
+        if period is None:
+            return Response({"error": "Expected ISO 8601 `start` and `end`, with start before end"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        trucks = free_trucks(chief_fleet, *period).order_by('max_load_capacity', 'id').values(
+            'id', 'license_plate', 'brand', 'model', 'max_load_capacity', 'cargo_volume')
+        drivers = free_drivers(chief_fleet, *period).order_by('last_name', 'first_name').values(
+            'id', 'first_name', 'last_name', 'phone', 'experience')
+        return Response({"start": period[0], "end": period[1], "trucks": list(trucks), "drivers": list(drivers)},
+                        status=status.HTTP_200_OK)
@@ -0,0 +1,63 @@
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.sendingRequest.claims import claim_next, release_claim
+from apps.sendingRequest.serializers import SendingRequestSerializer
+
+# Views for the chiefs work queue
+
+tags = "Fleet Assignment"
+
+
+class SendingRequestClaimView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Reserver la prochaine demande acceptee libre (priorite haute puis prise en charge la "
+                              "plus proche). La reservation expire apres SENDING_REQUEST_CLAIM_LEASE secondes ; "
+                              "l'assignation de la demande la termine. Un chef ne tient qu'une reservation : tant "
+                              "qu'elle court, c'est elle qui est renvoyee.",
+        responses={
+            200: openapi.Response("Claimed request (claim_expires_at)", SendingRequestSerializer),
+            204: openapi.Response("No request left to claim"),
+            403: openapi.Response("User unauthorized"),
+        },
+        tags=[tags]
+    )
+    def post(self, request):
+        chief_fleet = request.user
+        if chief_fleet.role != "chief":
+            return Response({"error": "You must be a chief to perform this request"},
+                            status=status.HTTP_403_FORBIDDEN)
+        sending_request = claim_next(chief_fleet)
+        if sending_request is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        data = SendingRequestSerializer(sending_request).data
+        data['claim_expires_at'] = sending_request.claim_expires_at
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class SendingRequestClaimDetailsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Rendre une demande reservee a la file",
+        responses={
+            204: openapi.Response("Claim released"),
+            403: openapi.Response("User unauthorized"),
+            404: openapi.Response("No claim of this chief on the request"),
+        },
+        tags=[tags]
+    )
+    def delete(self, request, pk):
+        chief_fleet = request.user
+        if chief_fleet.role != "chief":
+            return Response({"error": "You must be a chief to perform this request"},
+                            status=status.HTTP_403_FORBIDDEN)
+        if not release_claim(chief_fleet, pk):
+            return Response({"error": "No claim of this chief on the request"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,107 @@
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.sendingRequest.consolidation import CONSOLIDABLE_CARGO_TYPES, check_grouping, check_load, \
+    plan_consolidation
+from apps.sendingRequest.models import SendingRequest
+from apps.sendingRequest.scheduling import window_error
+from apps.sendingRequest.serializers import FleetTripSerializer
+from apps.sendingRequest.utils import AssignmentConflict, assign_trip
+from apps.truck.models import Truck
+from apps.truck.recommendation import entry_from_truck
+from apps.users.models import Driver
+
+# Views for load consolidation
+
+tags = "Fleet Assignment"
+
+# Nombre maximal de demandes dans un meme trajet
+TRIP_MAX_REQUESTS = 50
+
+body_parameters = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "sending_requests": openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                                           description="IDs of the accepted requests to load together"),
+        "truck": openapi.Schema(type=openapi.TYPE_INTEGER, description="ID Truck"),
+        "driver": openapi.Schema(type=openapi.TYPE_STRING, description="ID Driver"),
+    },
+    required=["sending_requests", "truck", "driver"],
+)
+
+
+class FleetTripView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser]
+
+    @swagger_auto_schema(
+        operation_description="Proposer des groupages de petites demandes acceptees "
+                              f"({', '.join(CONSOLIDABLE_CARGO_TYPES)}) : meme corridor, meme jour, un camion "
+                              "du chef par groupe (poids, volume et conditions speciales respectes)",
+        responses={
+            200: openapi.Response("Proposed trips and requests no truck can carry"),
+            403: openapi.Response("User unauthorized"),
+        },
+        tags=[tags]
+    )
+    def get(self, request):
+        if request.user.role != "chief":
+            return Response({"error": "You must be a chief to perform this request"},
+                            status=status.HTTP_403_FORBIDDEN)
+        return Response(plan_consolidation(request.user.pk), status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        operation_description="Confirmer un groupage : assigner plusieurs petites demandes acceptees (meme corridor, "
+                              "meme jour de prise en charge) a un meme trajet",
+        request_body=body_parameters,
+        responses={
+            201: openapi.Response("Trip created", FleetTripSerializer),
+            400: openapi.Response("Bad Request"),
+            403: openapi.Response("User unauthorized"),
+            409: openapi.Response("Some requests already assigned, not accepted or claimed by another chief, "
+                                  "or driver / truck already busy"),
+        },
+        tags=[tags]
+    )
+    def post(self, request):
+        chief_fleet = request.user
+        if chief_fleet.role != "chief":
+            return Response({"error": "You must be a chief to perform this request"},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        ids = request.data.get("sending_requests")
+        if not isinstance(ids, list) or not ids or not all(isinstance(pk, int) for pk in ids):
+            return Response({"error": "Expected a non-empty list of request ids"}, status=status.HTTP_400_BAD_REQUEST)
+        ids = sorted(set(ids))
+        if len(ids) > TRIP_MAX_REQUESTS:
+            return Response({"error": f"At most {TRIP_MAX_REQUESTS} requests per trip"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        truck = Truck.objects.filter(pk=request.data.get("truck"), chief_fleet=chief_fleet, is_active=True,
+                                     status='available').first()
+        if truck is None:
+            return Response({"error": "Truck not found or not available"}, status=status.HTTP_400_BAD_REQUEST)
+        driver = Driver.objects.filter(pk=request.data.get("driver")).first()
+        if driver is None:
+            return Response({"error": "Driver not found"}, status=status.HTTP_400_BAD_REQUEST)
+
+        sending_requests = list(SendingRequest.objects.filter(pk__in=ids))
+        if len(sending_requests) != len(ids):
+            return Response({"error": "Request not found"}, status=status.HTTP_400_BAD_REQUEST)
+        # Memes regles que les groupages proposes : sans elles, un trajet echappe aux contraintes de chevauchement
+        errors = (window_error(sending_request) for sending_request in sending_requests)
+        error = next(filter(None, errors), None) or check_grouping(sending_requests) \
+            or check_load(sending_requests, entry_from_truck(truck))
+        if error is not None:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            trip = assign_trip(chief_fleet, ids, truck, driver)
+        except AssignmentConflict as e:
+            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(FleetTripSerializer(trip).data, status=status.HTTP_201_CREATED)
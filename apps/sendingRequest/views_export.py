@@ -0,0 +1,37 @@
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+from apps.core.export import export_filters, export_parameters, export_response
+from apps.sendingRequest.models import SendingRequest
+
+# Views for exports
+
+tags = "Sending Requests"
+
+sending_request_statuses = [value for value, _ in SendingRequest.STATUS_CHOICES]
+
+sending_request_columns = (
+    'id', 'client', 'client__email', 'recipient_name', 'recipient_email', 'recipient_phone', 'cargo_type', 'weight',
+    'dimensions', 'quantity', 'pickup_location', 'pickup_date_time', 'delivery_location', 'delivery_date_time',
+    'priority', 'base_price', 'commission_rate', 'total_price', 'status', 'request_date', 'updated_at',
+)
+
+
+class AdminSendingRequestExportView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="Exporter les demandes (CSV ou NDJSON, en streaming)",
+        manual_parameters=export_parameters(sending_request_statuses),
+        responses={
+            200: openapi.Response("Export file"),
+            400: openapi.Response("Bad request"),
+            403: openapi.Response("User unauthorized"),
+        },
+        tags=[tags]
+    )
+    def get(self, request):
+        requests = export_filters(request, SendingRequest.objects.all(), 'request_date', sending_request_statuses)
+        return export_response(request, requests, sending_request_columns, "sending_requests")
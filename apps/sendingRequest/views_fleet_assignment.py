@@ -7,15 +7,25 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.core.conditional import list_validators, not_modified, with_validators
+from apps.core.fast_serializer import ValuesSerializer
+from apps.core.serializers import fieldset_from_request, fieldset_parameters
+from apps.sendingRequest.changes import CHANGES_PAGE_SIZE, changes_since
 from apps.sendingRequest.models import SendingRequestFleetAssignment
 from apps.sendingRequest.serializers import SendingRequestFleetAssignmentSerializer, \
     CancelSendingRequestFleetAssignmentSerializer
-from apps.sendingRequest.utils import sending_request_to_delivery_note
+from apps.sendingRequest.utils import assign_sending_request, release_sending_request, save_assignment, \
+    AssignmentConflict, ScheduleConflict
 
 # Views for Fleet assignment
 
 tags = "Fleet Assignment"
 
+# Relations imbriquees dans SendingRequestFleetAssignmentSerializer, chargees en une seule requete
+assignment_related = ('sending_request__client', 'delivery_note__client', 'driver', 'truck')
+# Dates de modification prises en compte dans l'ETag de la liste (assignation et details imbriques)
+assignment_timestamps = ('updated_at', 'sending_request__updated_at', 'truck__updated_at')
+
 body_parameters = openapi.Schema(
     type=openapi.TYPE_OBJECT,
     properties={
@@ -26,54 +36,54 @@ body_parameters = openapi.Schema(
     required=["sending_request", "driver"],
 )
 
+since_parameter = openapi.Parameter(
+    'since', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False,
+    description="Curseur renvoye par l'appel precedent (0 ou absent pour tout recevoir)",
+)
+
 
 class FleetAssignmentView(APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [JSONParser]
 
-    def verify_assignment(self, pk):
-        return SendingRequestFleetAssignment.objects.get(sending_request=pk, status="assigned")
-
     @swagger_auto_schema(
-        operation_description="Assigner un chef de flotte avec chauffeur a une demande",
+        operation_description="Assigner un chef de flotte avec chauffeur a une demande acceptee",
         request_body=body_parameters,
         responses={
             201: openapi.Response("Assignment done successfully", SendingRequestFleetAssignmentSerializer),
             400: openapi.Response("Bad Request"),
             403: openapi.Response("User unauthorized"),
+            409: openapi.Response("Request already assigned, not accepted or claimed by another chief, "
+                                  "or driver / truck already busy"),
         },
         tags=[tags]
     )
     def post(self, request):
+        chief_fleet = request.user
+        if chief_fleet.role != "chief":
+            return Response({"error": "You must be a chief to perform this request"},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        data = request.data.copy()  # Copier les données pour les modifier
+        data['fleet_manager'] = chief_fleet.id
+        data.pop('delivery_note', None)  # Cree pendant l'assignation
+
+        serializer = SendingRequestFleetAssignmentSerializer(data=data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
         try:
-            chief_fleet = request.user
-            if chief_fleet.role == "chief":
-                data = request.data.copy()  # Copier les données pour les modifier
-                data['fleet_manager'] = chief_fleet.id
-
-                id_delivery_note = sending_request_to_delivery_note(data['sending_request'])
-                data['delivery_note'] = id_delivery_note
-
-                sending_req = self.verify_assignment(data['sending_request'])
-
-                if sending_req:
-                    return Response({"error": "Request already assigned"}, status=status.HTTP_400_BAD_REQUEST)
-
-                serializer = SendingRequestFleetAssignmentSerializer(data=data)
-                if serializer.is_valid():
-                    serializer.save()
-                    return Response(serializer.data, status=status.HTTP_201_CREATED)
-                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                return Response({"error": "You must be a chief to perform this request"},
-                                status=status.HTTP_403_FORBIDDEN)
-        except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            assign_sending_request(serializer)
+        except AssignmentConflict as e:
+            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @swagger_auto_schema(
         operation_description="Lister les demandes ou le chef son assigne",
+        manual_parameters=fieldset_parameters(SendingRequestFleetAssignmentSerializer),
         responses={
             200: openapi.Response("List of chief assignment", SendingRequestFleetAssignmentSerializer),
+            304: openapi.Response("Not modified"),
             403: openapi.Response("User unauthorized"),
         },
         tags=[tags]
@@ -86,8 +96,15 @@ class FleetAssignmentView(APIView):
             return Response({"error": "You must be a chief to perform this request"},
                             status=status.HTTP_403_FORBIDDEN)
 
-        serializer = SendingRequestFleetAssignmentSerializer(requests, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        serializer = ValuesSerializer(SendingRequestFleetAssignmentSerializer(**fieldset_from_request(request)),
+                                      always=['id', *assignment_timestamps])
+        rows = list(serializer.queryset(requests))
+        etag = list_validators(request, rows, assignment_timestamps)
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+        return with_validators(Response(serializer.data(rows), status=status.HTTP_200_OK), etag)
 
 
 class FleetAssignmentDetailsView(APIView):
@@ -96,7 +113,8 @@ class FleetAssignmentDetailsView(APIView):
 
     def get_obj(self, pk):
         try:
-            return SendingRequestFleetAssignment.objects.get(pk=pk, fleet_manager=self.request.user)
+            return SendingRequestFleetAssignment.objects.select_related(*assignment_related).get(
+                pk=pk, fleet_manager=self.request.user)
         except SendingRequestFleetAssignment.DoesNotExist:
             raise NotFound("Request not found")
 
@@ -113,6 +131,7 @@ class FleetAssignmentDetailsView(APIView):
             200: openapi.Response("Update driver done", SendingRequestFleetAssignmentSerializer),
             400: openapi.Response("Bad request"),
             403: openapi.Response("User unauthorized"),
+            409: openapi.Response("Driver or truck already assigned on an overlapping window"),
         },
         tags=[tags]
     )
@@ -120,7 +139,10 @@ class FleetAssignmentDetailsView(APIView):
         request_assignment = self.get_obj(pk)
         serializer = SendingRequestFleetAssignmentSerializer(request_assignment, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
+            try:
+                save_assignment(serializer.save)
+            except ScheduleConflict as e:
+                return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -135,9 +157,55 @@ class FleetAssignmentDetailsView(APIView):
     )
     def post(self, request, pk):
         request_assignment = self.get_obj(pk)
-        request_assignment.status = "cancelled"
-        request_assignment.save()
+        release_sending_request(request_assignment)
         serializer = CancelSendingRequestFleetAssignmentSerializer(request_assignment)
         if serializer:
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class FleetAssignmentChangesView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Synchronisation incrementale : assignations du chef modifiees ou supprimees depuis "
+                              f"le curseur `since` (au plus {CHANGES_PAGE_SIZE} modifications par appel ; "
+                              "rappeler avec le nouveau curseur tant que `more` est vrai). 204 sans contenu si "
+                              "rien n'a change.",
+        manual_parameters=[since_parameter, *fieldset_parameters(SendingRequestFleetAssignmentSerializer)],
+        responses={
+            200: openapi.Response("Changed assignments, deleted ids and the new cursor"),
+            204: openapi.Response("No change since the cursor"),
+            400: openapi.Response("Bad Request"),
+            403: openapi.Response("User unauthorized"),
+        },
+        tags=[tags]
+    )
+    def get(self, request):
+        chief_fleet = request.user
+        if chief_fleet.role != "chief":
+            return Response({"error": "You must be a chief to perform this request"},
+                            status=status.HTTP_403_FORBIDDEN)
+        try:
+            since = int(request.query_params.get('since', 0))
+        except ValueError:
+            since = -1
+        if since < 0:
+            return Response({"error": "`since` must be a non-negative integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        cursor, changed, deleted, more = changes_since(chief_fleet, since)
+        if cursor == since:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        # L'id est toujours renvoye : le client fusionne les assignations recues avec sa copie locale
+        fieldset = fieldset_from_request(request)
+        if 'fields' in fieldset:
+            fieldset['fields'].append('id')
+        serializer = ValuesSerializer(SendingRequestFleetAssignmentSerializer(**fieldset))
+        assignments = serializer.data(serializer.queryset(
+            SendingRequestFleetAssignment.objects.filter(fleet_manager=chief_fleet, pk__in=changed)))
+        # Une assignation absente (supprimee sans passer par le journal) est aussi une suppression
+        found = {assignment['id'] for assignment in assignments}
+        deleted += [pk for pk in changed if pk not in found]
+        return Response({"cursor": cursor, "more": more, "assignments": assignments, "deleted": deleted},
+                        status=status.HTTP_200_OK)
@@ -0,0 +1,31 @@
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.sendingRequest.route_planner import plan_chief_routes
+
+# Views for route planning
+
+tags = "Fleet Assignment"
+
+
+class RoutePlanView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Proposer des tournees multi-arrets pour les demandes assignees au chef de flotte "
+                              "(fenetres horaires et capacite des camions respectees)",
+        responses={
+            200: openapi.Response("Tours, unplanned requests and distance saved"),
+            403: openapi.Response("User unauthorized"),
+        },
+        tags=[tags]
+    )
+    def get(self, request):
+        if request.user.role != "chief":
+            return Response({"error": "You must be a chief to perform this request"},
+                            status=status.HTTP_403_FORBIDDEN)
+        return Response(plan_chief_routes(request.user), status=status.HTTP_200_OK)
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 10:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscription', '0004_subscription'),
+        ('users', '0010_alter_member_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['client'], name='subscription_active_client_idx'),
+        ),
+    ]
@@ -34,3 +34,9 @@ class Subscription(models.Model):
 
     def __str__(self):
         return f"{self.client} - {self.sub_plan} ({self.status})"
+
+    class Meta:
+        indexes = [
+            # Recherche de l'abonnement actif d'un client
+            models.Index(fields=['client'], condition=models.Q(status='active'), name='subscription_active_client_idx'),
+        ]
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TruckConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.truck'
+
+    def ready(self):
+        # Index des recommandations tenu a jour a chaque modification de camion
+        from apps.truck import signals  # noqa: F401
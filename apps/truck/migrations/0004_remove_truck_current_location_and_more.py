@@ -0,0 +1,38 @@
+# Generated by Django 5.1.5 on 2026-10-18 10:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('truck', '0003_alter_truck_max_load_capacity_alter_truck_notes'),
+        ('users', '0010_alter_member_status'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='truck',
+            name='current_location',
+        ),
+        migrations.RemoveField(
+            model_name='truck',
+            name='insurance_expiry_date',
+        ),
+        migrations.AddField(
+            model_name='truck',
+            name='chief_fleet',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='trucks', to='users.chieffleet'),
+        ),
+        migrations.AddField(
+            model_name='truck',
+            name='insurance',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='truck',
+            name='next_maintenance_due',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.5 on 2026-10-18 10:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('truck', '0004_remove_truck_current_location_and_more'),
+        ('users', '0010_alter_member_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='truck',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['id'], name='truck_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='truck',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['chief_fleet'], name='truck_active_chief_idx'),
+        ),
+    ]
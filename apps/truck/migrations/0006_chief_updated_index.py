@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 10:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('truck', '0005_hot_lookup_indexes'),
+        ('users', '0010_alter_member_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='truck',
+            index=models.Index(fields=['chief_fleet', 'updated_at'], name='truck_chief_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('truck', '0006_chief_updated_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='truck',
+            name='cargo_volume',
+            field=models.FloatField(blank=True, help_text='Cargo space in cubic metres', null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:15
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('truck', '0007_cargo_volume'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='truck',
+            name='truck_active_idx',
+        ),
+    ]
@@ -21,6 +21,7 @@ class Truck(models.Model):
     last_maintenance_date = models.DateField(null=True, blank=True)
     next_maintenance_due = models.DateField(null=True, blank=True)
     max_load_capacity = models.FloatField(help_text="Maximum capacity in tonnes")
+    cargo_volume = models.FloatField(null=True, blank=True, help_text="Cargo space in cubic metres")
     insurance = models.CharField(max_length=50, null=True, blank=True)
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='available')
@@ -35,3 +36,11 @@ class Truck(models.Model):
 
     def __str__(self):
         return f"{self.brand} {self.model} ({self.license_plate})"
+
+    class Meta:
+        indexes = [
+            # Les camions supprimes sont seulement desactives (is_active=False)
+            models.Index(fields=['chief_fleet'], condition=models.Q(is_active=True), name='truck_active_chief_idx'),
+            # Version de l'index des recommandations (dernier updated_at d'un chef)
+            models.Index(fields=['chief_fleet', 'updated_at'], name='truck_chief_updated_idx'),
+        ]
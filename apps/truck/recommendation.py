@@ -0,0 +1,179 @@
+import bisect
+import heapq
+import threading
+from collections import namedtuple
+
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.sendingRequest.scheduling import overlapping_assignments
+from apps.truck.models import Truck
+
+# Largeur d'un bucket de capacite, en tonnes
+CAPACITY_BUCKET = 1.0
+
+TruckEntry = namedtuple('TruckEntry',
+                        'id capacity next_maintenance_due mileage license_plate brand model cargo_volume')
+
+truck_entry_fields = ('id', 'max_load_capacity', 'next_maintenance_due', 'mileage', 'license_plate', 'brand', 'model',
+                      'cargo_volume')
+
+
+def bucket_of(capacity):
+    return int(capacity // CAPACITY_BUCKET)
+
+
+def required_capacity(sending_request):
+    """
+    Charge de la demande en tonnes (`weight` est en kg par element, `max_load_capacity` en tonnes).
+    """
+    return float(sending_request.weight) * sending_request.quantity / 1000
+
+
+def entry_from_truck(truck):
+    return TruckEntry(truck.pk, truck.max_load_capacity, truck.next_maintenance_due, truck.mileage,
+                      truck.license_plate, truck.brand, truck.model, truck.cargo_volume)
+
+
+class ChiefTrucks:
+    """
+    Camions disponibles d'un chef de flotte, ranges par bucket de capacite.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.trucks = {}
+        self.buckets = {}
+        self.keys = []
+
+    def add(self, entry):
+        self.discard(entry.id)
+        self.trucks[entry.id] = entry
+        key = bucket_of(entry.capacity)
+        if key not in self.buckets:
+            self.buckets[key] = set()
+            bisect.insort(self.keys, key)
+        self.buckets[key].add(entry.id)
+
+    def discard(self, truck_id):
+        entry = self.trucks.pop(truck_id, None)
+        if entry is None:
+            return
+        key = bucket_of(entry.capacity)
+        self.buckets[key].discard(truck_id)
+        if not self.buckets[key]:
+            del self.buckets[key]
+            self.keys.remove(key)
+
+    def candidates(self, required):
+        """
+        Camions d'une capacite suffisante, bucket par bucket en partant de celui de `required`.
+        """
+        for key in self.keys[bisect.bisect_left(self.keys, bucket_of(required)):]:
+            yield [entry for entry in map(self.trucks.__getitem__, self.buckets[key]) if entry.capacity >= required]
+
+
+class TruckIndex:
+    """
+    Index en memoire des camions recommandables, charge par chef de flotte a la premiere demande.
+
+    Les signaux de Truck oublient le chef d'un camion modifie dans le processus courant ; le dernier `updated_at`
+    des camions du chef (une lecture d'index) detecte les modifications faites par les autres processus et
+    recharge le chef. Les camions sont desactives plutot que supprimes, ce qui met aussi `updated_at` a jour.
+    """
+
+    def __init__(self):
+        self.chiefs = {}
+        self.lock = threading.Lock()
+
+    def version(self, chief_id):
+        return Truck.objects.filter(chief_fleet=chief_id).aggregate(last=Max('updated_at'))['last']
+
+    def load(self, chief_id, version):
+        chief = ChiefTrucks(version)
+        trucks = Truck.objects.filter(chief_fleet=chief_id, is_active=True, status='available')
+        for row in trucks.values_list(*truck_entry_fields):
+            chief.add(TruckEntry(*row))
+        return chief
+
+    def get(self, chief_id):
+        version = self.version(chief_id)
+        with self.lock:
+            chief = self.chiefs.get(chief_id)
+            if chief is None or chief.version != version:
+                chief = self.chiefs[chief_id] = self.load(chief_id, version)
+            return chief
+
+    def update(self, truck):
+        """
+        Camion enregistre ou supprime par ce processus : son chef (et l'ancien s'il a change de chef) est recharge
+        a la prochaine demande. Corriger l'entree sur place en avancant sa version la ferait passer pour a jour
+        alors qu'un autre processus a pu modifier un autre camion du chef entre-temps.
+        """
+        with self.lock:
+            for chief_id in [chief_id for chief_id, chief in self.chiefs.items() if truck.pk in chief.trucks]:
+                del self.chiefs[chief_id]
+            self.chiefs.pop(truck.chief_fleet_id, None)
+
+    discard = update
+
+    def clear(self):
+        with self.lock:
+            self.chiefs.clear()
+
+
+truck_index = TruckIndex()
+
+
+def busy_trucks_between(chief_id, start, end, exclude_request=None):
+    """
+    Camions du chef deja assignes sur une fenetre qui chevauche [start, end].
+    """
+    assignments = overlapping_assignments(start, end).filter(fleet_manager=chief_id, truck__isnull=False)
+    if exclude_request is not None:
+        assignments = assignments.exclude(sending_request=exclude_request)
+    return set(assignments.values_list('truck', flat=True))
+
+
+def busy_trucks(chief_id, sending_request):
+    """
+    Camions du chef deja assignes sur une demande dont la fenetre chevauche celle de `sending_request`.
+    """
+    return busy_trucks_between(chief_id, sending_request.pickup_date_time, sending_request.delivery_date_time,
+                               exclude_request=sending_request.pk)
+
+
+def recommend_trucks(sending_request, chief_id, limit=10):
+    """
+    Classe les camions disponibles du chef pour une demande : capacite suffisante, pas d'entretien prevu
+    avant la prise en charge, pas d'assignation sur la meme fenetre. Le camion le moins surdimensionne
+    passe en premier, puis le moins kilometre.
+    """
+    required = required_capacity(sending_request)
+    pickup_day = timezone.localdate(sending_request.pickup_date_time)
+    busy = busy_trucks(chief_id, sending_request)
+    chief = truck_index.get(chief_id)
+
+    # Les buckets sont parcourus par capacite croissante : des que `limit` camions sont retenus,
+    # les buckets suivants ne peuvent contenir que des camions plus surdimensionnes
+    best = []
+    for bucket in chief.candidates(required):
+        best.extend(
+            entry for entry in bucket
+            if entry.id not in busy and (entry.next_maintenance_due is None or entry.next_maintenance_due > pickup_day)
+        )
+        if len(best) >= limit:
+            break
+    best = heapq.nsmallest(limit, best, key=lambda entry: (entry.capacity - required, entry.mileage or 0, entry.id))
+    return [
+        {
+            'id': entry.id,
+            'license_plate': entry.license_plate,
+            'brand': entry.brand,
+            'model': entry.model,
+            'max_load_capacity': entry.capacity,
+            'spare_capacity': round(entry.capacity - required, 3),
+            'load_ratio': round(required / entry.capacity, 3) if entry.capacity else None,
+        }
+        for entry in best
+    ]
@@ -1,9 +1,12 @@
 from rest_framework import serializers
 
+from apps.core.serializers import DynamicFieldsMixin
 from apps.truck.models import Truck
 
 
-class TruckSerializer(serializers.ModelSerializer):
+class TruckSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    summary_fields = ('id', 'license_plate', 'brand', 'model', 'max_load_capacity', 'status')
+
     class Meta:
         model = Truck
         fields = '__all__'
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.truck.models import Truck
+from apps.truck.recommendation import truck_index
+
+
+@receiver(post_save, sender=Truck)
+def truck_saved(sender, instance, **kwargs):
+    truck_index.update(instance)
+
+
+@receiver(post_delete, sender=Truck)
+def truck_deleted(sender, instance, **kwargs):
+    truck_index.discard(instance)
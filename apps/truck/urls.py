@@ -1,9 +1,10 @@
 from django.urls import path
 
-from apps.truck.views import TruckView, TruckDetail, TruckListView
+from apps.truck.views import TruckView, TruckDetail, TruckListView, TruckRecommendationView
 
 truck_urlpatterns = [
     path('truck/add/', TruckView.as_view(), name='Add new truck'),
     path('truck/details/<int:pk>', TruckDetail.as_view(), name="Truck details"),
-    path('truck/list/', TruckListView.as_view(), name="Truck list")
+    path('truck/list/', TruckListView.as_view(), name="Truck list"),
+    path('truck/recommendation/<int:pk>', TruckRecommendationView.as_view(), name="Truck recommendation"),
 ]
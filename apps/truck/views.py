@@ -1,4 +1,5 @@
 from django.http import Http404
+from django.utils import timezone
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
@@ -7,7 +8,13 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.core.conditional import list_validators, not_modified, object_validators, with_validators
+from apps.core.fast_serializer import ValuesSerializer
+from apps.core.serializers import fieldset_from_request, fieldset_parameters
+from apps.sendingRequest.claims import available_to
+from apps.sendingRequest.models import SendingRequest
 from apps.truck.models import Truck
+from apps.truck.recommendation import recommend_trucks
 from apps.truck.serializers import TruckSerializer
 
 # Create your views here.
@@ -27,6 +34,7 @@ body_parameters = openapi.Schema(
         "next_maintenance_due": openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE,
                                                description="Next Date Truck Maintenance"),
         "max_load_capacity": openapi.Schema(type=openapi.FORMAT_FLOAT, description="Max Load Capacity"),
+        "cargo_volume": openapi.Schema(type=openapi.FORMAT_FLOAT, description="Cargo space in cubic metres"),
         "insurance": openapi.Schema(type=openapi.TYPE_STRING, max_length=10, description="Insurance information"),
         "status": openapi.Schema(type=openapi.TYPE_STRING, description="Truck Status",
                                  enum=["available", "maintenance", "on mission"]),
@@ -127,10 +135,12 @@ class TruckListView(APIView):
                 openapi.IN_QUERY,
                 description="ID du camion à récupérer (optionnel)",
                 type=openapi.TYPE_INTEGER
-            )
+            ),
+            *fieldset_parameters(TruckSerializer),
         ],
         responses={
             200: openapi.Response("List of truck"),
+            304: openapi.Response("Not modified"),
             500: openapi.Response("Internal Server Error"),
         },
         tags=[tags]
@@ -138,12 +148,62 @@ class TruckListView(APIView):
     def get(self, request):
         try:
             truck_id = request.query_params.get("truck_id")
+            fieldset = fieldset_from_request(request)
             if truck_id:
                 truck = get_object_truck(truck_id)
-                serializer = TruckSerializer(truck)
-            else:
-                trucks = Truck.objects.filter(is_active=True)
-                serializer = TruckSerializer(trucks, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+                etag, last_modified = object_validators(request, truck)
+                response = not_modified(request, etag, last_modified)
+                if response is not None:
+                    return response
+                serializer = TruckSerializer(truck, **fieldset)
+                return with_validators(Response(serializer.data, status=status.HTTP_200_OK), etag, last_modified)
+
+            serializer = ValuesSerializer(TruckSerializer(**fieldset), always=['id', 'updated_at'])
+            trucks = list(serializer.queryset(Truck.objects.filter(is_active=True)))
+            etag = list_validators(request, trucks)
+            response = not_modified(request, etag)
+            if response is not None:
+                return response
+
+            return with_validators(Response(serializer.data(trucks), status=status.HTTP_200_OK), etag)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class TruckRecommendationView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser]
+
+    @swagger_auto_schema(
+        operation_description="Recommander les camions disponibles du chef de flotte pour une demande",
+        manual_parameters=[
+            openapi.Parameter(
+                "limit",
+                openapi.IN_QUERY,
+                description="Nombre de camions proposes (10 par defaut, 50 maximum)",
+                type=openapi.TYPE_INTEGER
+            ),
+        ],
+        responses={
+            200: openapi.Response("Ranked trucks"),
+            403: openapi.Response("Forbidden (you must be a chief)"),
+            404: openapi.Response("Request not found"),
+        },
+        tags=[tags]
+    )
+    def get(self, request, pk):
+        if request.user.role != "chief":
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        try:
+            # Comme la liste du chef : demandes acceptees qu'il peut encore reserver
+            sending_request = SendingRequest.objects.filter(
+                available_to(request.user, timezone.now()), status='accepted',
+            ).only('id', 'weight', 'quantity', 'pickup_date_time', 'delivery_date_time').get(pk=pk)
+        except SendingRequest.DoesNotExist:
+            raise Http404("Request not found")
+
+        try:
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), 50)
+        except ValueError:
+            limit = 10
+        return Response(recommend_trucks(sending_request, request.user.pk, limit), status=status.HTTP_200_OK)
@@ -39,12 +39,14 @@ INSTALLED_APPS = [
     'apps.invoice',
     'apps.truck',
     'apps.contrat',
+    'apps.location',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'drf_yasg',
     'djoser',
@@ -138,6 +140,19 @@ USE_TZ = True
 STATIC_URL = 'static/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Matrice des distances entre lieux, partagee par les workers (voir apps.location.matrix)
+DISTANCE_MATRIX_PATH = BASE_DIR / 'var' / 'distance_matrix.npy'
+
+# PDF des factures deja rendus (voir apps.invoice.pdf)
+INVOICE_PDF_CACHE_DIR = BASE_DIR / 'var' / 'invoices'
+# Processus du pool de rendu des factures (?async=true, pre-rendu) ; 0 pour rendre dans le processus courant
+INVOICE_RENDER_WORKERS = 2
+# Processus de rendu d'une archive ZIP de factures (apps.invoice.archive) ; None pour un par coeur, 0 sans pool
+INVOICE_ARCHIVE_WORKERS = None
+
+# Duree (secondes) de la reservation d'une demande par un chef de flotte (voir apps.sendingRequest.claims)
+SENDING_REQUEST_CLAIM_LEASE = 300
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
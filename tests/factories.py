@@ -0,0 +1,133 @@
+import itertools
+from datetime import timedelta
+from decimal import Decimal
+
+import factory
+from django.utils import timezone
+from faker import Faker
+
+from apps.sendingRequest.models import DeliveryNote, SendingRequest, SendingRequestFleetAssignment
+from apps.truck.models import Truck
+from apps.users.models import Admin, ChiefFleet, ClientCompany, Driver, IndividualClient
+
+fake = Faker()
+
+# Compteur partage : les sous-classes de User ont toutes la meme table pour l'email et le username
+user_sequence = itertools.count()
+
+
+class UserFactoryMixin(factory.django.DjangoModelFactory):
+    username = factory.LazyFunction(lambda: f"user{next(user_sequence)}")
+    email = factory.LazyAttribute(lambda user: f"{user.username}@logisty.mg")
+    first_name = factory.LazyAttribute(lambda _: fake.first_name()[:25])
+    last_name = factory.LazyAttribute(lambda _: fake.last_name()[:20])
+    password = factory.PostGenerationMethodCall('set_password', 'password123')
+    phone = factory.LazyAttribute(lambda _: fake.msisdn()[:15])
+
+    class Meta:
+        abstract = True
+
+
+class ClientFactory(UserFactoryMixin):
+    class Meta:
+        model = IndividualClient
+
+    address = factory.LazyAttribute(lambda _: fake.address()[:150])
+    role = 'client'
+
+
+class CompanyFactory(UserFactoryMixin):
+    class Meta:
+        model = ClientCompany
+
+    address = factory.LazyAttribute(lambda _: fake.address()[:150])
+    company_name = factory.LazyAttribute(lambda _: fake.company()[:100])
+    industry = "Retail"
+    role = 'company'
+
+
+class DriverFactory(UserFactoryMixin):
+    class Meta:
+        model = Driver
+
+    address = factory.LazyAttribute(lambda _: fake.address()[:150])
+    experience = 3
+    role = 'driver'
+
+
+class ChiefFleetFactory(UserFactoryMixin):
+    class Meta:
+        model = ChiefFleet
+
+    company_name = factory.LazyAttribute(lambda _: fake.company()[:100])
+    company_address = "Antananarivo"
+    role = 'chief'
+
+
+class AdminFactory(UserFactoryMixin):
+    class Meta:
+        model = Admin
+
+    role = 'admin'
+
+
+class SendingRequestFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = SendingRequest
+
+    client = factory.SubFactory(ClientFactory)
+    recipient_name = factory.LazyAttribute(lambda _: fake.name()[:150])
+    recipient_email = factory.LazyAttribute(lambda _: fake.email())
+    recipient_phone = "+261340000000"
+    cargo_type = 'pallets_boxes'
+    weight = Decimal("120.50")
+    dimensions = "100x50x30 cm"
+    quantity = 2
+    pickup_location = "Antananarivo"
+    pickup_date_time = factory.LazyFunction(lambda: timezone.now() + timedelta(days=1))
+    delivery_location = "Toamasina"
+    delivery_date_time = factory.LazyFunction(lambda: timezone.now() + timedelta(days=2))
+    priority = 'medium'
+    status = 'pending'
+
+
+class DeliveryNoteFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = DeliveryNote
+
+    client = factory.SubFactory(ClientFactory)
+    recipient_name = factory.LazyAttribute(lambda _: fake.name()[:150])
+    recipient_email = factory.LazyAttribute(lambda _: fake.email())
+    recipient_phone = "+261340000000"
+    cargo_type = 'pallets_boxes'
+    weight = Decimal("120.50")
+    dimensions = "100x50x30 cm"
+    quantity = 2
+    pickup_location = "Antananarivo"
+    pickup_date_time = factory.LazyFunction(lambda: timezone.now() + timedelta(days=1))
+    delivery_location = "Toamasina"
+    delivery_date_time = factory.LazyFunction(lambda: timezone.now() + timedelta(days=2))
+
+
+class TruckFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Truck
+
+    chief_fleet = factory.SubFactory(ChiefFleetFactory)
+    license_plate = factory.Sequence(lambda n: f"{n:04d}TBA")
+    brand = "Isuzu"
+    model = "NPR"
+    year = 2018
+    max_load_capacity = 5.0
+
+
+class FleetAssignmentFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = SendingRequestFleetAssignment
+
+    sending_request = factory.SubFactory(SendingRequestFactory, status='accepted')
+    fleet_manager = factory.SubFactory(ChiefFleetFactory)
+    delivery_note = factory.SubFactory(DeliveryNoteFactory, client=factory.SelfAttribute('..sending_request.client'))
+    driver = factory.SubFactory(DriverFactory)
+    truck = factory.SubFactory(TruckFactory, chief_fleet=factory.SelfAttribute('..fleet_manager'))
+    window = factory.LazyAttribute(lambda o: (o.sending_request.pickup_date_time, o.sending_request.delivery_date_time))
@@ -0,0 +1,77 @@
+import pytest
+from rest_framework.test import APIClient
+
+from apps.sendingRequest.changes import compact_changes
+from apps.sendingRequest.models import AssignmentChange
+from tests.factories import ChiefFleetFactory, DriverFactory, FleetAssignmentFactory, SendingRequestFactory, \
+    TruckFactory
+
+prelink = "http://127.0.0.1:8000/api/v1/"
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+def changes(api_client, since, **params):
+    return api_client.get(prelink + 'sending_request_assignment_changes/', {'since': since, **params})
+
+
+# Test GET - Synchronisation incrementale : seulement ce qui a change depuis le curseur, 204 sinon
+@pytest.mark.django_db
+def test_assignment_changes_since_cursor(api_client):
+    chief = ChiefFleetFactory()
+    api_client.force_authenticate(user=chief)
+    sending_request = SendingRequestFactory(status='accepted')
+    response = api_client.post(prelink + 'sending_request_assignment/', {
+        "sending_request": sending_request.id, "driver": str(DriverFactory().id),
+        "truck": TruckFactory(chief_fleet=chief).id}, format='json')
+    assert response.status_code == 201
+    assignment_id = response.data['id']
+
+    response = changes(api_client, 0, fields='summary')
+    assert response.status_code == 200
+    assert [assignment['id'] for assignment in response.data['assignments']] == [assignment_id]
+    assert response.data['deleted'] == [] and response.data['more'] is False
+    cursor = response.data['cursor']
+
+    response = changes(api_client, cursor)
+    assert response.status_code == 204 and not response.content
+
+    api_client.post(prelink + f'sending_request_assignment_details/{assignment_id}')  # annulation
+    response = changes(api_client, cursor, fields='status')
+    assert response.data['assignments'] == [{'id': assignment_id, 'status': 'cancelled'}]
+    change = AssignmentChange.objects.get(pk=response.data['cursor'])
+    assert (change.status, change.request_status) == ('cancelled', 'accepted')
+
+
+# Test GET - Une demande supprimee laisse un tombstone pour son assignation
+@pytest.mark.django_db
+def test_assignment_changes_tombstone(api_client):
+    chief = ChiefFleetFactory()
+    api_client.force_authenticate(user=chief)
+    assignment = FleetAssignmentFactory(fleet_manager=chief)
+    FleetAssignmentFactory()  # autre chef
+    cursor = changes(api_client, 0).data['cursor']
+
+    assignment.sending_request.delete()
+    response = changes(api_client, cursor)
+    assert response.data['assignments'] == []
+    assert response.data['deleted'] == [assignment.id]
+
+
+# Compactage : seule la derniere entree de chaque assignation est gardee, le resultat ne change pas
+@pytest.mark.django_db
+def test_compact_changes(api_client):
+    chief = ChiefFleetFactory()
+    api_client.force_authenticate(user=chief)
+    assignment = FleetAssignmentFactory(fleet_manager=chief)
+    for status in ('in_progress', 'completed'):
+        assignment.status = status
+        assignment.save()
+    before = changes(api_client, 0).data
+
+    assert compact_changes() == 2
+    assert changes(api_client, 0).data == before
+    assert AssignmentChange.objects.filter(assignment_id=assignment.id).count() == 1
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.sendingRequest.claims import claim_next
+from tests.factories import ChiefFleetFactory, DriverFactory, SendingRequestFactory
+
+prelink = "http://127.0.0.1:8000/api/v1/"
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+def claim(api_client, chief):
+    api_client.force_authenticate(user=chief)
+    return api_client.post(prelink + 'sending_request_claim/')
+
+
+# Test POST - File des chefs : priorite haute d'abord, puis la prise en charge la plus proche, 204 quand vide
+@pytest.mark.django_db
+def test_claim_order(api_client):
+    now = timezone.now()
+    later = SendingRequestFactory(status='accepted', pickup_date_time=now + timedelta(days=2))
+    sooner = SendingRequestFactory(status='accepted', pickup_date_time=now + timedelta(days=1))
+    urgent = SendingRequestFactory(status='accepted', priority='high', pickup_date_time=now + timedelta(days=3))
+    SendingRequestFactory(status='pending')
+    chief, other, third = ChiefFleetFactory(), ChiefFleetFactory(), ChiefFleetFactory()
+
+    assert claim(api_client, chief).data['id'] == urgent.id
+    assert claim(api_client, other).data['id'] == sooner.id
+    response = claim(api_client, third)
+    assert response.data['id'] == later.id and response.data['claim_expires_at'] > now
+    assert claim(api_client, ChiefFleetFactory()).status_code == 204
+
+
+# Test POST - Un chef ne tient qu'une reservation : il recoit la sienne tant qu'elle n'a pas expire
+@pytest.mark.django_db
+def test_claim_one_per_chief(api_client, settings):
+    first = SendingRequestFactory(status='accepted', priority='high')
+    second = SendingRequestFactory(status='accepted')
+    chief, other = ChiefFleetFactory(), ChiefFleetFactory()
+
+    response = claim(api_client, chief)
+    assert response.data['id'] == first.id
+    again = claim(api_client, chief)
+    assert again.data['id'] == first.id and again.data['claim_expires_at'] == response.data['claim_expires_at']
+    assert claim(api_client, other).data['id'] == second.id
+
+    expired = timezone.now() + timedelta(seconds=settings.SENDING_REQUEST_CLAIM_LEASE + 1)
+    assert claim_next(chief, now=expired).pk == first.pk
+
+
+# Test - Une demande reservee est cachee aux autres chefs et ne peut pas leur etre assignee
+@pytest.mark.django_db
+def test_claim_blocks_other_chiefs(api_client):
+    sending_request = SendingRequestFactory(status='accepted')
+    chief, other = ChiefFleetFactory(), ChiefFleetFactory()
+    claim(api_client, chief)
+
+    api_client.force_authenticate(user=other)
+    response = api_client.get(prelink + 'sending_request_details_chief/')
+    assert [item['id'] for item in response.data['results']] == []
+    response = api_client.post(prelink + 'sending_request_assignment/', {
+        "sending_request": sending_request.id, "driver": str(DriverFactory().id)}, format='json')
+    assert response.status_code == 409
+    assert api_client.delete(prelink + f'sending_request_claim/{sending_request.id}').status_code == 404
+
+    api_client.force_authenticate(user=chief)
+    response = api_client.post(prelink + 'sending_request_assignment/', {
+        "sending_request": sending_request.id, "driver": str(DriverFactory().id)}, format='json')
+    assert response.status_code == 201
+    sending_request.refresh_from_db()
+    assert sending_request.claimed_by is None and sending_request.claim_expires_at is None
+
+
+# Test - Reservation expiree ou rendue : la demande revient dans la file
+@pytest.mark.django_db
+def test_claim_expires_and_release(api_client, settings):
+    sending_request = SendingRequestFactory(status='accepted')
+    chief, other = ChiefFleetFactory(), ChiefFleetFactory()
+    claim(api_client, chief)
+    assert claim_next(other) is None
+    expired = timezone.now() + timedelta(seconds=settings.SENDING_REQUEST_CLAIM_LEASE + 1)
+    assert claim_next(other, now=expired).pk == sending_request.pk
+
+    api_client.force_authenticate(user=other)
+    assert api_client.delete(prelink + f'sending_request_claim/{sending_request.id}').status_code == 204
+    assert claim(api_client, chief).data['id'] == sending_request.id
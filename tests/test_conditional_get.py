@@ -0,0 +1,118 @@
+import pytest
+from rest_framework.test import APIClient
+
+from tests.factories import ChiefFleetFactory, ClientFactory, SendingRequestFactory, FleetAssignmentFactory, \
+    TruckFactory
+
+prelink = "http://127.0.0.1:8000/api/v1/"
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+# Test GET - 304 sur la liste client tant que rien ne change
+@pytest.mark.django_db
+def test_client_list_not_modified(api_client):
+    client = ClientFactory()
+    sending_request = SendingRequestFactory(client=client)
+    api_client.force_authenticate(user=client)
+    url = prelink + 'sending_request/'
+
+    response = api_client.get(url)
+    etag = response['ETag']
+    assert response.status_code == 200
+    # Liste : ETag seulement, If-Modified-Since ignore (une suppression ne change pas max(updated_at))
+    assert not response.has_header('Last-Modified')
+    assert api_client.get(url, HTTP_IF_MODIFIED_SINCE='Thu, 01 Jan 2037 00:00:00 GMT').status_code == 200
+
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert not response.content
+
+    sending_request.recipient_name = "Nouveau destinataire"
+    sending_request.save()
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+
+
+# Test GET - Une suppression change aussi l'ETag de la liste
+@pytest.mark.django_db
+def test_client_list_etag_changes_on_delete(api_client):
+    client = ClientFactory()
+    SendingRequestFactory(client=client)
+    older = SendingRequestFactory(client=client)
+    SendingRequestFactory(client=client)
+    api_client.force_authenticate(user=client)
+    url = prelink + 'sending_request/'
+    etag = api_client.get(url)['ETag']
+
+    older.delete()
+
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+# Test GET - L'ETag d'une page ne suit que les lignes de cette page
+@pytest.mark.django_db
+def test_client_page_etag_follows_page_rows(api_client):
+    client = ClientFactory()
+    older = SendingRequestFactory(client=client)
+    newest = SendingRequestFactory(client=client)
+    api_client.force_authenticate(user=client)
+    url = prelink + 'sending_request/?page_size=1'
+    etag = api_client.get(url)['ETag']
+
+    older.recipient_name = "Page suivante"
+    older.save()
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    # Plus de page suivante : `next` change
+    older.delete()
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+    etag = api_client.get(url)['ETag']
+
+    newest.recipient_name = "Premiere page"
+    newest.save()
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+# Test GET - If-Modified-Since sur le detail d'une demande
+@pytest.mark.django_db
+def test_detail_if_modified_since(api_client):
+    sending_request = SendingRequestFactory()
+    api_client.force_authenticate(user=sending_request.client)
+    url = prelink + f'sending_request_details/{sending_request.id}'
+
+    last_modified = api_client.get(url)['Last-Modified']
+
+    assert api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code == 304
+
+
+# Test GET - L'ETag des assignations suit les demandes imbriquees
+@pytest.mark.django_db
+def test_assignment_list_etag_follows_nested_request(api_client):
+    chief = ChiefFleetFactory()
+    assignment = FleetAssignmentFactory(fleet_manager=chief)
+    api_client.force_authenticate(user=chief)
+    url = prelink + 'sending_request_assignment/'
+    etag = api_client.get(url)['ETag']
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    assignment.sending_request.status = 'in_progress'
+    assignment.sending_request.save()
+
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+# Test GET - 304 sur la liste des camions, ETag different selon ?fields=
+@pytest.mark.django_db
+def test_truck_list_not_modified(api_client):
+    TruckFactory.create_batch(2)
+    api_client.force_authenticate(user=ChiefFleetFactory())
+    url = prelink + 'truck/list/'
+    etag = api_client.get(url)['ETag']
+
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert api_client.get(url + '?fields=summary', HTTP_IF_NONE_MATCH=etag).status_code == 200
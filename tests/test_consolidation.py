@@ -0,0 +1,177 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import importlib
+
+import pytest
+from django.apps import apps
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.location.gazetteer import load_gazetteer
+from apps.location.resolver import clear_cache
+from apps.sendingRequest.dimensions import parse_dimensions
+from apps.sendingRequest.models import DeliveryNote, SendingRequest, SendingRequestFleetAssignment
+from apps.truck.recommendation import truck_index
+from tests.factories import ChiefFleetFactory, DeliveryNoteFactory, DriverFactory, SendingRequestFactory, TruckFactory
+
+prelink = "http://127.0.0.1:8000/api/v1/"
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def gazetteer(db):
+    load_gazetteer()
+    truck_index.clear()
+    yield
+    clear_cache()
+    truck_index.clear()
+
+
+def small_request(**kwargs):
+    pickup = timezone.now().replace(hour=8, minute=0) + timedelta(days=2)
+    defaults = dict(status='accepted', cargo_type='pallets_boxes', weight=Decimal("500.00"), quantity=2,
+                    dimensions="100x100x100 cm", pickup_location="Antananarivo", delivery_location="Toamasina",
+                    pickup_date_time=pickup, delivery_date_time=pickup + timedelta(hours=12))
+    return SendingRequestFactory(**{**defaults, **kwargs})
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("100x50x30 cm", (1.0, 0.5, 0.3)),
+    ("1.2m x 80cm x 1m", (1.2, 0.8, 1.0)),
+    ("120 x 80 x 100", (1.2, 0.8, 1.0)),
+    ("1,5x1x2 m", (1.5, 1.0, 2.0)),
+    ("120×80×100cm", (1.2, 0.8, 1.0)),
+    ("L: 1,20 m, l: 80 cm, H: 1 m", (1.2, 0.8, 1.0)),
+    ("40 x 30 x 20 inches", (1.016, 0.762, 0.508)),
+    ("grand carton", None),
+    ("3 cartons de 100x50x30", None),
+    ("0x50x30 cm", None),
+])
+def test_parse_dimensions(text, expected):
+    result = parse_dimensions(text)
+    assert result is None if expected is None else result == pytest.approx(expected)
+
+
+# Colonnes numeriques remplies a l'enregistrement, et reprise des lignes existantes par la migration
+@pytest.mark.django_db
+def test_dimension_columns():
+    sending_request = SendingRequestFactory(dimensions="100x50x30 cm", quantity=2)
+    assert (sending_request.length, sending_request.width, sending_request.height) == (1.0, 0.5, 0.3)
+    assert sending_request.volume == pytest.approx(0.3)
+    note = DeliveryNoteFactory(dimensions="1,2 x 0,8 x 1 m", quantity=1)
+    unreadable = SendingRequestFactory(dimensions="grand carton")
+    assert unreadable.volume is None
+
+    SendingRequest.objects.update(length=None, width=None, height=None, volume=None)
+    DeliveryNote.objects.update(volume=None)
+    importlib.import_module('apps.sendingRequest.migrations.0012_backfill_dimensions').backfill(apps, None)
+
+    assert SendingRequest.objects.get(pk=sending_request.pk).volume == pytest.approx(0.3)
+    assert DeliveryNote.objects.get(pk=note.pk).volume == pytest.approx(0.96)
+    assert SendingRequest.objects.filter(volume__lte=1).count() == 1
+
+
+def proposed_trips(api_client, chief):
+    api_client.force_authenticate(user=chief)
+    response = api_client.get(prelink + 'sending_request_trip/')
+    assert response.status_code == 200
+    return response.data['trips']
+
+
+# Test GET - Meme corridor et meme jour dans le plus petit camion qui porte le groupe
+def test_consolidation_groups_same_corridor(api_client, gazetteer):
+    chief = ChiefFleetFactory()
+    TruckFactory(chief_fleet=chief, max_load_capacity=20.0)
+    small = TruckFactory(chief_fleet=chief, max_load_capacity=3.0)
+    grouped = [small_request() for _ in range(3)]  # 3 x 1 tonne
+    small_request(delivery_location="Mahajanga")  # autre corridor, seul
+    small_request(cargo_type='vehicle')  # pas un petit envoi
+
+    trips = proposed_trips(api_client, chief)
+
+    assert len(trips) == 1
+    assert trips[0]['sending_requests'] == sorted(r.id for r in grouped)
+    assert trips[0]['truck']['id'] == small.id
+    assert trips[0]['load_tonnes'] == 3.0
+
+
+# Test GET - Volume du camion et conditions speciales incompatibles
+def test_consolidation_respects_volume_and_conditions(api_client, gazetteer):
+    chief = ChiefFleetFactory()
+    TruckFactory(chief_fleet=chief, max_load_capacity=20.0, cargo_volume=4.5)
+    TruckFactory(chief_fleet=chief, max_load_capacity=20.0, cargo_volume=4.5)
+    for _ in range(4):
+        small_request()  # 2 m3 chacune : deux par camion
+    small_request(special_conditions="Transport réfrigéré obligatoire")
+
+    trips = proposed_trips(api_client, chief)
+
+    assert [len(trip['sending_requests']) for trip in trips] == [2, 2]
+    assert all(trip['volume_m3'] <= 4.5 and trip['conditions'] == [] for trip in trips)
+
+
+# Test POST - Confirmation d'un groupage : un trajet, une assignation par demande
+def test_confirm_trip(api_client, gazetteer):
+    chief = ChiefFleetFactory()
+    truck = TruckFactory(chief_fleet=chief, max_load_capacity=5.0)
+    driver = DriverFactory()
+    requests = [small_request() for _ in range(3)]
+    api_client.force_authenticate(user=chief)
+    body = {"sending_requests": [r.id for r in requests], "truck": truck.id, "driver": str(driver.id)}
+
+    response = api_client.post(prelink + 'sending_request_trip/', body, format='json')
+
+    assert response.status_code == 201
+    assignments = SendingRequestFleetAssignment.objects.filter(trip=response.data['id'])
+    assert sorted(a.sending_request_id for a in assignments) == sorted(r.id for r in requests)
+    assert all(a.delivery_note_id and a.truck_id == truck.id for a in assignments)
+    assert set(SendingRequest.objects.filter(pk__in=body["sending_requests"]).values_list('status', flat=True)) \
+           == {'in_progress'}
+
+    # Deja assignees
+    response = api_client.post(prelink + 'sending_request_trip/', body, format='json')
+    assert response.status_code == 409
+
+
+# Test POST - Groupage refuse : capacite depassee, ou conditions incompatibles
+def test_confirm_trip_rejects_invalid_load(api_client, gazetteer):
+    chief = ChiefFleetFactory()
+    truck = TruckFactory(chief_fleet=chief, max_load_capacity=1.5)
+    driver = DriverFactory()
+    api_client.force_authenticate(user=chief)
+
+    too_heavy = [small_request(), small_request()]
+    response = api_client.post(prelink + 'sending_request_trip/', {
+        "sending_requests": [r.id for r in too_heavy], "truck": truck.id, "driver": str(driver.id)}, format='json')
+    assert response.status_code == 400
+
+    mixed = [small_request(weight=Decimal("100.00"), special_conditions="Produits chimiques inflammables"),
+             small_request(weight=Decimal("100.00"), additional_details="Denrées périssables")]
+    response = api_client.post(prelink + 'sending_request_trip/', {
+        "sending_requests": [r.id for r in mixed], "truck": truck.id, "driver": str(driver.id)}, format='json')
+    assert response.status_code == 400
+    assert "special conditions" in response.data['error']
+    assert not SendingRequestFleetAssignment.objects.exists()
+
+
+# Test POST - Groupage refuse hors des regles des propositions : autre corridor, autre jour, gros envoi
+def test_confirm_trip_rejects_invalid_grouping(api_client, gazetteer):
+    chief = ChiefFleetFactory()
+    truck = TruckFactory(chief_fleet=chief, max_load_capacity=20)
+    driver = DriverFactory()
+    api_client.force_authenticate(user=chief)
+    first = small_request(weight=Decimal("100.00"))
+
+    for other in (small_request(weight=Decimal("100.00"), delivery_location="Mahajanga"),
+                  small_request(weight=Decimal("100.00"), pickup_date_time=first.pickup_date_time + timedelta(days=1),
+                                delivery_date_time=first.delivery_date_time + timedelta(days=1)),
+                  small_request(weight=Decimal("100.00"), cargo_type='vehicle')):
+        response = api_client.post(prelink + 'sending_request_trip/', {
+            "sending_requests": [first.id, other.id], "truck": truck.id, "driver": str(driver.id)}, format='json')
+        assert response.status_code == 400, other
+    assert not SendingRequestFleetAssignment.objects.exists()
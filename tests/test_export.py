@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+
+import pytest
+from rest_framework.test import APIClient
+
+from apps.invoice.models import SendingRequestInvoice
+from tests.factories import AdminFactory, ClientFactory, SendingRequestFactory
+
+prelink = "http://127.0.0.1:8000/api/v1/"
+
+
+@pytest.fixture
+def api_client():
+    api_client = APIClient()
+    api_client.force_authenticate(user=AdminFactory())
+    return api_client
+
+
+def read_stream(response):
+    assert response.status_code == 200
+    assert response.streaming
+    return b''.join(response.streaming_content).decode()
+
+
+# Test GET - Export CSV des demandes, filtre par statut, dans l'ordre chronologique
+@pytest.mark.django_db
+def test_sending_request_csv_export(api_client):
+    accepted = SendingRequestFactory.create_batch(3, status='accepted')
+    SendingRequestFactory(status='pending')
+
+    response = api_client.get(prelink + 'sending_request_export_admin/?status=accepted')
+
+    rows = list(csv.DictReader(io.StringIO(read_stream(response))))
+    assert response['Content-Type'].startswith('text/csv')
+    assert [int(row['id']) for row in rows] == [r.id for r in accepted]
+    assert rows[0]['client_email'] == accepted[0].client.email
+    assert rows[0]['weight'] == str(accepted[0].weight)
+
+
+# Test GET - Export NDJSON des factures sur une periode
+@pytest.mark.django_db
+def test_invoice_ndjson_export_date_range(api_client):
+    client = ClientFactory()
+    invoice = SendingRequestInvoice.objects.create(client=client, total_ttc="1500.00")
+    day = invoice.created_at.date()
+
+    response = api_client.get(prelink + f'invoice/sending_request/export_admin/?file_format=ndjson'
+                                        f'&date_from={day}&date_to={day}')
+
+    lines = [json.loads(line) for line in read_stream(response).splitlines()]
+    assert [line['invoice_number'] for line in lines] == [invoice.invoice_number]
+    assert lines[0]['total_ttc'] == "1500.00"
+
+    response = api_client.get(prelink + f'invoice/sending_request/export_admin/?file_format=ndjson&date_to=2000-01-01')
+    assert read_stream(response) == ''
+
+
+# Test GET - Parametres invalides et acces non admin
+@pytest.mark.django_db
+def test_export_rejects_invalid_parameters(api_client):
+    url = prelink + 'invoice/subscription/export_admin/'
+    assert api_client.get(url + '?date_from=18-10-2026').status_code == 400
+    assert api_client.get(url + '?status=unknown').status_code == 400
+    assert api_client.get(url + '?file_format=xlsx').status_code == 400
+
+    api_client.force_authenticate(user=ClientFactory())
+    assert api_client.get(url).status_code == 403
@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from apps.core.fast_serializer import ValuesSerializer
+from apps.invoice.models import SendingRequestInvoice
+from apps.invoice.serializers import SendingRequestInvoiceSerializer
+from apps.sendingRequest.models import SendingRequest, SendingRequestFleetAssignment
+from apps.sendingRequest.serializers import SendingRequestSerializer, SendingRequestFleetAssignmentSerializer
+from apps.truck.models import Truck
+from apps.truck.serializers import TruckSerializer
+from tests.factories import SendingRequestFactory, TruckFactory, FleetAssignmentFactory
+
+
+def render_both(serializer_class, queryset, **fieldset):
+    drf = serializer_class(queryset, many=True, **fieldset).data
+    fast = ValuesSerializer(serializer_class(**fieldset))
+    return JSONRenderer().render(drf), JSONRenderer().render(fast.data(fast.queryset(queryset)))
+
+
+# Test - Meme JSON que les ModelSerializer d'origine
+@pytest.mark.django_db
+@pytest.mark.parametrize("serializer_class, model", [
+    (SendingRequestSerializer, SendingRequest),
+    (TruckSerializer, Truck),
+    (SendingRequestInvoiceSerializer, SendingRequestInvoice),
+    (SendingRequestFleetAssignmentSerializer, SendingRequestFleetAssignment),
+])
+def test_values_serializer_matches_model_serializer(serializer_class, model):
+    SendingRequestFactory(additional_details=None, base_price=Decimal("1500000.5"), attached_files="sending_requests/a.pdf")
+    request = SendingRequestFactory(weight=Decimal("0.10"), total_price=Decimal("12"))
+    SendingRequestInvoice.objects.create(client=request.client, sending_request=request, total_ttc=Decimal("9.99"))
+    SendingRequestInvoice.objects.create(client=request.client, sending_request=None)
+    TruckFactory(chief_fleet=None, color=None, max_load_capacity=7.25)
+    FleetAssignmentFactory(driver=None, truck=None)
+    FleetAssignmentFactory()
+
+    drf, fast = render_both(serializer_class, model.objects.order_by('id'))
+
+    assert fast == drf
+
+
+# Test - Meme JSON avec une selection de champs
+@pytest.mark.django_db
+def test_values_serializer_matches_sparse_fieldset():
+    SendingRequestFactory.create_batch(3)
+
+    drf, fast = render_both(SendingRequestSerializer, SendingRequest.objects.order_by('id'),
+                            fields=['summary'], expand=['client'])
+
+    assert fast == drf
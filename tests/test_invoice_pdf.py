@@ -0,0 +1,261 @@
+import datetime
+import io
+import re
+import zipfile
+import zlib
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.invoice import pdf
+from apps.invoice.models import SendingRequestInvoice, SubscriptionInvoice
+from apps.invoice.rendering import render_queue
+from apps.invoice.statement import statement_requests, statement_totals
+from apps.invoice.views import bulk_invoice_sending_requests, get_subscription_invoices
+from apps.sendingRequest.models import SendingRequest
+from apps.subscription.models import Subscription, SubscriptionPlan
+from tests.factories import AdminFactory, ClientFactory, CompanyFactory, SendingRequestFactory
+
+prelink = "http://127.0.0.1:8000/api/v1/"
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def cache_dir(settings, tmp_path):
+    settings.INVOICE_PDF_CACHE_DIR = tmp_path
+    return tmp_path
+
+
+def download(api_client, url):
+    response = api_client.post(url)
+    assert response.status_code == 200
+    return b''.join(response.streaming_content)
+
+
+# Test POST - PDF rendu une fois, puis servi depuis le disque : une requete SQL, pas de rendu
+@pytest.mark.django_db
+def test_sending_request_invoice_pdf_cached(api_client, cache_dir, monkeypatch):
+    sending_request = SendingRequestFactory()
+    invoice = SendingRequestInvoice.objects.create(client=sending_request.client, sending_request=sending_request,
+                                                   total_ttc="1500.00")
+    api_client.force_authenticate(user=sending_request.client)
+    url = prelink + f'invoice/sending_request/{invoice.pk}'
+    first = download(api_client, url)
+    assert first.startswith(b'%PDF')
+    assert len(list(cache_dir.glob('sending_request/*/*.pdf'))) == 1
+
+    monkeypatch.setattr(pdf, 'render_pdf', lambda lines: pytest.fail("PDF rendered again"))
+    with CaptureQueriesContext(connection) as queries:
+        assert download(api_client, url) == first
+    assert len(queries) == 1
+
+
+# Test POST - Une demande modifiee invalide le PDF de sa facture
+@pytest.mark.django_db
+def test_sending_request_invoice_pdf_invalidated(api_client, cache_dir):
+    sending_request = SendingRequestFactory()
+    invoice = SendingRequestInvoice.objects.create(client=sending_request.client, sending_request=sending_request)
+    api_client.force_authenticate(user=sending_request.client)
+    url = prelink + f'invoice/sending_request/{invoice.pk}'
+    first = download(api_client, url)
+
+    sending_request.recipient_name = "Rakoto Jean"
+    sending_request.save()
+    assert not list(cache_dir.glob('sending_request/*/*.pdf'))
+    assert download(api_client, url) != first
+    assert len(list(cache_dir.glob('sending_request/*/*.pdf'))) == 1
+
+
+# Test POST - Facture d'abonnement : abonnement actif du client lu dans la meme requete
+@pytest.mark.django_db
+def test_subscription_invoice_pdf(api_client, cache_dir):
+    client = ClientFactory()
+    plan = SubscriptionPlan.objects.create(name="Pro", description="Pro", price=50000, duration_month=1)
+    subscription = Subscription.objects.create(client=client, sub_plan=plan)
+    invoice = SubscriptionInvoice.objects.create(client=client, sub_plan=subscription, total_ttc="50000.00")
+    api_client.force_authenticate(user=client)
+    url = prelink + f'invoice/subscription/{invoice.pk}'
+
+    with CaptureQueriesContext(connection) as queries:
+        assert download(api_client, url).startswith(b'%PDF')
+    assert len(queries) == 1
+    name, values = pdf.subscription_invoice_lines(get_subscription_invoices(SimpleNamespace(user=client), invoice.pk))
+    assert (pdf.TEXT, 70, 360, "Statut: active") in pdf.TEMPLATES[name].lines(values)
+
+    subscription.status = 'expired'
+    subscription.save()
+    assert not list(cache_dir.glob('subscription/*/*.pdf'))
+
+
+# Test POST ?async=true - Rendu dans le pool de processus, PDF servi par le suivi du rendu
+@pytest.mark.django_db
+def test_sending_request_invoice_async(api_client, cache_dir, settings):
+    settings.INVOICE_RENDER_WORKERS = 2
+    sending_request = SendingRequestFactory()
+    invoice = SendingRequestInvoice.objects.create(client=sending_request.client, sending_request=sending_request)
+    api_client.force_authenticate(user=sending_request.client)
+
+    response = api_client.post(prelink + f'invoice/sending_request/{invoice.pk}?async=true')
+    assert response.status_code == 202
+    assert response.data['job'] == f"sending_request/{invoice.pk}"
+    assert response.data['url'].endswith(f'invoice/render_job/sending_request/{invoice.pk}')
+    for job in list(render_queue.jobs.values()):
+        job.result(timeout=30)
+
+    response = api_client.get(prelink + f'invoice/render_job/sending_request/{invoice.pk}')
+    assert response.status_code == 200
+    assert b''.join(response.streaming_content).startswith(b'%PDF')
+    assert api_client.get(prelink + f'invoice/render_job/unknown/{invoice.pk}').status_code == 404
+
+
+# Test - Factures creees en lot pre-rendues apres le commit
+@pytest.mark.django_db
+def test_invoices_prerendered_on_commit(cache_dir, settings, django_capture_on_commit_callbacks):
+    settings.INVOICE_RENDER_WORKERS = 0
+    sending_requests = SendingRequestFactory.create_batch(2)
+    with django_capture_on_commit_callbacks(execute=True):
+        invoices = bulk_invoice_sending_requests(sending_requests)
+        assert not list(cache_dir.glob('sending_request/*/*.pdf'))
+    assert {int(path.parent.name) for path in cache_dir.glob('sending_request/*/*.pdf')} == \
+        {invoice.pk for invoice in invoices}
+
+
+# Test GET - Archive ZIP des factures : PDF du cache reutilises, les autres rendus dans le pool et mis en cache
+@pytest.mark.django_db
+def test_invoice_archive_export(api_client, cache_dir, settings):
+    settings.INVOICE_ARCHIVE_WORKERS = 2
+    sending_requests = SendingRequestFactory.create_batch(3)
+    invoices = [SendingRequestInvoice.objects.create(client=sending_request.client, sending_request=sending_request)
+                for sending_request in sending_requests]
+    canceled = SendingRequestInvoice.objects.create(client=sending_requests[0].client,
+                                                    sending_request=sending_requests[0], status='canceled')
+    api_client.force_authenticate(user=invoices[0].client)
+    cached = download(api_client, prelink + f'invoice/sending_request/{invoices[0].pk}')
+
+    api_client.force_authenticate(user=AdminFactory())
+    response = api_client.get(prelink + 'invoice/archive_export_admin/?kind=sending_request&status=paid')
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/zip'
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+    assert sorted(archive.namelist()) == sorted(f"sending_request/{invoice.invoice_number}.pdf" for invoice in invoices)
+    assert f"sending_request/{canceled.invoice_number}.pdf" not in archive.namelist()
+    assert archive.read(f"sending_request/{invoices[0].invoice_number}.pdf") == cached
+    assert all(archive.read(name).startswith(b'%PDF') for name in archive.namelist())
+    assert len(list(cache_dir.glob('sending_request/*/*.pdf'))) == 3
+
+    assert api_client.get(prelink + 'invoice/archive_export_admin/?kind=unknown').status_code == 400
+
+
+# Test GET - Archive ZIP complete meme avec des factures dont la demande ou l'abonnement ont ete supprimes
+@pytest.mark.django_db
+def test_invoice_archive_export_orphan_invoices(api_client, cache_dir, settings):
+    settings.INVOICE_ARCHIVE_WORKERS = 0
+    sending_request = SendingRequestFactory(status='cancelled')
+    orphan = SendingRequestInvoice.objects.create(client=sending_request.client, sending_request=sending_request)
+    sending_request.delete()
+    other = SendingRequestFactory()
+    invoice = SendingRequestInvoice.objects.create(client=other.client, sending_request=other)
+    plan = SubscriptionPlan.objects.create(name="Pro", description="Pro", price=50000, duration_month=1)
+    subscription = Subscription.objects.create(client=other.client, sub_plan=plan)
+    subscription_invoice = SubscriptionInvoice.objects.create(client=other.client, sub_plan=subscription)
+    subscription.delete()
+
+    api_client.force_authenticate(user=AdminFactory())
+    response = api_client.get(prelink + 'invoice/archive_export_admin/')
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+    assert sorted(archive.namelist()) == sorted([
+        f"sending_request/{orphan.invoice_number}.pdf", f"sending_request/{invoice.invoice_number}.pdf",
+        f"subscription/{subscription_invoice.invoice_number}.pdf",
+    ])
+
+    api_client.force_authenticate(user=orphan.client)
+    assert download(api_client, prelink + f'invoice/sending_request/{orphan.pk}').startswith(b'%PDF')
+
+
+# Test GET - Releve mensuel d'une entreprise : lignes sur plusieurs pages, sous-totaux et total calcules en SQL
+@pytest.mark.django_db
+def test_company_monthly_statement(api_client):
+    company = CompanyFactory()
+    september = timezone.make_aware(datetime.datetime(2026, 9, 15, 10, 0))
+    SendingRequestFactory.create_batch(43, client=company, status='completed')
+    SendingRequestFactory.create_batch(2, client=company, status='in_progress', cargo_type='container')
+    cancelled = SendingRequestFactory(client=company, status='cancelled')
+    SendingRequest.objects.filter(client=company).update(request_date=september, total_price=Decimal("1000.00"))
+    SendingRequestFactory(client=company, status='completed')  # mois courant
+
+    subtotals, total = statement_totals(statement_requests(company, september.date()))
+    assert [(row['cargo_type'], row['count'], row['amount']) for row in subtotals] == [
+        ('container', 2, Decimal("2000.00")), ('pallets_boxes', 43, Decimal("43000.00"))]
+    assert (total['count'], total['weight'], total['amount']) == (45, Decimal("5422.50"), Decimal("45000.00"))
+    assert cancelled.pk not in statement_requests(company, september.date()).values_list('pk', flat=True)
+
+    api_client.force_authenticate(user=company)
+    response = api_client.get(prelink + 'invoice/company_statement/?month=2026-09')
+    assert response.status_code == 200
+    content = b''.join(response.streaming_content)
+    # 45 lignes sur 2 pages, puis le recapitulatif ; l'entete des pages de lignes est un seul form XObject
+    assert len(re.findall(rb'/Type /Page\b(?!s)', content)) == 3
+    assert content.count(b'/Subtype /Form') == 1
+    # PDF ecrit page par page : chaque entree de la table xref pointe sur son objet
+    xref = int(re.search(rb'startxref\n(\d+)', content).group(1))
+    offsets = re.findall(rb'^(\d{10}) 00000 n $', content[xref:], re.M)
+    assert all(content[int(offset):].startswith(b'%d 0 obj' % number) for number, offset in enumerate(offsets, 1))
+
+    assert api_client.get(prelink + 'invoice/company_statement/?month=09-2026').status_code == 400
+    api_client.force_authenticate(user=ClientFactory())
+    assert api_client.get(prelink + 'invoice/company_statement/?month=2026-09').status_code == 403
+
+
+# Test GET - Releve avec des noms hors WinAnsi : chaque police utilisee par une page est declaree
+@pytest.mark.django_db
+def test_company_statement_declares_fallback_fonts(api_client):
+    company = CompanyFactory()
+    for name in ("Łukasz Nowak", "Иван Петров", "Rakoto 😀"):
+        SendingRequestFactory(client=company, status='completed', recipient_name=name)
+    api_client.force_authenticate(user=company)
+
+    response = api_client.get(prelink + f'invoice/company_statement/?month={timezone.localdate():%Y-%m}')
+    content = b''.join(response.streaming_content)
+
+    streams = [zlib.decompress(stream) for stream in re.findall(rb'stream\n(.*?)\nendstream', content, re.S)]
+    used = set(re.findall(rb'(/F\d+) [\d.]+ Tf', b''.join(streams)))
+    declared = {name for fonts in re.findall(rb'/Font << (.*?) >>', content) for name in re.findall(rb'/F\d+', fonts)}
+    assert b'/F3' in used
+    assert used <= declared
+    assert b'/BaseFont /ZapfDingbats >>' in content
+
+
+# Test - Modele de page : partie fixe recopiee, seules les valeurs sont dessinees, polices sous les memes noms
+def test_invoice_page_template():
+    template = pdf.TEMPLATES['subscription']
+    values = [f"valeur {index}" for index in range(len(template.fields))]
+    content = pdf.render_pdf(('subscription', values))
+    stream = zlib.decompress(re.search(rb'stream\r?\n(.*?)endstream', content, re.S).group(1)).decode('latin-1')
+
+    assert stream.count(template.code) == 1
+    assert "/F2 16 Tf" in template.code and b'/BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding /Name /F2' in content
+    assert all(f"({value}) Tj" in stream for value in values)
+    assert "(Statut:) Tj" in stream and "(Statut: " not in stream
+
+
+# Test POST - Client sans adresse (champ nullable) : champ vide sur la facture
+@pytest.mark.django_db
+def test_sending_request_invoice_pdf_without_address(api_client, cache_dir):
+    sending_request = SendingRequestFactory()
+    client = sending_request.client
+    client.address = None
+    client.save()
+    invoice = SendingRequestInvoice.objects.create(client=client, sending_request=sending_request)
+    api_client.force_authenticate(user=client)
+    assert download(api_client, prelink + f'invoice/sending_request/{invoice.pk}').startswith(b'%PDF')
+    name, values = pdf.sending_request_invoice_lines(invoice)
+    assert (pdf.TEXT, 70, 240, "Adresse: ") in pdf.TEMPLATES[name].lines(values)
@@ -0,0 +1,118 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from apps.core.geo import AVERAGE_SPEED_KMH, ROAD_FACTOR, haversine_km
+from apps.location.gazetteer import load_gazetteer
+from apps.location.matrix import location_matrix, update_distance_matrix
+from apps.location.models import Location
+from apps.location.resolver import clear_cache, resolve_location
+from apps.sendingRequest.models import SendingRequest
+from tests.factories import CompanyFactory, SendingRequestFactory
+
+prelink = "http://127.0.0.1:8000/api/v1/"
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def gazetteer(db):
+    load_gazetteer()
+    yield
+    clear_cache()
+    location_matrix.clear()
+
+
+# Noms usuels, adresses libres et fautes de frappe
+@pytest.mark.parametrize("text, expected", [
+    ("Antananarivo", "Antananarivo"),
+    ("Port de Tamatave", "Toamasina"),
+    ("Fort-Dauphin centre", "Taolagnaro"),
+    ("Lot II M 85, Analakely, Tana", "Antananarivo"),
+    ("Diego Suarez", "Antsiranana"),
+    ("Fénérive Est", "Fenoarivo Atsinanana"),
+    ("Toamsina", "Toamasina"),
+    ("Fianarnatsoa ville", "Fianarantsoa"),
+])
+def test_resolve_location(gazetteer, text, expected):
+    assert resolve_location(text).name == expected
+
+
+def test_resolve_location_unknown(gazetteer):
+    assert resolve_location("Quelque part") is None
+    assert resolve_location("") is None
+
+
+# Les demandes enregistrees recoivent leurs lieux resolus
+def test_sending_request_places_resolved_on_save(gazetteer):
+    sending_request = SendingRequestFactory(pickup_location="Tana", delivery_location="Nulle part")
+    assert sending_request.pickup_place.name == "Antananarivo"
+    assert sending_request.delivery_place is None
+
+    sending_request.delivery_location = "Majunga"
+    sending_request.save()
+    sending_request.refresh_from_db()
+    assert sending_request.delivery_place.name == "Mahajanga"
+
+
+# Test POST - Envoi groupe (bulk_create, sans pre_save)
+def test_bulk_sending_request_places_resolved(gazetteer, api_client):
+    company = CompanyFactory()
+    item = {
+        "recipient_name": "Rakoto", "recipient_email": "rakoto@example.com", "recipient_phone": "+261340000000",
+        "cargo_type": "pallets_boxes", "weight": "100.00", "dimensions": "1x1x1 cm", "quantity": 1,
+        "pickup_location": "Antsirabe", "pickup_date_time": "2030-01-01T08:00:00Z",
+        "delivery_location": "Tulear", "delivery_date_time": "2030-01-03T08:00:00Z",
+    }
+    api_client.force_authenticate(user=company)
+    response = api_client.post(prelink + 'sending_request/bulk/', [item], format='json')
+
+    assert response.status_code == 201
+    sending_request = SendingRequest.objects.get(pk=response.data['results'][0]['id'])
+    assert (sending_request.pickup_place.name, sending_request.delivery_place.name) == ("Antsirabe", "Toliara")
+
+
+# Reprise des lignes existantes, par lots
+def test_backfill_locations(gazetteer):
+    resolved = SendingRequestFactory(pickup_location="Moramanga", delivery_location="Tamatave")
+    unknown = SendingRequestFactory(pickup_location="Nulle part", delivery_location="Ailleurs")
+    SendingRequest.objects.update(pickup_place=None, delivery_place=None)
+
+    call_command("backfill_locations", "--batch-size", "1", stdout=io.StringIO())
+
+    resolved.refresh_from_db()
+    unknown.refresh_from_db()
+    assert resolved.pickup_place == Location.objects.get(name="Moramanga")
+    assert resolved.delivery_place == Location.objects.get(name="Toamasina")
+    assert unknown.pickup_place is None
+
+
+# Matrice des distances : ajout incremental des nouveaux lieux, lecture en mmap
+def test_distance_matrix_incremental(gazetteer, settings, tmp_path):
+    settings.DISTANCE_MATRIX_PATH = tmp_path / "distance_matrix.npy"
+    assert update_distance_matrix() == (Location.objects.count(), Location.objects.count())
+    assert update_distance_matrix()[1] == 0
+
+    tana, tamatave, morondava = (Location.objects.get(name=name)
+                                 for name in ("Antananarivo", "Toamasina", "Morondava"))
+    km, minutes = location_matrix.between(tana, tamatave)
+    expected = haversine_km((tana.latitude, tana.longitude), (tamatave.latitude, tamatave.longitude)) * ROAD_FACTOR
+    assert km == pytest.approx(expected, rel=1e-5)
+    assert minutes == pytest.approx(expected * 60 / AVERAGE_SPEED_KMH, rel=1e-5)
+    # Route du Menabe : facteur et vitesse de la region la plus difficile
+    assert location_matrix.between(tana, morondava)[1] > location_matrix.between(tana, tamatave)[1] * 1.5
+
+    added = Location.objects.create(name="Ampefy", normalized_name="ampefy", region="Itasy",
+                                    latitude=-19.0333, longitude=46.7333)
+    assert location_matrix.between(tana, added)[0] > 0  # pas encore dans le fichier : calcule a la volee
+    assert update_distance_matrix() == (Location.objects.count(), 1)
+
+    added.refresh_from_db()
+    assert added.matrix_index == Location.objects.count() - 1
+    assert location_matrix.between(tana, tamatave)[0] == pytest.approx(km)
+    assert location_matrix.between(added, tana)[0] == pytest.approx(location_matrix.between(tana, added)[0])
@@ -0,0 +1,21 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+
+
+# Test - Les requetes critiques utilisent leur index, avec les reglages par defaut du planificateur
+@pytest.mark.django_db
+def test_hot_queries_use_an_index():
+    call_command('check_query_plans', seed=10000, verbosity=0)
+
+
+# Test - Un index supprime est detecte, meme si un autre index ou un parcours sequentiel prend le relais
+@pytest.mark.django_db
+@pytest.mark.parametrize('index', ['sending_req_status_date_idx', 'assignment_assigned_req_idx'])
+def test_missing_index_is_reported(index):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP INDEX "{index}"')
+
+    with pytest.raises(CommandError):
+        call_command('check_query_plans', seed=10000, verbosity=0)
@@ -0,0 +1,96 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.location.gazetteer import load_gazetteer
+from apps.location.resolver import clear_cache
+from apps.sendingRequest.route_planner import PlanRequest, RoutePlanner, Vehicle
+from apps.users.models import DriverChiefRequest
+from tests.factories import ChiefFleetFactory, DriverFactory, FleetAssignmentFactory, SendingRequestFactory, \
+    TruckFactory
+
+prelink = "http://127.0.0.1:8000/api/v1/"
+
+# Trois lieux sur une ligne : 0 --100-- 1 --100-- 2
+DISTANCE = [[0, 100, 200], [100, 0, 100], [200, 100, 0]]
+DAY = 24 * 60
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def gazetteer(db):
+    load_gazetteer()
+    yield
+    clear_cache()
+
+
+# Deux demandes sur le meme axe : une seule tournee, plus courte que deux allers-retours
+def test_planner_consolidates_requests():
+    requests = [PlanRequest(1, 0, 2, 0, 2 * DAY, 2.0), PlanRequest(2, 1, 2, 0, 2 * DAY, 2.0)]
+    planner = RoutePlanner(requests, [Vehicle('a', 10.0, None), Vehicle('b', 10.0, None)], DISTANCE).solve()
+
+    assert len(planner.routes) == 1
+    assert planner.total_distance == 400
+    assert planner.baseline_distance() == 600
+
+
+# Capacite : les deux charges ne sont jamais a bord ensemble, et une charge trop lourde reste non planifiee
+def test_planner_respects_capacity():
+    requests = [PlanRequest(1, 0, 2, 0, 2 * DAY, 6.0), PlanRequest(2, 1, 2, 0, 2 * DAY, 6.0),
+                PlanRequest(3, 0, 1, 0, 2 * DAY, 12.0)]
+    planner = RoutePlanner(requests, [Vehicle('a', 10.0, None), Vehicle('b', 10.0, None)], DISTANCE).solve()
+
+    for route in planner.routes:
+        load = 0
+        for index, is_pickup in route.stops:
+            load += requests[index].load if is_pickup else -requests[index].load
+            assert load <= route.vehicle.capacity
+    assert planner.unplanned == {3: 'no_vehicle'}
+
+
+# Fenetre horaire : livraison impossible a temps (200 km a 40 km/h = 5 h)
+def test_planner_respects_time_window():
+    requests = [PlanRequest(1, 0, 2, 0, 60, 1.0)]
+    planner = RoutePlanner(requests, [Vehicle('a', 10.0, None)], DISTANCE).solve()
+
+    assert planner.routes == []
+    assert planner.unplanned == {1: 'infeasible'}
+
+
+# Test GET - Tournees du chef a partir de ses demandes assignees
+@pytest.mark.django_db
+def test_route_plan_endpoint(api_client, gazetteer):
+    chief = ChiefFleetFactory()
+    truck = TruckFactory(chief_fleet=chief, max_load_capacity=20.0)
+    driver = DriverFactory()
+    DriverChiefRequest.objects.create(driver=driver, chief_fleet=chief, status='accepted')
+    pickup = timezone.now() + timedelta(days=1)
+    for location in ("Tana, Analakely", "Moramanga"):
+        sending_request = SendingRequestFactory(pickup_location=location, pickup_date_time=pickup,
+                                                delivery_location="Tamatave", delivery_date_time=pickup + timedelta(days=2),
+                                                weight=Decimal("1000.00"), quantity=1, status='in_progress')
+        FleetAssignmentFactory(fleet_manager=chief, sending_request=sending_request, status='assigned')
+    unknown = SendingRequestFactory(pickup_location="Nulle part", status='in_progress')
+    FleetAssignmentFactory(fleet_manager=chief, sending_request=unknown, status='assigned')
+
+    api_client.force_authenticate(user=chief)
+    response = api_client.get(prelink + 'sending_request_route_plan/')
+
+    assert response.status_code == 200
+    assert len(response.data['tours']) == 1
+    tour = response.data['tours'][0]
+    assert tour['truck'] == truck.id
+    assert tour['driver'] == driver.id
+    assert len(tour['stops']) == 4
+    assert response.data['unplanned'] == [{'sending_request': unknown.id, 'reason': 'unknown_location'}]
+    assert response.data['distance_saved_km'] > 0
+
+    api_client.force_authenticate(user=driver)
+    assert api_client.get(prelink + 'sending_request_route_plan/').status_code == 403
@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.sendingRequest.models import SendingRequestFleetAssignment
+from apps.users.models import DriverChiefRequest
+from tests.factories import ChiefFleetFactory, DriverFactory, FleetAssignmentFactory, SendingRequestFactory, \
+    TruckFactory
+
+prelink = "http://127.0.0.1:8000/api/v1/"
+
+START = timezone.now().replace(microsecond=0) + timedelta(days=3)
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+def accepted_request(start_hour, end_hour):
+    return SendingRequestFactory(status='accepted', pickup_date_time=START + timedelta(hours=start_hour),
+                                 delivery_date_time=START + timedelta(hours=end_hour))
+
+
+def assign(api_client, sending_request, driver, truck):
+    return api_client.post(prelink + 'sending_request_assignment/', {
+        "sending_request": sending_request.id, "driver": str(driver.id), "truck": truck.id}, format='json')
+
+
+# Test POST - Meme chauffeur ou meme camion sur deux fenetres qui se chevauchent : refuse par la base
+@pytest.mark.django_db
+def test_overlapping_assignment_rejected(api_client):
+    chief = ChiefFleetFactory()
+    driver, truck, other_truck = DriverFactory(), TruckFactory(chief_fleet=chief), TruckFactory(chief_fleet=chief)
+    api_client.force_authenticate(user=chief)
+    assert assign(api_client, accepted_request(0, 10), driver, truck).status_code == 201
+
+    overlapping = accepted_request(5, 15)
+    response = assign(api_client, overlapping, driver, other_truck)
+    assert response.status_code == 409
+    overlapping.refresh_from_db()
+    assert overlapping.status == 'accepted'  # reservation annulee avec l'assignation
+    assert assign(api_client, overlapping, DriverFactory(), truck).status_code == 409
+
+    assert assign(api_client, accepted_request(10, 20), driver, truck).status_code == 201  # fenetres contigues
+
+
+# Test POST - Livraison avant ou au moment de la prise en charge : 400, pas de fenetre vide ni inversee
+@pytest.mark.django_db
+def test_assignment_rejects_invalid_window(api_client):
+    chief = ChiefFleetFactory()
+    driver, truck = DriverFactory(), TruckFactory(chief_fleet=chief)
+    api_client.force_authenticate(user=chief)
+
+    for sending_request in (accepted_request(10, 0), accepted_request(5, 5)):
+        response = assign(api_client, sending_request, driver, truck)
+        assert response.status_code == 400
+        assert 'sending_request' in response.data
+
+        response = api_client.post(prelink + 'sending_request_trip/', {
+            "sending_requests": [sending_request.id], "truck": truck.id, "driver": str(driver.id)}, format='json')
+        assert response.status_code == 400
+    assert not SendingRequestFleetAssignment.objects.exists()
+
+
+# Test POST - Une assignation annulee libere le chauffeur et le camion
+@pytest.mark.django_db
+def test_cancelled_assignment_frees_schedule(api_client):
+    chief = ChiefFleetFactory()
+    driver, truck = DriverFactory(), TruckFactory(chief_fleet=chief)
+    api_client.force_authenticate(user=chief)
+    response = assign(api_client, accepted_request(0, 10), driver, truck)
+    api_client.post(prelink + f'sending_request_assignment_details/{response.data["id"]}')
+
+    assert assign(api_client, accepted_request(2, 8), driver, truck).status_code == 201
+
+
+# Test PUT - Changement de chauffeur vers un chauffeur deja pris
+@pytest.mark.django_db
+def test_change_driver_to_busy_driver(api_client):
+    chief = ChiefFleetFactory()
+    busy = FleetAssignmentFactory(fleet_manager=chief, sending_request=accepted_request(0, 10))
+    assignment = FleetAssignmentFactory(fleet_manager=chief, sending_request=accepted_request(5, 15))
+    api_client.force_authenticate(user=chief)
+
+    response = api_client.put(prelink + f'sending_request_assignment_details/{assignment.id}',
+                              {"driver": str(busy.driver_id)}, format='json')
+
+    assert response.status_code == 409
+    assert SendingRequestFleetAssignment.objects.get(pk=assignment.pk).driver_id == assignment.driver_id
+
+
+# Test GET - Chauffeurs et camions libres sur une periode
+@pytest.mark.django_db
+def test_fleet_availability(api_client):
+    chief = ChiefFleetFactory()
+    busy = FleetAssignmentFactory(fleet_manager=chief, sending_request=accepted_request(0, 10), status='in_progress')
+    FleetAssignmentFactory(fleet_manager=chief, sending_request=accepted_request(2, 6), status='cancelled')
+    free_truck = TruckFactory(chief_fleet=chief)
+    TruckFactory(chief_fleet=chief, status='maintenance')
+    free_driver = DriverFactory()
+    for driver, request_status in ((busy.driver, 'accepted'), (free_driver, 'accepted'), (DriverFactory(), 'pending')):
+        DriverChiefRequest.objects.create(driver=driver, chief_fleet=chief, status=request_status)
+    api_client.force_authenticate(user=chief)
+    url = prelink + 'fleet_availability/'
+
+    response = api_client.get(url, {"start": (START + timedelta(hours=8)).isoformat(),
+                                    "end": (START + timedelta(hours=12)).isoformat()})
+
+    assert response.status_code == 200
+    truck_ids = [truck['id'] for truck in response.data['trucks']]
+    assert free_truck.id in truck_ids and busy.truck_id not in truck_ids
+    assert [driver['id'] for driver in response.data['drivers']] == [free_driver.id]
+
+    later = api_client.get(url, {"start": (START + timedelta(hours=10)).isoformat(),
+                                 "end": (START + timedelta(hours=12)).isoformat()})
+    assert busy.truck_id in [truck['id'] for truck in later.data['trucks']]
+
+    assert api_client.get(url, {"start": "demain"}).status_code == 400
+    api_client.force_authenticate(user=free_driver)
+    assert api_client.get(url).status_code == 403
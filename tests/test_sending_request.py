@@ -0,0 +1,323 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.invoice.models import SendingRequestInvoice
+from apps.sendingRequest.models import DeliveryNote, SendingRequest
+from apps.sendingRequest.serializers import SendingRequestSerializer
+from apps.sendingRequest.utils import DELIVERY_NOTE_FIELDS, sending_requests_to_delivery_notes
+from tests.factories import AdminFactory, ChiefFleetFactory, ClientFactory, CompanyFactory, SendingRequestFactory, \
+    FleetAssignmentFactory
+
+prelink = "http://127.0.0.1:8000/api/v1/"
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+def walk_pages(api_client, url):
+    ids = []
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == 200
+        ids.extend(item['id'] for item in response.data['results'])
+        url = response.data['next']
+    return ids
+
+
+# Test GET - Pagination par curseur de la liste client
+@pytest.mark.django_db
+def test_client_list_is_cursor_paginated(api_client):
+    client = ClientFactory()
+    requests = SendingRequestFactory.create_batch(5, client=client)
+    SendingRequestFactory()  # demande d'un autre client
+    api_client.force_authenticate(user=client)
+
+    ids = walk_pages(api_client, prelink + 'sending_request/?page_size=2')
+
+    assert ids == sorted((r.id for r in requests), reverse=True)
+
+
+# Test GET - Les egalites sur request_date sont departagees par l'id
+@pytest.mark.django_db
+def test_admin_list_cursor_handles_identical_dates(api_client):
+    SendingRequestFactory.create_batch(7)
+    SendingRequest.objects.update(request_date=timezone.now())
+    api_client.force_authenticate(user=AdminFactory())
+
+    ids = walk_pages(api_client, prelink + 'sending_request_details_admin/?page_size=3')
+
+    assert ids == sorted(SendingRequest.objects.values_list('id', flat=True), reverse=True)
+
+
+# Test GET - Curseur invalide
+@pytest.mark.django_db
+def test_chief_list_rejects_invalid_cursor(api_client):
+    api_client.force_authenticate(user=ChiefFleetFactory())
+    response = api_client.get(prelink + 'sending_request_details_chief/?cursor=not-a-cursor')
+    assert response.status_code == 404
+
+
+def count_queries(api_client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url)
+    assert response.status_code == 200
+    return len(queries)
+
+
+# Test GET - Le nombre de requetes SQL ne depend pas du nombre de lignes (pas de N+1)
+@pytest.mark.django_db
+def test_sending_request_lists_run_constant_queries(api_client):
+    client = ClientFactory()
+    admin = AdminFactory()
+    chief = ChiefFleetFactory()
+    SendingRequestFactory(client=client, status='accepted')
+
+    endpoints = [
+        (client, prelink + 'sending_request/'),
+        (admin, prelink + 'sending_request_details_admin/'),
+        (chief, prelink + 'sending_request_details_chief/'),
+    ]
+    baseline = {}
+    for user, url in endpoints:
+        api_client.force_authenticate(user=user)
+        baseline[url] = count_queries(api_client, url)
+
+    SendingRequestFactory.create_batch(5, client=client, status='accepted')
+    SendingRequestFactory.create_batch(5, status='accepted')
+
+    for user, url in endpoints:
+        api_client.force_authenticate(user=user)
+        assert count_queries(api_client, url) == baseline[url], url
+
+
+# Test GET - Liste des assignations sans N+1 sur les details imbriques
+@pytest.mark.django_db
+def test_assignment_list_runs_constant_queries(api_client):
+    chief = ChiefFleetFactory()
+    FleetAssignmentFactory(fleet_manager=chief)
+    api_client.force_authenticate(user=chief)
+    url = prelink + 'sending_request_assignment/'
+    baseline = count_queries(api_client, url)
+
+    FleetAssignmentFactory.create_batch(5, fleet_manager=chief)
+
+    assert count_queries(api_client, url) == baseline
+
+
+# Test GET - Version compacte pour le chef de flotte, sans charger les colonnes inutiles
+@pytest.mark.django_db
+def test_chief_list_sparse_fieldset(api_client):
+    SendingRequestFactory(status='accepted', additional_details="fragile")
+    api_client.force_authenticate(user=ChiefFleetFactory())
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(prelink + 'sending_request_details_chief/?fields=summary')
+
+    assert response.status_code == 200
+    item = response.data['results'][0]
+    assert list(item) == list(SendingRequestSerializer.summary_fields)
+    listing_sql = queries.captured_queries[-1]['sql']
+    assert 'additional_details' not in listing_sql
+    assert 'users_user' not in listing_sql
+
+
+# Test GET - Detail client inclus seulement avec ?expand=client
+@pytest.mark.django_db
+def test_chief_list_expand_client(api_client):
+    request = SendingRequestFactory(status='accepted')
+    api_client.force_authenticate(user=ChiefFleetFactory())
+
+    response = api_client.get(prelink + 'sending_request_details_chief/?fields=id,weight&expand=client')
+
+    item = response.data['results'][0]
+    assert set(item) == {'id', 'weight', 'client_details'}
+    assert item['client_details']['email'] == request.client.email
+
+
+def bulk_item(**overrides):
+    item = {
+        "recipient_name": "Rakoto", "recipient_email": "rakoto@logisty.mg", "recipient_phone": "+261340000000",
+        "cargo_type": "pallets_boxes", "weight": "120.50", "dimensions": "100x50x30 cm", "quantity": 2,
+        "pickup_location": "Antananarivo", "pickup_date_time": "2026-11-02T08:00:00Z",
+        "delivery_location": "Toamasina", "delivery_date_time": "2026-11-03T08:00:00Z",
+    }
+    item.update(overrides)
+    return item
+
+
+# Test POST - Envoi groupe : demandes et factures inserees en quelques requetes
+@pytest.mark.django_db
+def test_bulk_submission_creates_requests_and_invoices(api_client):
+    company = CompanyFactory()
+    api_client.force_authenticate(user=company)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.post(prelink + 'sending_request/bulk/', [bulk_item() for _ in range(50)], format='json')
+
+    assert response.status_code == 201
+    assert response.data['created'] == 50
+    assert len(queries) < 10
+    ids = [result['id'] for result in response.data['results']]
+    assert SendingRequest.objects.filter(id__in=ids, client=company).count() == 50
+    invoices = SendingRequestInvoice.objects.filter(sending_request__in=ids, client=company)
+    assert sorted(invoices.values_list('invoice_number', flat=True)) == sorted(
+        result['invoice_number'] for result in response.data['results'])
+
+
+# Test POST - Envoi groupe avec des elements invalides : resultats par element
+@pytest.mark.django_db
+def test_bulk_submission_reports_invalid_items(api_client):
+    api_client.force_authenticate(user=CompanyFactory())
+    items = [bulk_item(), bulk_item(weight="heavy"), bulk_item(cargo_type="rocket")]
+
+    response = api_client.post(prelink + 'sending_request/bulk/', items, format='json')
+
+    assert response.status_code == 207
+    assert [result['status'] for result in response.data['results']] == [201, 400, 400]
+    assert 'weight' in response.data['results'][1]['errors']
+    assert SendingRequest.objects.count() == 1
+
+
+# Test POST - La livraison doit suivre la prise en charge
+@pytest.mark.django_db
+def test_bulk_submission_rejects_delivery_before_pickup(api_client):
+    api_client.force_authenticate(user=CompanyFactory())
+    items = [bulk_item(delivery_date_time="2026-11-01T08:00:00Z"), bulk_item(delivery_date_time="2026-11-02T08:00:00Z")]
+
+    response = api_client.post(prelink + 'sending_request/bulk/', items, format='json')
+
+    assert [result['status'] for result in response.data['results']] == [400, 400]
+    assert 'delivery_date_time' in response.data['results'][0]['errors']
+    assert not SendingRequest.objects.exists()
+
+
+# Test POST - Envoi groupe reserve aux entreprises clientes
+@pytest.mark.django_db
+def test_bulk_submission_requires_company(api_client):
+    api_client.force_authenticate(user=ClientFactory())
+    response = api_client.post(prelink + 'sending_request/bulk/', [bulk_item()], format='json')
+    assert response.status_code == 403
+
+
+# Test GET - Recherche par destinataire, telephone ou details, classee par pertinence
+@pytest.mark.django_db
+def test_admin_search(api_client):
+    by_name = SendingRequestFactory(recipient_name="Rakotomalala Hery")
+    by_phone = SendingRequestFactory(recipient_phone="+261329998877")
+    by_details = SendingRequestFactory(additional_details="Colis fragile, Rakotomalala attend a l'entree")
+    SendingRequestFactory(recipient_name="Rabe Soa")
+    api_client.force_authenticate(user=AdminFactory())
+    url = prelink + 'sending_request_details_admin/?search='
+
+    response = api_client.get(url + 'rakotomalala')
+    assert [item['id'] for item in response.data['results']] == [by_name.id, by_details.id]
+    assert response.data['next'] is None
+
+    response = api_client.get(url + '9998877')
+    assert [item['id'] for item in response.data['results']] == [by_phone.id]
+
+    assert api_client.get(url + 'ra').status_code == 400
+
+
+# Test GET - Les resultats de recherche sont pagines par curseur, dans l'ordre de pertinence
+@pytest.mark.django_db
+def test_admin_search_pages(api_client):
+    by_name = [SendingRequestFactory(recipient_name=f"Rakotomalala {index}") for index in range(3)]
+    by_details = [SendingRequestFactory(additional_details="Rakotomalala attend") for _ in range(2)]
+    api_client.force_authenticate(user=AdminFactory())
+
+    url, ids = prelink + 'sending_request_details_admin/?search=rakotomalala&page_size=2', []
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == 200
+        ids += [item['id'] for item in response.data['results']]
+        url = response.data['next']
+
+    assert len(ids) == 5
+    assert set(ids[:3]) == {request.id for request in by_name}
+    assert set(ids[3:]) == {request.id for request in by_details}
+
+
+# Test GET - La recherche du chef de flotte reste limitee aux demandes acceptees
+@pytest.mark.django_db
+def test_chief_search_keeps_status_filter(api_client):
+    accepted = SendingRequestFactory(status='accepted', delivery_location="Mahajanga")
+    SendingRequestFactory(status='pending', delivery_location="Mahajanga")
+    api_client.force_authenticate(user=ChiefFleetFactory())
+
+    response = api_client.get(prelink + 'sending_request_details_chief/?search=mahajanga')
+
+    assert [item['id'] for item in response.data['results']] == [accepted.id]
+
+
+# Test POST - Assignation : demande reservee, bon de livraison cree, seconde tentative refusee
+@pytest.mark.django_db
+def test_assignment_claims_request_once(api_client):
+    sending_request = SendingRequestFactory(status='accepted')
+    url = prelink + 'sending_request_assignment/'
+
+    api_client.force_authenticate(user=ChiefFleetFactory())
+    response = api_client.post(url, {"sending_request": sending_request.id}, format='json')
+    assert response.status_code == 201
+    assert response.data['delivery_note'] is not None
+    sending_request.refresh_from_db()
+    assert sending_request.status == 'in_progress'
+
+    api_client.force_authenticate(user=ChiefFleetFactory())
+    response = api_client.post(url, {"sending_request": sending_request.id}, format='json')
+    assert response.status_code == 409
+    assert DeliveryNote.objects.count() == 1
+
+
+# Bon de livraison : copie de la demande (fichier joint compris) faite par PostgreSQL, une requete par lot
+@pytest.mark.django_db
+def test_delivery_notes_copy_sending_requests():
+    first = SendingRequestFactory(attached_files='sending_requests/bordereau.pdf', priority='high')
+    second = SendingRequestFactory()
+
+    with CaptureQueriesContext(connection) as queries:
+        notes = sending_requests_to_delivery_notes([first.id, second.id, 0])
+    assert len(queries) == 1
+    assert set(notes) == {first.id, second.id}
+
+    note = DeliveryNote.objects.values(*DELIVERY_NOTE_FIELDS).get(pk=notes[first.id])
+    assert note == SendingRequest.objects.values(*DELIVERY_NOTE_FIELDS).get(pk=first.id)
+    note = DeliveryNote.objects.get(pk=notes[first.id])
+    assert note.attached_files.name == 'sending_requests/bordereau.pdf'
+    assert note.status == 'pending' and note.request_date is not None
+    assert DeliveryNote.objects.get(pk=notes[second.id]).recipient_name == second.recipient_name
+
+
+# Test POST - Pas d'assignation ni de bon de livraison pour une demande non acceptee
+@pytest.mark.django_db
+def test_assignment_rejects_pending_request(api_client):
+    sending_request = SendingRequestFactory(status='pending')
+    api_client.force_authenticate(user=ChiefFleetFactory())
+
+    response = api_client.post(prelink + 'sending_request_assignment/', {"sending_request": sending_request.id},
+                               format='json')
+
+    assert response.status_code == 409
+    assert not DeliveryNote.objects.exists()
+
+
+# Test - 50 chefs en parallele : aucune double assignation, aucun bon orphelin
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_assignment_is_race_free():
+    call_command('bench_assignment_concurrency', chiefs=50, requests=10, stdout=io.StringIO())
+
+
+# Test - 50 chefs en parallele avec la file (SKIP LOCKED) : aucun conflit
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_queue_claims_without_conflict():
+    stdout = io.StringIO()
+    call_command('bench_assignment_concurrency', chiefs=20, requests=40, queue=True, stdout=stdout)
+    assert "assigned=40 conflicts=0" in stdout.getvalue()
@@ -0,0 +1,119 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.truck.recommendation import truck_index
+from apps.truck.models import Truck
+from tests.factories import ChiefFleetFactory, SendingRequestFactory, TruckFactory, FleetAssignmentFactory
+
+prelink = "http://127.0.0.1:8000/api/v1/"
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def empty_index():
+    truck_index.clear()
+    yield
+    truck_index.clear()
+
+
+def recommended_ids(api_client, chief, sending_request):
+    api_client.force_authenticate(user=chief)
+    response = api_client.get(prelink + f'truck/recommendation/{sending_request.id}')
+    assert response.status_code == 200
+    return [truck['id'] for truck in response.data]
+
+
+# Test GET - Capacite suffisante (poids x quantite), le moins surdimensionne d'abord
+@pytest.mark.django_db
+def test_recommendation_ranks_by_spare_capacity(api_client):
+    chief = ChiefFleetFactory()
+    too_small = TruckFactory(chief_fleet=chief, max_load_capacity=2.0)
+    large = TruckFactory(chief_fleet=chief, max_load_capacity=20.0)
+    snug = TruckFactory(chief_fleet=chief, max_load_capacity=3.5)
+    TruckFactory(chief_fleet=chief, max_load_capacity=10.0, status='maintenance')
+    TruckFactory(max_load_capacity=4.0)  # camion d'un autre chef
+    sending_request = SendingRequestFactory(status='accepted', weight=Decimal("1500.00"), quantity=2)  # 3 tonnes
+
+    assert recommended_ids(api_client, chief, sending_request) == [snug.id, large.id]
+    assert too_small.id not in recommended_ids(api_client, chief, sending_request)
+
+
+# Test GET - Entretien prevu avant la prise en charge, ou camion deja pris sur la meme fenetre
+@pytest.mark.django_db
+def test_recommendation_skips_maintenance_and_busy_trucks(api_client):
+    chief = ChiefFleetFactory()
+    pickup = timezone.now() + timedelta(days=3)
+    sending_request = SendingRequestFactory(status='accepted', pickup_date_time=pickup,
+                                            delivery_date_time=pickup + timedelta(hours=10))
+    due = TruckFactory(chief_fleet=chief, next_maintenance_due=(pickup - timedelta(days=1)).date())
+    busy = TruckFactory(chief_fleet=chief)
+    free = TruckFactory(chief_fleet=chief, next_maintenance_due=(pickup + timedelta(days=30)).date())
+    overlapping = SendingRequestFactory(pickup_date_time=pickup + timedelta(hours=5),
+                                        delivery_date_time=pickup + timedelta(hours=20))
+    FleetAssignmentFactory(fleet_manager=chief, truck=busy, sending_request=overlapping, status='in_progress')
+
+    ids = recommended_ids(api_client, chief, sending_request)
+
+    assert free.id in ids
+    assert due.id not in ids
+    assert busy.id not in ids
+
+
+# Test GET - L'index suit les modifications des camions
+@pytest.mark.django_db
+def test_recommendation_index_follows_truck_changes(api_client):
+    chief = ChiefFleetFactory()
+    truck = TruckFactory(chief_fleet=chief)
+    sending_request = SendingRequestFactory(status='accepted')
+    assert recommended_ids(api_client, chief, sending_request) == [truck.id]
+
+    truck.status = 'on mission'
+    truck.save()
+    assert recommended_ids(api_client, chief, sending_request) == []
+
+    added = TruckFactory(chief_fleet=chief)
+    assert recommended_ids(api_client, chief, sending_request) == [added.id]
+
+
+# Test GET - Un camion modifie par un autre processus n'est pas masque par un enregistrement local
+@pytest.mark.django_db
+def test_recommendation_reloads_after_local_save(api_client):
+    chief = ChiefFleetFactory()
+    saved = TruckFactory(chief_fleet=chief, max_load_capacity=20.0)
+    elsewhere = TruckFactory(chief_fleet=chief)
+    sending_request = SendingRequestFactory(status='accepted')
+    assert set(recommended_ids(api_client, chief, sending_request)) == {saved.id, elsewhere.id}
+
+    # Autre processus : pas de signal dans celui-ci
+    Truck.objects.filter(pk=elsewhere.pk).update(status='maintenance', updated_at=timezone.now())
+    saved.mileage = 1000
+    saved.save()
+
+    assert recommended_ids(api_client, chief, sending_request) == [saved.id]
+
+
+# Test GET - Demande non acceptee ou reservee par un autre chef : introuvable pour ce chef
+@pytest.mark.django_db
+def test_recommendation_hides_unavailable_requests(api_client):
+    chief = ChiefFleetFactory()
+    TruckFactory(chief_fleet=chief)
+    pending = SendingRequestFactory(status='pending')
+    claimed = SendingRequestFactory(status='accepted', claimed_by=ChiefFleetFactory(),
+                                    claim_expires_at=timezone.now() + timedelta(minutes=10))
+    api_client.force_authenticate(user=chief)
+
+    for sending_request in (pending, claimed):
+        response = api_client.get(prelink + f'truck/recommendation/{sending_request.id}')
+        assert response.status_code == 404
+
+    claimed.claim_expires_at = timezone.now() - timedelta(minutes=1)
+    claimed.save()
+    assert api_client.get(prelink + f'truck/recommendation/{claimed.id}').status_code == 200